@@ -1,11 +1,52 @@
 from . import classes
 from . import parsing_entry
 from . import configure
+from . import launcher
+from . import diffing
+from . import frozen
+from . import interning
+from . import modetable
+from . import edid
+from . import tokenizer
+from . import snapshot
+from . import shared
+from . import inventory
+from . import indexes
+from . import spatial
+from . import layout
+from . import validation
+from . import ramps
+from . import configqueue
+from . import profiling
 
-__all__ = (*classes.__all__, *parsing_entry.__all__, *configure.__all__)
+__all__ = (*classes.__all__, *parsing_entry.__all__, *configure.__all__,
+           *launcher.__all__, *diffing.__all__,
+           *frozen.__all__, *interning.__all__,
+           *modetable.__all__, *edid.__all__,
+           *tokenizer.__all__, *snapshot.__all__,
+           *shared.__all__, *inventory.__all__, *indexes.__all__,
+           *spatial.__all__, *layout.__all__, *validation.__all__,
+           *ramps.__all__, *configqueue.__all__, *profiling.__all__)
 
 from .classes import *  # noqa: F401,F403
 from .parsing_entry import *  # noqa: F401,F403
 from .configure import *  # noqa: F401,F403
+from .launcher import *  # noqa: F401,F403
+from .diffing import *  # noqa: F401,F403
+from .frozen import *  # noqa: F401,F403
+from .interning import *  # noqa: F401,F403
+from .modetable import *  # noqa: F401,F403
+from .edid import *  # noqa: F401,F403
+from .tokenizer import *  # noqa: F401,F403
+from .snapshot import *  # noqa: F401,F403
+from .shared import *  # noqa: F401,F403
+from .inventory import *  # noqa: F401,F403
+from .indexes import *  # noqa: F401,F403
+from .spatial import *  # noqa: F401,F403
+from .layout import *  # noqa: F401,F403
+from .validation import *  # noqa: F401,F403
+from .ramps import *  # noqa: F401,F403
+from .configqueue import *  # noqa: F401,F403
+from .profiling import *  # noqa: F401,F403
 
 __version__ = '0.1.0.dev1'
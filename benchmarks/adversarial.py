@@ -0,0 +1,178 @@
+import argparse
+import math
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..parsing_entry import parse_screens
+from .generator import generate_dump
+
+__all__ = ('CORPUS', 'measure', 'truncations', 'main')
+
+_HEADER: str = (
+    'Screen 0: minimum 8 x 8, current 1920 x 1080, maximum 16384 x 16384\n'
+    'DP-1 connected 1920x1080+0+0 (0x40) normal '
+    '(normal left inverted right x axis y axis) 597mm x 336mm\n'
+)
+
+# Every entry builds an input of about n characters that aims one fragment
+# at a long run it may have to scan or backtrack over.
+CORPUS: Dict[str, Callable[[int], str]] = {
+    'edid-unbroken-hex':
+        lambda n: _HEADER + '\tEDID: ' + 'ab' * (n // 2) + 'g\n',
+    'edid-spaced-hex':
+        lambda n: _HEADER + '\tEDID: ' + 'ab ' * (n // 3) + '\n',
+    'edid-odd-lines':
+        lambda n: _HEADER + '\tEDID: \n'
+        + ('\t\t' + '0' * 31 + '\n') * (n // 34) + '\tx: 1\n',
+    'edid-blank-tail':
+        lambda n: _HEADER + '\tEDID: \n\t\t00ff' + ' ' * n + 'x\n',
+    'clones-many':
+        lambda n: _HEADER + '\tClones: ' + 'a ' * (n // 2) + '\n',
+    'clones-blank':
+        lambda n: _HEADER + '\tClones: ' + ' ' * n + '\n',
+    'crtcs-many':
+        lambda n: _HEADER + '\tCRTCs: ' + '1 ' * (n // 2) + 'x\n',
+    'crtcs-blank':
+        lambda n: _HEADER + '\tCRTCs: ' + ' ' * n + 'x\n',
+    'crtcs-lines':
+        lambda n: _HEADER + '\tCRTCs: 0\n' + ' 1\n' * (n // 3),
+    'other-no-colon':
+        lambda n: _HEADER + '\tfoo\n' * (n // 5),
+    'other-no-colon-tail':
+        lambda n: _HEADER + '\tfoo bar' + ' baz' * (n // 4) + '\n\t\tx: 1\n',
+    'other-long-value':
+        lambda n: _HEADER + '\tfoo: ' + 'x' * n + '\n',
+    'other-blank-value':
+        lambda n: _HEADER + '\tfoo: ' + ' ' * n + 'x\n',
+    'other-empty-values':
+        lambda n: _HEADER + '\tfoo:\n' * (n // 6),
+    'border-tail':
+        lambda n: _HEADER + '\tBorder: 0 0 0 0 range: ' + 'x' * n + '\n',
+    'border-blank':
+        lambda n: _HEADER + '\tBorder: 0 0 0 0' + ' ' * n + '\n',
+    'range-unclosed':
+        lambda n: _HEADER + '\tfoo: 1\n\t\trange: (' + 'x' * n + '\n',
+    'range-many':
+        lambda n: _HEADER + '\tfoo: 1\n\t\trange: '
+        + '(0, 1), ' * (n // 8) + '(0, 1)\n',
+    'supported-many':
+        lambda n: _HEADER + '\tfoo: 1\n\t\tsupported: '
+        + 'a, ' * (n // 3) + 'a\n',
+    'transform-blank':
+        lambda n: _HEADER + '\tTransform: ' + '1.0 ' * 8 + ' ' * n + 'x\n',
+    'transform-dots':
+        lambda n: _HEADER + '\tTransform: ' + '. ' * (n // 2) + '\n',
+    'mode-long-name':
+        lambda n: _HEADER + '  ' + 'x' * n + ' (0x40\n',
+    'mode-flags-blank':
+        lambda n: _HEADER + '  1920x1080 (0x40) 1.0MHz +HSync'
+        + ' ' * n + 'x\n',
+    'mode-nonverbose-rates':
+        lambda n: _HEADER + '   1920x1080 ' + '  60.00  ' * (n // 9) + '\n',
+    'output-long-name':
+        lambda n: 'Screen 0: minimum 8 x 8\n' + 'x' * n + '\n',
+    'screen-blank':
+        lambda n: 'Screen 0: minimum 8 x 8,' + ' ' * n + 'x\n',
+    'blank-lines':
+        lambda n: _HEADER + '\n' * n,
+    'tabs':
+        lambda n: _HEADER + '\t' * n + 'x\n',
+}
+
+
+def _time(text: str, repeat: int) -> float:
+    best: float = math.inf
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        parse_screens(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(
+        build: Callable[[int], str],
+        sizes: Sequence[int],
+        repeat: int = 3
+) -> List[Tuple[int, float]]:
+    return [
+        (len(text), _time(text, repeat))
+        for text in (build(size) for size in sizes)
+    ]
+
+
+def _growth(timings: List[Tuple[int, float]]) -> float:
+    # The exponent k in time ~ size^k between the smallest and the largest
+    # input, which is about 1 for linear and 2 for quadratic behaviour.
+    (small_size, small_time), (large_size, large_time) = \
+        timings[0], timings[-1]
+    return math.log(large_time / small_time) / \
+        math.log(large_size / small_size)
+
+
+def truncations(
+        text: str,
+        step: int = 1,
+        repeat: int = 1
+) -> Tuple[float, int]:
+    # Parses prefixes of text, like the output of a killed xrandr. Returns
+    # the slowest parse time and where that cut was.
+    worst: Tuple[float, int] = (0., 0)
+    for end in range(1, len(text) + 1, step):
+        worst = max(worst, (_time(text[:end], repeat), end))
+    return worst
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Measure parse_screens on adversarial input and check '
+                    'that parse time grows linearly with the input size.'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=(1 << 16, 1 << 17, 1 << 18, 1 << 19))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', nargs='+', choices=list(CORPUS))
+    parser.add_argument('--max-growth', type=float, default=1.3,
+                        help='largest acceptable size exponent')
+    parser.add_argument('--truncation-step', type=int, default=7,
+                        help='distance between the cut points of the '
+                             'truncation sweep, 0 to skip it')
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    print('{:<24} {:>10} {:>10} {:>8} {:>7}'.format(
+        'case', 'chars', 'ms', 'MB/s', 'growth'
+    ))
+    for name, build in CORPUS.items():
+        if args.cases and name not in args.cases:
+            continue
+        timings: List[Tuple[int, float]] = \
+            measure(build, args.sizes, args.repeat)
+        size, seconds = timings[-1]
+        growth: float = _growth(timings)
+        print('{:<24} {:>10} {:>10.2f} {:>8.2f} {:>7.2f}{}'.format(
+            name, size, seconds * 1e3, size / seconds / 1e6, growth,
+            '  SUPERLINEAR' if growth > args.max_growth else ''
+        ))
+        if growth > args.max_growth:
+            failures.append(name)
+
+    if args.truncation_step > 0:
+        text: str = generate_dump(outputs=2, modes=8, properties=8)
+        full: float = _time(text, args.repeat)
+        worst, end = truncations(text, args.truncation_step, args.repeat)
+        print()
+        print('truncation sweep over {} chars: slowest prefix {:.2f} ms '
+              'at {}, full dump {:.2f} ms'.format(
+                  len(text), worst * 1e3, end, full * 1e3
+              ))
+
+    if failures:
+        print()
+        print('Superlinear: ' + ', '.join(failures))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
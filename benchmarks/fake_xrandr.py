@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+# A stand-in for xrandr that serves a canned --verbose dump and applies
+# changes to it, plus the FakeXRandR harness that puts it on PATH. The fake
+# is run as a script in every spawned process, so only the harness may
+# import from the package, and only lazily.
+import errno
+import fcntl
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import urllib.parse
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, \
+                   Sequence, Tuple
+
+if TYPE_CHECKING:
+    from ..launcher import XRandRLauncher
+
+__all__ = ('FakeXRandR', 'main')
+
+_SCREENS_FILE: str = 'screens.txt'
+_DISPLAYS_DIR: str = 'displays'
+_CONFIG_FILE: str = 'config.json'
+_LOG_FILE: str = 'invocations.log'
+_LOCK_FILE: str = 'lock'
+
+_header_regex = re.compile(
+    r'(?P<name>\S+) (?P<connection>connected|disconnected|'
+    r'unknown connection)(?P<primary> primary)?'
+    r'(?: (?P<width>\d+)x(?P<height>\d+)\+(?P<x>-?\d+)\+(?P<y>-?\d+))?'
+    r'(?: \((?P<id>0x[0-9a-fA-F]+)\))?'
+    r'(?: (?P<rotation>normal|left|inverted|right)(?= |$))?'
+    r'(?P<rest>.*)'
+)
+_mode_regex = re.compile(r'  (?P<name>\S+) \((?P<id>0x[0-9a-fA-F]+)\) ')
+_mode_width_regex = re.compile(r'\s+h: width\s+(\d+)')
+_mode_height_regex = re.compile(r'\s+v: height\s+(\d+)')
+_screen_regex = re.compile(r'Screen (\d+):')
+_screen_current_regex = re.compile(r'current \d+ x \d+')
+_size_regex = re.compile(r'(\d+)x(\d+)')
+
+# Options that are accepted but not applied, with their argument counts.
+_ignored_options: Dict[str, int] = {
+    '--rate': 1, '--refresh': 1, '--reflect': 1, '--crtc': 1,
+    '--transform': 1, '--panning': 1, '--scale': 1, '--scale-from': 1,
+    '--filter': 1, '--dpi': 1, '--left-of': 1, '--right-of': 1,
+    '--above': 1, '--below': 1, '--same-as': 1, '--auto': 0,
+    '--preferred': 0, '--verbose': 0, '--current': 0, '--nograb': 0
+}
+
+
+class _UsageError(Exception):
+    pass
+
+
+class _Dump:
+    __slots__ = ('lines',)
+    lines: List[str]
+
+    def __init__(self, text: str) -> None:
+        self.lines = text.split('\n')
+
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    def _blocks(self) -> Iterator[Tuple[int, int, int]]:
+        # Yields (screen number, start, end) for every output block.
+        screen: int = 0
+        start: Optional[int] = None
+        for i, line in enumerate(self.lines):
+            if not line or line[0].isspace():
+                continue
+            if start is not None:
+                yield screen, start, i
+                start = None
+            match = _screen_regex.match(line)
+            if match is not None:
+                screen = int(match.group(1))
+            else:
+                start = i
+        if start is not None:
+            yield screen, start, len(self.lines)
+
+    def output(self, name: str, screen: Optional[int]) -> Tuple[int, int]:
+        for number, start, end in self._blocks():
+            if screen is not None and number != screen:
+                continue
+            if self.lines[start].split(' ', 1)[0] == name:
+                return start, end
+        raise _UsageError('warning: output {} not found'.format(name))
+
+    def set_framebuffer(self, size: str, screen: Optional[int]) -> None:
+        match = _size_regex.fullmatch(size)
+        if match is None:
+            raise _UsageError('invalid framebuffer size ' + size)
+        for i, line in enumerate(self.lines):
+            screen_match = _screen_regex.match(line)
+            if screen_match is not None and \
+                    (screen is None or int(screen_match.group(1)) == screen):
+                self.lines[i] = _screen_current_regex.sub(
+                    'current {} x {}'.format(*match.groups()),
+                    line,
+                    count=1
+                )
+                return
+
+    def _header(self, start: int) -> Dict[str, Any]:
+        match = _header_regex.fullmatch(self.lines[start])
+        assert match is not None
+        return match.groupdict()
+
+    def _set_header(self, start: int, header: Dict[str, Any]) -> None:
+        parts: List[str] = [header['name'], ' ', header['connection']]
+        if header['primary']:
+            parts.append(' primary')
+        if header['width'] is not None:
+            parts.append(' {width}x{height}+{x}+{y}'.format(**header))
+        if header['id'] is not None:
+            parts.append(' ({})'.format(header['id']))
+        if header['rotation'] is not None:
+            parts.append(' ' + header['rotation'])
+        parts.append(header['rest'])
+        self.lines[start] = ''.join(parts)
+
+    def set_mode(self, start: int, end: int, mode: str) -> None:
+        target: Optional[int] = None
+        for i in range(start + 1, end):
+            match = _mode_regex.match(self.lines[i])
+            if match is not None and target is None \
+                    and mode in (match.group('name'), match.group('id')):
+                target = i
+        if target is None:
+            raise _UsageError('cannot find mode ' + mode)
+
+        for i in range(start + 1, end):
+            if _mode_regex.match(self.lines[i]) is not None:
+                self.lines[i] = self.lines[i].replace(' *current', '')
+        line: str = self.lines[target]
+        if ' +preferred' in line:
+            line = line.replace(' +preferred', ' *current +preferred', 1)
+        else:
+            line = line.rstrip() + ' *current'
+        self.lines[target] = line
+
+        width_match = _mode_width_regex.match(self.lines[target + 1])
+        height_match = _mode_height_regex.match(self.lines[target + 2])
+        if width_match is None or height_match is None:
+            raise _UsageError('malformed mode ' + mode)
+        header: Dict[str, Any] = self._header(start)
+        width, height = width_match.group(1), height_match.group(1)
+        if header['rotation'] in ('left', 'right'):
+            width, height = height, width
+        header['width'], header['height'] = width, height
+        if header['x'] is None:
+            header['x'] = header['y'] = '0'
+        header['id'] = _mode_regex.match(line).group('id')
+        if header['rotation'] is None:
+            header['rotation'] = 'normal'
+        self._set_header(start, header)
+
+    def set_position(self, start: int, position: str) -> None:
+        match = _size_regex.fullmatch(position)
+        if match is None:
+            raise _UsageError('invalid position ' + position)
+        header: Dict[str, Any] = self._header(start)
+        if header['width'] is not None:
+            header['x'], header['y'] = match.groups()
+            self._set_header(start, header)
+
+    def set_rotation(self, start: int, rotation: str) -> None:
+        if rotation not in ('normal', 'left', 'inverted', 'right'):
+            raise _UsageError('invalid rotation ' + rotation)
+        header: Dict[str, Any] = self._header(start)
+        if header['rotation'] is None:
+            return
+        if (header['rotation'] in ('left', 'right')) != \
+                (rotation in ('left', 'right')):
+            header['width'], header['height'] = \
+                header['height'], header['width']
+        header['rotation'] = rotation
+        self._set_header(start, header)
+
+    def set_primary(self, start: Optional[int]) -> None:
+        for _, other, _ in self._blocks():
+            header: Dict[str, Any] = self._header(other)
+            primary: Optional[str] = ' primary' if other == start else None
+            if header['primary'] != primary:
+                header['primary'] = primary
+                self._set_header(other, header)
+
+    def turn_off(self, start: int, end: int) -> None:
+        header: Dict[str, Any] = self._header(start)
+        header['width'] = header['height'] = header['x'] = header['y'] = \
+            header['id'] = header['rotation'] = None
+        self._set_header(start, header)
+        for i in range(start + 1, end):
+            if _mode_regex.match(self.lines[i]) is not None:
+                self.lines[i] = self.lines[i].replace(' *current', '')
+
+    def set_property(self, start: int, end: int, name: str,
+                     value: str) -> None:
+        # Properties that do not exist yet are added in front of the modes,
+        # unlike with the real xrandr, which refuses to set them.
+        prefix: str = '\t' + name + ':'
+        insert: int = end
+        for i in range(start + 1, end):
+            line: str = self.lines[i]
+            if line.startswith(prefix):
+                # Drop the continuation lines of multi-line values.
+                j: int = i + 1
+                while j < end and self.lines[j].startswith('\t\t') \
+                        and ':' not in self.lines[j]:
+                    j += 1
+                # Keep the alignment of the value.
+                spacing: str = line[len(prefix):]
+                spacing = spacing[:len(spacing) - len(spacing.lstrip())]
+                self.lines[i:j] = [prefix + (spacing or ' ') + value]
+                return
+            if _mode_regex.match(line) is not None and insert == end:
+                insert = i
+        self.lines.insert(insert, prefix + ' ' + value)
+
+
+def _apply(dump: _Dump, argv: Sequence[str]) -> Tuple[bool, bool]:
+    # Returns whether anything was changed and whether a query was asked
+    # for explicitly.
+    changed: bool = False
+    query: bool = False
+    screen: Optional[int] = None
+    output: Optional[str] = None
+    args: Iterator[str] = iter(argv)
+
+    def value(option: str) -> str:
+        try:
+            return next(args)
+        except StopIteration:
+            raise _UsageError(option + ' requires an argument') from None
+
+    def block() -> Tuple[int, int]:
+        if output is None:
+            raise _UsageError('no output specified')
+        return dump.output(output, screen)
+
+    for arg in args:
+        if arg in ('-q', '--query'):
+            query = True
+        elif arg in ('-d', '--display'):
+            value(arg)
+        elif arg == '--screen':
+            screen = int(value(arg))
+        elif arg == '--output':
+            output = value(arg)
+            block()
+        elif arg == '--fb':
+            dump.set_framebuffer(value(arg), screen)
+            changed = True
+        elif arg == '--mode':
+            dump.set_mode(*block(), value(arg))
+            changed = True
+        elif arg == '--pos':
+            dump.set_position(block()[0], value(arg))
+            changed = True
+        elif arg == '--rotate':
+            dump.set_rotation(block()[0], value(arg))
+            changed = True
+        elif arg == '--primary':
+            dump.set_primary(block()[0])
+            changed = True
+        elif arg == '--noprimary':
+            dump.set_primary(None)
+            changed = True
+        elif arg == '--off':
+            dump.turn_off(*block())
+            changed = True
+        elif arg == '--set':
+            name: str = value(arg)
+            dump.set_property(*block(), name, value(arg))
+            changed = True
+        elif arg == '--brightness':
+            dump.set_property(*block(), 'Brightness', value(arg))
+            changed = True
+        elif arg == '--gamma':
+            dump.set_property(*block(), 'Gamma', value(arg))
+            changed = True
+        elif arg in _ignored_options:
+            for _ in range(_ignored_options[arg]):
+                value(arg)
+        else:
+            raise _UsageError('unrecognized option \'{}\''.format(arg))
+    return changed, query
+
+
+def _display_file(directory: str, display: Optional[str]) -> str:
+    if not display:
+        return os.path.join(directory, _SCREENS_FILE)
+    return os.path.join(
+        directory,
+        _DISPLAYS_DIR,
+        urllib.parse.quote(display, safe='')
+    )
+
+
+def _read_dump(directory: str, display: Optional[str]) -> str:
+    for path in (_display_file(directory, display),
+                 _display_file(directory, None)):
+        try:
+            with open(path) as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+    return ''
+
+
+def _write_dump(directory: str, display: Optional[str], text: str) -> None:
+    path: str = _display_file(directory, display)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
+
+
+def _log(directory: str, record: Dict[str, Any]) -> None:
+    # A single O_APPEND write keeps records of concurrent processes intact.
+    fd: int = os.open(os.path.join(directory, _LOG_FILE),
+                      os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(record) + '\n').encode())
+    finally:
+        os.close(fd)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    start: float = time.time()
+    if argv is None:
+        argv = sys.argv[1:]
+    directory: str = os.environ.get('FAKE_XRANDR_STATE') or \
+        os.path.dirname(os.path.realpath(sys.argv[0]))
+    display: Optional[str] = os.environ.get('DISPLAY')
+    for i, arg in enumerate(argv[:-1]):
+        if arg in ('-d', '--display'):
+            display = argv[i + 1]
+
+    try:
+        with open(os.path.join(directory, _CONFIG_FILE)) as f:
+            config: Dict[str, Any] = json.load(f)
+    except FileNotFoundError:
+        config = {}
+
+    status: int = 0
+    output: str = ''
+    with open(os.path.join(directory, _LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dump: _Dump = _Dump(_read_dump(directory, display))
+        try:
+            changed, query = _apply(dump, argv)
+        except _UsageError as e:
+            changed, query = False, False
+            sys.stderr.write(str(e) + '\n')
+            status = 1
+        if changed:
+            _write_dump(directory, display, dump.text())
+        elif status == 0 or query:
+            output = dump.text()
+    time.sleep(config.get('apply_latency' if changed else 'probe_latency',
+                          0.))
+
+    try:
+        sys.stdout.write(output)
+        sys.stdout.flush()
+    except OSError as e:
+        if e.errno != errno.EPIPE:
+            raise
+    _log(directory, {
+        'argv': list(argv),
+        'display': display,
+        'status': status,
+        'start': start,
+        'end': time.time()
+    })
+    return status
+
+
+class FakeXRandR:
+    class Invocation:
+        __slots__ = ('argv', 'display', 'status', 'start', 'end')
+        argv: List[str]
+        display: Optional[str]
+        status: int
+        start: float
+        end: float
+
+        def __init__(
+                self,
+                argv: List[str],
+                display: Optional[str],
+                status: int,
+                start: float,
+                end: float
+        ) -> None:
+            self.argv = argv
+            self.display = display
+            self.status = status
+            self.start = start
+            self.end = end
+
+        @property
+        def duration(self) -> float:
+            return self.end - self.start
+
+        def __repr__(self) -> str:
+            return '{}({!r}, {!r}, {!r}, {:.3f})'.format(
+                type(self).__qualname__,
+                self.argv,
+                self.display,
+                self.status,
+                self.duration
+            )
+
+    # The fake executable is a copy of this file in a temporary directory,
+    # which also holds its state: the dump, one modified dump per display,
+    # the latency settings and the invocation log. Entering the context
+    # puts the directory first on PATH, so the default launcher uses it.
+    __slots__ = ('directory', 'path', '_old_path')
+    directory: str
+    path: str
+    _old_path: Optional[str]
+
+    def __init__(
+            self,
+            dump: Optional[str] = None,
+            probe_latency: float = 0.,
+            apply_latency: float = 0.,
+            outputs: int = 4,
+            modes: int = 16
+    ) -> None:
+        # Without a canned dump, a synthetic one with the given number of
+        # outputs and modes per output is served.
+        if dump is None:
+            from .parser import synthetic_dump
+            dump = synthetic_dump(outputs, modes)
+
+        self.directory = tempfile.mkdtemp(prefix='fake-xrandr-')
+        self.path = os.path.join(self.directory, 'xrandr')
+        self._old_path = None
+        with open(__file__) as f:
+            source: str = f.read()
+        with open(self.path, 'w') as f:
+            f.write('#!' + sys.executable + '\n')
+            f.write(source)
+        os.chmod(self.path, os.stat(self.path).st_mode
+                 | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        self.set_dump(dump)
+        self.set_latency(probe_latency, apply_latency)
+
+    @property
+    def launcher(self) -> 'XRandRLauncher':
+        from ..launcher import XRandRLauncher
+        return XRandRLauncher(self.path)
+
+    def set_latency(
+            self,
+            probe: Optional[float] = None,
+            apply: Optional[float] = None
+    ) -> None:
+        config_path: str = os.path.join(self.directory, _CONFIG_FILE)
+        try:
+            with open(config_path) as f:
+                config: Dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            config = {}
+        if probe is not None:
+            config['probe_latency'] = probe
+        if apply is not None:
+            config['apply_latency'] = apply
+        with open(config_path, 'w') as f:
+            json.dump(config, f)
+
+    def set_dump(self, dump: str, display: Optional[str] = None) -> None:
+        # Without a display, the dump is served to all displays that have
+        # not been changed yet.
+        _write_dump(self.directory, display, dump)
+
+    def dump(self, display: Optional[str] = None) -> str:
+        return _read_dump(self.directory, display)
+
+    @property
+    def invocations(self) -> List['FakeXRandR.Invocation']:
+        try:
+            with open(os.path.join(self.directory, _LOG_FILE)) as f:
+                records: List[Dict[str, Any]] = \
+                    [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return []
+        records.sort(key=lambda record: record['start'])
+        return [
+            FakeXRandR.Invocation(
+                record['argv'],
+                record['display'],
+                record['status'],
+                record['start'],
+                record['end']
+            )
+            for record in records
+        ]
+
+    def clear(self) -> None:
+        try:
+            os.unlink(os.path.join(self.directory, _LOG_FILE))
+        except FileNotFoundError:
+            pass
+
+    def install(self) -> None:
+        from ..launcher import default_launcher
+        if self._old_path is None:
+            self._old_path = os.environ.get('PATH', '')
+            os.environ['PATH'] = self.directory + os.pathsep + \
+                self._old_path
+            default_launcher._path = None
+
+    def uninstall(self) -> None:
+        from ..launcher import default_launcher
+        if self._old_path is not None:
+            os.environ['PATH'] = self._old_path
+            self._old_path = None
+            default_launcher._path = None
+
+    def close(self) -> None:
+        self.uninstall()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> 'FakeXRandR':
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
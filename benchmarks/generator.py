@@ -0,0 +1,352 @@
+import random
+import struct
+from typing import List, Sequence, Tuple
+
+__all__ = ('generate_dump', 'generate_edid')
+
+_RESOLUTIONS: Tuple[Tuple[int, int], ...] = (
+    (3840, 2160), (2560, 1440), (1920, 1200), (1920, 1080), (1680, 1050),
+    (1600, 900), (1440, 900), (1366, 768), (1280, 1024), (1280, 800),
+    (1280, 720), (1024, 768), (800, 600), (720, 576), (720, 480),
+    (640, 480)
+)
+_REFRESH_RATES: Tuple[float, ...] = (60., 59.94, 50., 75., 120., 144.)
+_CONNECTORS: Tuple[str, ...] = ('DP', 'HDMI', 'eDP', 'DVI-D', 'VGA')
+
+# name, value, extra lines
+_VENDOR_PROPERTIES: Tuple[Tuple[str, str, str], ...] = (
+    ('scaling mode', 'Full aspect ',
+     '\t\tsupported: None, Full, Center, Full aspect\n'),
+    ('Broadcast RGB', 'Automatic ',
+     '\t\tsupported: Automatic, Full, Limited 16:235\n'),
+    ('max bpc', '12 ', '\t\trange: (6, 16)\n'),
+    ('link-status', 'Good ', '\t\tsupported: Good, Bad\n'),
+    ('non-desktop', '0 ', '\t\trange: (0, 1)\n'),
+    ('vrr_capable', '1 ', '\t\trange: (0, 1)\n'),
+    ('Colorspace', 'Default ',
+     '\t\tsupported: Default, BT709_YCC, XVYCC_601, XVYCC_709, '
+     'SYCC_601, opYCC_601, opRGB, BT2020_CYCC, BT2020_RGB, BT2020_YCC, '
+     'DCI-P3_RGB_D65, DCI-P3_RGB_Theater\n'),
+    ('HDCP Content Type', 'HDCP Type0 ',
+     '\t\tsupported: HDCP Type0, HDCP Type1\n'),
+    ('Content Protection', 'Undesired ',
+     '\t\tsupported: Undesired, Desired, Enabled\n'),
+    ('audio', 'auto ', '\t\tsupported: force-dvi, off, auto, on\n'),
+    ('underscan', 'off ', '\t\tsupported: off, on, auto\n'),
+    ('underscan hborder', '0 ', '\t\trange: (0, 128)\n'),
+    ('underscan vborder', '0 ', '\t\trange: (0, 128)\n'),
+    ('subconnector', 'Native ',
+     '\t\tsupported: Unknown, VGA, DVI-D, HDMI, DP, Wireless, Native\n'),
+    ('TearFree', 'auto ', '\t\tsupported: off, on, auto\n'),
+    ('PRIME Synchronization', '1 ', '\t\tsupported: 0, 1\n'),
+)
+
+_SCREEN: str = (
+    'Screen {number}: minimum 320 x 200, current {width} x {height}, '
+    'maximum 16384 x 16384\n'
+)
+_OUTPUT_VERBOSE: str = (
+    '{name} connected{primary} {width}x{height}+{x}+0 (0x{mode:x}) normal '
+    '(normal left inverted right x axis y axis) {width_mm}mm x '
+    '{height_mm}mm\n'
+    '\tIdentifier: 0x{identifier:x}\n'
+    '\tTimestamp:  {timestamp}\n'
+    '\tSubpixel:   unknown\n'
+    '\tGamma:      1.0:1.0:1.0\n'
+    '\tBrightness: 1.0\n'
+    '\tClones:    \n'
+    '\tCRTC:       {crtc}\n'
+    '\tCRTCs:      {crtcs}\n'
+    '\tTransform:  1.000000 0.000000 0.000000\n'
+    '\t            0.000000 1.000000 0.000000\n'
+    '\t            0.000000 0.000000 1.000000\n'
+    '\t           filter: \n'
+)
+_DISCONNECTED_VERBOSE: str = (
+    '{name} disconnected (normal left inverted right x axis y axis)\n'
+    '\tIdentifier: 0x{identifier:x}\n'
+    '\tTimestamp:  {timestamp}\n'
+    '\tSubpixel:   unknown\n'
+    '\tClones:    \n'
+    '\tCRTCs:      {crtcs}\n'
+    '\tTransform:  1.000000 0.000000 0.000000\n'
+    '\t            0.000000 1.000000 0.000000\n'
+    '\t            0.000000 0.000000 1.000000\n'
+    '\t           filter: \n'
+)
+_OUTPUT: str = (
+    '{name} connected{primary} {width}x{height}+{x}+0 '
+    '(normal left inverted right x axis y axis) {width_mm}mm x '
+    '{height_mm}mm\n'
+)
+_DISCONNECTED: str = (
+    '{name} disconnected (normal left inverted right x axis y axis)\n'
+)
+_MODE: str = (
+    '  {width}x{height} (0x{id:x}) {dotclock:.3f}MHz {hsync}HSync '
+    '{vsync}VSync{flags}\n'
+    '        h: width  {width} start {hss} end {hse} total {ht} skew    0 '
+    'clock {hclock:6.2f}KHz\n'
+    '        v: height {height} start {vss} end {vse} total {vt}           '
+    'clock {refresh:6.2f}Hz\n'
+)
+
+
+class _Mode:
+    __slots__ = ('id', 'width', 'height', 'refresh', 'dotclock', 'ht', 'vt')
+    id: int
+    width: int
+    height: int
+    refresh: float
+    dotclock: float
+    ht: int
+    vt: int
+
+    def __init__(self, id: int, width: int, height: int,
+                 refresh: float) -> None:
+        self.id = id
+        self.width = width
+        self.height = height
+        self.ht = width + 160
+        self.vt = height + max(3, height // 30)
+        self.dotclock = round(self.ht * self.vt * refresh / 1e6, 3)
+        self.refresh = self.dotclock * 1e6 / (self.ht * self.vt)
+
+    def verbose(self, current: bool, preferred: bool) -> str:
+        flags: str = (' *current' if current else '') \
+            + (' +preferred' if preferred else '')
+        return _MODE.format(
+            width=self.width,
+            height=self.height,
+            id=self.id,
+            dotclock=self.dotclock,
+            hsync='+' if self.id % 2 else '-',
+            vsync='-' if self.id % 3 else '+',
+            flags=flags,
+            hss=self.width + 48,
+            hse=self.width + 80,
+            ht=self.ht,
+            hclock=self.dotclock * 1000 / self.ht,
+            vss=self.height + 3,
+            vse=self.height + 8,
+            vt=self.vt,
+            refresh=self.refresh
+        )
+
+
+def _mode_pool(count: int, first_id: int) -> List[_Mode]:
+    # Resolutions from large to small, each in all refresh rates before
+    # the next one, and made up sizes once the table runs out.
+    pool: List[_Mode] = []
+    index: int = 0
+    while len(pool) < count:
+        size: int = index // len(_REFRESH_RATES)
+        if size < len(_RESOLUTIONS):
+            width, height = _RESOLUTIONS[size]
+        else:
+            width = 640 - (size - len(_RESOLUTIONS) + 1) * 8
+            height = width * 3 // 4
+            width, height = max(width, 64), max(height, 48)
+        pool.append(_Mode(
+            first_id + len(pool),
+            width,
+            height,
+            _REFRESH_RATES[index % len(_REFRESH_RATES)]
+        ))
+        index += 1
+    return pool
+
+
+def _descriptor(tag: int, text: str) -> bytes:
+    data: bytes = text.encode('ascii')[:13]
+    if len(data) < 13:
+        data += b'\n' + b' ' * (12 - len(data))
+    return bytes((0, 0, 0, tag, 0)) + data
+
+
+def _detailed_timing(mode: _Mode, width_mm: int, height_mm: int) -> bytes:
+    clock: int = min(int(round(mode.dotclock * 100)), 0xffff)
+    h_blank: int = mode.ht - mode.width
+    v_blank: int = mode.vt - mode.height
+    return struct.pack(
+        '<H16B',
+        clock,
+        mode.width & 0xff,
+        h_blank & 0xff,
+        (mode.width >> 8) << 4 | h_blank >> 8,
+        mode.height & 0xff,
+        v_blank & 0xff,
+        (mode.height >> 8) << 4 | v_blank >> 8,
+        48, 32, 3 << 4 | 5, 0,
+        width_mm & 0xff,
+        height_mm & 0xff,
+        (width_mm >> 8) << 4 | height_mm >> 8,
+        0, 0, 0x1e
+    )
+
+
+def _checksummed(block: bytes) -> bytes:
+    return block + bytes(((-sum(block)) & 0xff,))
+
+
+def generate_edid(
+        number: int,
+        mode: Tuple[int, int, float] = (1920, 1080, 60.),
+        extensions: int = 1,
+        size_mm: Tuple[int, int] = (527, 296)
+) -> bytes:
+    # A base block with a detailed timing for the mode, a monitor name and
+    # a serial, followed by CTA-861 extension blocks with a few video
+    # codes and one more detailed timing each.
+    timing: _Mode = _Mode(0, *mode)
+    base: bytes = b''.join((
+        b'\x00\xff\xff\xff\xff\xff\xff\x00',
+        struct.pack('>H', (7 << 10) | (19 << 5) | 13),  # GSM
+        struct.pack('<HI', 0x5b00 + number % 0x100, 0x1000 + number),
+        bytes((number % 52 + 1, 30, 1, 4, 0xb5,
+               size_mm[0] // 10, size_mm[1] // 10, 0x78, 0x3a)),
+        bytes(10),
+        bytes((0x21, 0x08, 0x00)),
+        b'\x01\x01' * 8,
+        _detailed_timing(timing, *size_mm),
+        _descriptor(0xfc, 'MONITOR {}'.format(number)),
+        _descriptor(0xff, 'SN{:08d}'.format(number)),
+        _descriptor(0x10, ''),
+        bytes((extensions,))
+    ))
+    blocks: List[bytes] = [_checksummed(base)]
+    for index in range(extensions):
+        video: bytes = bytes((0x40 | 4, 16, 4, 31, 95))
+        body: bytes = bytes((0x02, 0x03, 4 + len(video), 0xf0)) + video
+        body += _detailed_timing(
+            _Mode(0, 1280, 720, _REFRESH_RATES[index % 3]),
+            *size_mm
+        )
+        blocks.append(_checksummed(body + bytes(127 - len(body))))
+    return b''.join(blocks)
+
+
+def _edid_lines(edid: bytes) -> str:
+    return '\tEDID: \n' + ''.join(
+        '\t\t' + edid[i:i + 16].hex() + '\n' for i in range(0, len(edid), 16)
+    )
+
+
+def _vendor_properties(count: int) -> str:
+    parts: List[str] = []
+    for index in range(count):
+        if index < len(_VENDOR_PROPERTIES):
+            name, value, extra = _VENDOR_PROPERTIES[index]
+        else:
+            name = 'vendor-property-{}'.format(index)
+            value = '{} '.format(index)
+            extra = '\t\trange: (0, {})\n'.format(index * 2)
+        parts.append('\t{}: {}\n{}'.format(name, value, extra))
+    return ''.join(parts)
+
+
+def _nonverbose_modes(modes: Sequence[_Mode], current: int) -> str:
+    # One line per size, with all refresh rates of that size.
+    lines: List[str] = []
+    for index, mode in enumerate(modes):
+        if index == 0 or (mode.width, mode.height) != \
+                (modes[index - 1].width, modes[index - 1].height):
+            if lines:
+                lines.append('\n')
+            lines.append('   {:<12s}'.format(
+                '{}x{}'.format(mode.width, mode.height)
+            ))
+        lines.append(' {:6.2f}{}{}'.format(
+            mode.refresh,
+            '*' if index == current else ' ',
+            '+' if index == 0 else ' '
+        ))
+    if lines:
+        lines.append('\n')
+    return ''.join(lines)
+
+
+def generate_dump(
+        screens: int = 1,
+        outputs: int = 4,
+        modes: int = 16,
+        properties: int = 4,
+        edid_extensions: int = 1,
+        disconnected: int = 1,
+        verbose: bool = True,
+        seed: int = 0
+) -> str:
+    # outputs and disconnected are per screen, modes, properties and EDID
+    # extension blocks per connected output. Outputs share their modes like
+    # with a real server, the first one is preferred and a random one of
+    # them is current.
+    rng: random.Random = random.Random(seed)
+    parts: List[str] = []
+    for screen in range(screens):
+        pool: List[_Mode] = _mode_pool(modes, 0x40 + screen * 0x10000)
+        identifier: int = pool[-1].id + 1 if pool else 0x40
+        current: List[int] = [
+            rng.randrange(modes) if modes else 0 for _ in range(outputs)
+        ]
+        width: int = sum(pool[c].width for c in current) if pool else 0
+        height: int = max(pool[c].height for c in current) \
+            if pool and current else 0
+        parts.append(_SCREEN.format(number=screen, width=max(width, 320),
+                                    height=max(height, 200)))
+
+        crtcs: str = ' '.join(str(c) for c in range(max(outputs, 1)))
+        x: int = 0
+        for number in range(outputs + disconnected):
+            name: str = '{}-{}'.format(
+                _CONNECTORS[number % len(_CONNECTORS)],
+                number // len(_CONNECTORS) + 1
+            )
+            identifier += 1
+            if number >= outputs or not pool:
+                template: str = _DISCONNECTED_VERBOSE if verbose \
+                    else _DISCONNECTED
+                parts.append(template.format(
+                    name=name,
+                    identifier=identifier,
+                    timestamp=rng.randrange(1 << 24),
+                    crtcs=crtcs
+                ))
+                continue
+
+            mode: _Mode = pool[current[number]]
+            width_mm: int = rng.choice((344, 527, 597, 697))
+            height_mm: int = width_mm * 9 // 16
+            fields = dict(
+                name=name,
+                primary=' primary' if number == 0 else '',
+                width=mode.width,
+                height=mode.height,
+                x=x,
+                mode=mode.id,
+                width_mm=width_mm,
+                height_mm=height_mm,
+                identifier=identifier,
+                timestamp=rng.randrange(1 << 24),
+                crtc=number,
+                crtcs=crtcs
+            )
+            x += mode.width
+            if not verbose:
+                parts.append(_OUTPUT.format(**fields))
+                parts.append(_nonverbose_modes(pool, current[number]))
+                continue
+
+            parts.append(_OUTPUT_VERBOSE.format(**fields))
+            parts.append(_edid_lines(generate_edid(
+                screen * 1000 + number,
+                (pool[0].width, pool[0].height, pool[0].refresh),
+                edid_extensions,
+                (width_mm, height_mm)
+            )))
+            parts.append(_vendor_properties(properties))
+            for index, pool_mode in enumerate(pool):
+                parts.append(pool_mode.verbose(
+                    index == current[number],
+                    index == 0
+                ))
+    return ''.join(parts)
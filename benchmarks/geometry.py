@@ -0,0 +1,68 @@
+import argparse
+import timeit
+import tracemalloc
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from ..classes import XRandRDimensions, XRandRGeometry, XRandROffset
+from ..parsing_entry import parse_screens
+
+__all__ = ('main',)
+
+_OUTPUT: str = (
+    'DP-{0} connected 1920x1080+{1}+0 (0x48) normal '
+    '(normal left inverted right x axis y axis) '
+    '527mm x 296mm panning 1920x1080+{1}+0 tracking 1920x1080+{1}+0 '
+    'border 0/0/0/0\n'
+)
+
+
+def _allocations(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        before: int = len(tracemalloc.take_snapshot().traces)
+        result: Any = func()
+        after: int = len(tracemalloc.take_snapshot().traces)
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Measure geometry construction and output header '
+                    'parsing cost.'
+    )
+    parser.add_argument('--outputs', type=int, default=64)
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    constructors: Tuple[Tuple[str, Callable[[], Any]], ...] = (
+        ('subscripted generics', lambda: XRandRGeometry[int](
+            XRandRDimensions[int](1920, 1080),
+            XRandROffset[int](0, 0)
+        )),
+        ('nested objects', lambda: XRandRGeometry(
+            XRandRDimensions(1920, 1080),
+            XRandROffset(0, 0)
+        )),
+        ('from_values', lambda: XRandRGeometry.from_values(1920, 1080, 0, 0)),
+    )
+    for name, func in constructors:
+        seconds: float = timeit.timeit(func, number=args.number)
+        print('{:<22} {:>8.3f} us'.format(
+            name, seconds / args.number * 1e6
+        ))
+
+    dump: str = 'Screen 0: minimum 8 x 8, current 1 x 1, maximum 8 x 8\n' \
+        + ''.join(_OUTPUT.format(i, i * 1920) for i in range(args.outputs))
+    number: int = max(1, args.number // (args.outputs * 100))
+    seconds = timeit.timeit(lambda: parse_screens(dump), number=number)
+    print('parse per output       {:>8.3f} us, {:.1f} allocations'.format(
+        seconds / number / args.outputs * 1e6,
+        _allocations(lambda: parse_screens(dump)) / args.outputs
+    ))
+
+
+if __name__ == '__main__':
+    main()
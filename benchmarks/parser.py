@@ -0,0 +1,116 @@
+import argparse
+import concurrent.futures
+import timeit
+from typing import Optional, Sequence
+
+from ..parsing_entry import parse_screens
+
+__all__ = ('main',)
+
+_SCREEN: str = (
+    'Screen 0: minimum 8 x 8, current 32767 x 2160, maximum 32767 x 32767\n'
+)
+_OUTPUT: str = (
+    'DP-{number} connected {width}x{height}+{x}+0 (0x{mode:x}) normal '
+    '(normal left inverted right x axis y axis) 597mm x 336mm\n'
+    '\tIdentifier: 0x{identifier:x}\n'
+    '\tTimestamp:  2241384\n'
+    '\tSubpixel:   unknown\n'
+    '\tGamma:      1.0:1.0:1.0\n'
+    '\tBrightness: 1.0\n'
+    '\tClones:    \n'
+    '\tCRTC:       {number}\n'
+    '\tCRTCs:      0 1 2 3\n'
+    '\tTransform:  1.000000 0.000000 0.000000\n'
+    '\t            0.000000 1.000000 0.000000\n'
+    '\t            0.000000 0.000000 1.000000\n'
+    '\t           filter: \n'
+    '\tmax bpc: 12 \n'
+    '\t\trange: (6, 12)\n'
+    '\tBroadcast RGB: Automatic \n'
+    '\t\tsupported: Automatic, Full, Limited 16:235\n'
+)
+_MODE: str = (
+    '  {width}x{height} (0x{id:x}) {dotclock:.3f}MHz +HSync -VSync{flags}\n'
+    '        h: width  {width} start {hss} end {hse} total {ht} skew    0 '
+    'clock {hclock:.2f}KHz\n'
+    '        v: height {height} start {vss} end {vse} total {vt}           '
+    'clock  {refresh:.2f}Hz\n'
+)
+
+
+def synthetic_dump(outputs: int, modes: int) -> str:
+    parts = [_SCREEN]
+    for number in range(outputs):
+        parts.append(_OUTPUT.format(
+            number=number,
+            width=3840,
+            height=2160,
+            x=number * 3840,
+            mode=0x40,
+            identifier=0x40 + number
+        ))
+        for index in range(modes):
+            width: int = 3840 - index * 16
+            height: int = 2160 - index * 9
+            ht: int = width + 160
+            vt: int = height + 62
+            dotclock: float = ht * vt * 60 / 1e6
+            parts.append(_MODE.format(
+                width=width,
+                height=height,
+                id=0x40 + index,
+                dotclock=dotclock,
+                flags=' *current +preferred' if index == 0 else '',
+                hss=width + 48,
+                hse=width + 80,
+                ht=ht,
+                hclock=dotclock * 1000 / ht,
+                vss=height + 3,
+                vse=height + 8,
+                vt=vt,
+                refresh=dotclock * 1e6 / (ht * vt)
+            ))
+    return ''.join(parts)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Measure parse_screens on a large synthetic dump.'
+    )
+    parser.add_argument('--outputs', type=int, default=32)
+    parser.add_argument('--modes', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--processes', type=int, default=1,
+                        help='parse output blocks in this many worker '
+                             'processes')
+    args = parser.parse_args(argv)
+
+    dump: str = synthetic_dump(args.outputs, args.modes)
+    executor: Optional[concurrent.futures.Executor] = None
+    if args.processes > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(args.processes)
+
+    try:
+        screens, success = parse_screens(dump, executor=executor)
+        assert success and len(screens[0].outputs) == args.outputs
+
+        seconds: float = min(timeit.repeat(
+            lambda: parse_screens(dump, executor=executor),
+            number=1,
+            repeat=args.repeat
+        ))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    print('{} bytes, {} outputs, {} modes: {:.1f} ms, {:.2f} MB/s'.format(
+        len(dump),
+        args.outputs,
+        args.outputs * args.modes,
+        seconds * 1e3,
+        len(dump) / seconds / 1e6
+    ))
+
+
+if __name__ == '__main__':
+    main()
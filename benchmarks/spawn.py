@@ -0,0 +1,78 @@
+import argparse
+import os
+import subprocess
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from ..launcher import XRandRLauncher
+
+__all__ = ('main',)
+
+
+def _rss_mib() -> float:
+    with open('/proc/self/statm') as statm:
+        pages: int = int(statm.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+
+
+def _inflate(ballast: List[bytearray], mib: int) -> None:
+    while len(ballast) < mib:
+        chunk: bytearray = bytearray(1 << 20)
+        # Touch every page so it is actually resident.
+        for i in range(0, len(chunk), 4096):
+            chunk[i] = 1
+        ballast.append(chunk)
+
+
+def _fork_exec(path: str) -> None:
+    pid: int = os.fork()
+    if pid == 0:
+        try:
+            os.execv(path, (path,))
+        finally:
+            os._exit(127)
+    os.waitpid(pid, 0)
+
+
+def _time(func: Callable[[], Any], iterations: int) -> float:
+    func()
+    start: float = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Measure process spawn latency against process RSS.'
+    )
+    parser.add_argument('--program', default='true')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--rss', type=int, nargs='+',
+                        default=(0, 256, 1024, 2048),
+                        help='process RSS sizes to test, in MiB')
+    args = parser.parse_args(argv)
+
+    launcher: XRandRLauncher = XRandRLauncher(args.program)
+    path: str = launcher.resolve()
+
+    methods = (
+        ('launcher', launcher.run),
+        ('fork+exec', lambda: _fork_exec(path)),
+        ('subprocess', lambda: subprocess.call((path,))),
+    )
+
+    print('{:>10} {:>12} {:>12} {:>12}'.format(
+        'RSS (MiB)', *(name + ' us' for name, _ in methods)
+    ))
+    ballast: List[bytearray] = []
+    for mib in sorted(args.rss):
+        _inflate(ballast, mib)
+        print('{:>10.0f} {:>12.1f} {:>12.1f} {:>12.1f}'.format(
+            _rss_mib(),
+            *(_time(func, args.iterations) for _, func in methods)
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..parser import ParserProfile
+from ..parsing_entry import parse_screens
+from ..profiling import format_profile, profile_screens
+from .generator import generate_dump
+
+__all__ = ('CASES', 'run_case', 'compare', 'main')
+
+# name, generate_dump() arguments, dimension the case varies against the
+# baseline
+CASES: Tuple[Tuple[str, Dict[str, Any], Optional[str]], ...] = (
+    ('baseline', {}, None),
+    ('outputs', {'outputs': 32}, 'outputs'),
+    ('modes', {'modes': 128}, 'modes'),
+    ('properties', {'properties': 32}, 'properties'),
+    ('edid', {'edid_extensions': 7}, 'edid_blocks'),
+    ('screens', {'screens': 4}, 'screens'),
+    ('nonverbose', {'verbose': False, 'modes': 128}, None),
+    ('large', {'screens': 2, 'outputs': 16, 'modes': 96, 'properties': 16},
+     None),
+)
+
+# Metrics where lower is better, all others are throughputs.
+_LOWER_IS_BETTER: Tuple[str, ...] = ('seconds', 'peak_kib')
+
+
+def _counts(kwargs: Dict[str, Any]) -> Dict[str, int]:
+    args: Dict[str, Any] = dict(
+        screens=1, outputs=4, modes=16, properties=4, edid_extensions=1,
+        verbose=True
+    )
+    args.update(kwargs)
+    outputs: int = args['screens'] * args['outputs']
+    return {
+        'screens': args['screens'],
+        'outputs': outputs,
+        'modes': outputs * args['modes'],
+        'properties': outputs * args['properties'] if args['verbose'] else 0,
+        'edid_blocks':
+            outputs * (1 + args['edid_extensions']) if args['verbose'] else 0
+    }
+
+
+def run_case(kwargs: Dict[str, Any], repeat: int = 5) -> Dict[str, float]:
+    dump: str = generate_dump(**kwargs)
+    counts: Dict[str, int] = _counts(kwargs)
+    screens, success = parse_screens(dump)
+    if not success:
+        raise RuntimeError('Generated dump did not parse')
+    # The profiled parser loop is a copy of the plain one, both have to
+    # produce the same screens.
+    with ParserProfile():
+        if parse_screens(dump) != (screens, success):
+            raise RuntimeError('Profiled parse differs from the plain one')
+
+    # Small dumps are parsed several times per measurement, so that each
+    # measurement takes at least about 50 ms.
+    timer: timeit.Timer = timeit.Timer(lambda: parse_screens(dump))
+    number: int = max(1, int(0.05 / timer.timeit(1)))
+    seconds: float = min(timer.repeat(repeat, number)) / number
+    tracemalloc.start()
+    try:
+        parse_screens(dump)
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'bytes': len(dump),
+        'seconds': seconds,
+        'mb_per_s': len(dump) / seconds / 1e6,
+        'outputs_per_s': counts['outputs'] / seconds,
+        'modes_per_s': counts['modes'] / seconds,
+        'peak_kib': peak / 1024
+    }
+
+
+def _marginal_costs(
+        results: Dict[str, Dict[str, float]]
+) -> Dict[str, float]:
+    # The cost of one more unit of a dimension, from the difference to the
+    # baseline case.
+    costs: Dict[str, float] = {}
+    base: Optional[Dict[str, float]] = results.get('baseline')
+    if base is None:
+        return costs
+    base_counts: Dict[str, int] = _counts({})
+    for name, kwargs, dimension in CASES:
+        if dimension is None or name not in results:
+            continue
+        units: int = _counts(kwargs)[dimension] - base_counts[dimension]
+        costs[dimension] = \
+            (results[name]['seconds'] - base['seconds']) / units * 1e6
+    return costs
+
+
+def compare(
+        results: Dict[str, Dict[str, float]],
+        baseline: Dict[str, Dict[str, float]],
+        threshold: float = 0.1
+) -> List[Tuple[str, str, float, float]]:
+    # Returns (case, metric, baseline value, new value) for every metric
+    # that got worse by more than the threshold.
+    regressions: List[Tuple[str, str, float, float]] = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            old: Optional[float] = baseline.get(case, {}).get(metric)
+            if not old or metric == 'bytes':
+                continue
+            if metric in _LOWER_IS_BETTER:
+                worse: bool = value > old * (1 + threshold)
+            else:
+                worse = value < old * (1 - threshold)
+            if worse:
+                regressions.append((case, metric, old, value))
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Measure parse_screens across generated dumps.'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', nargs='+',
+                        choices=[name for name, _, _ in CASES])
+    parser.add_argument('--save', metavar='FILE',
+                        help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare the results against a baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change that counts as a regression')
+    parser.add_argument('--profile', action='store_true',
+                        help='rank the parser fragments of every case')
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print('{:<12} {:>9} {:>9} {:>8} {:>11} {:>11} {:>9}'.format(
+        'case', 'bytes', 'ms', 'MB/s', 'outputs/s', 'modes/s', 'peak KiB'
+    ))
+    for name, kwargs, _ in CASES:
+        if args.cases and name not in args.cases:
+            continue
+        result: Dict[str, float] = run_case(kwargs, args.repeat)
+        results[name] = result
+        print('{:<12} {:>9} {:>9.2f} {:>8.2f} {:>11.0f} {:>11.0f} {:>9.0f}'
+              .format(name, int(result['bytes']), result['seconds'] * 1e3,
+                      result['mb_per_s'], result['outputs_per_s'],
+                      result['modes_per_s'], result['peak_kib']))
+        if args.profile:
+            print(format_profile(
+                profile_screens(generate_dump(**kwargs), args.repeat),
+                limit=8
+            ))
+            print()
+
+    costs: Dict[str, float] = _marginal_costs(results)
+    if costs:
+        print()
+        for dimension, cost in costs.items():
+            print('{:<12} {:>9.2f} us per unit'.format(dimension, cost))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline: Dict[str, Dict[str, float]] = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if not regressions:
+            print('No regressions against {}'.format(args.compare))
+        for case, metric, old, new in regressions:
+            print('REGRESSION {} {}: {:.4g} -> {:.4g} ({:+.1%})'.format(
+                case, metric, old, new, new / old - 1
+            ))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,13 @@
+import array
+import copy
 import enum
-from typing import Any, Generic, Mapping, Optional, Sequence, Tuple, TypeVar, \
-                   Union
+from typing import TYPE_CHECKING, Any, Dict, Generic, Mapping, Optional, \
+                   Sequence, Tuple, TypeVar, Union
+
+from .edid import XRandREdid, decode_edid
+
+if TYPE_CHECKING:
+    from .indexes import XRandRScreenIndex
 
 __all__ = ('XRandRDimensions', 'XRandROffset', 'XRandRGeometry',
            'XRandRBorder', 'XRandRTransform', 'XRandRScreen',
@@ -11,7 +18,88 @@ Rational = Union[int, float]
 RationalT = TypeVar('RationalT', int, float)
 
 
-class XRandRDimensions(Generic[RationalT]):
+class _XRandRBase:
+    # Structural (Merkle-style) hashes are computed from the hashes of the
+    # fields. The objects are mutable, so the hash is computed again on
+    # every call; only the frozen classes cache it (in _hash).
+    __slots__ = ('_hash',)
+    # Slots listed in _caches hold derived data and are not fields.
+    _caches: Tuple[str, ...] = ('_hash',)
+    _fields: Tuple[str, ...] = ()
+    _model_class: type
+    _hash: int
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        if '_model_class' not in cls.__dict__:
+            cls._model_class = cls
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for field in klass.__dict__.get('__slots__', ()):
+                if field not in cls._caches and field not in fields:
+                    fields.append(field)
+        cls._fields = tuple(fields)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if getattr(other, '_model_class', None) is not self._model_class:
+            return NotImplemented
+        return all(
+            _structural_equal(getattr(self, field), getattr(other, field))
+            for field in self._fields
+        )
+
+    def __hash__(self) -> int:
+        return hash((
+            self._model_class.__qualname__,
+            *(_structural_hash(getattr(self, field))
+              for field in self._fields)
+        ))
+
+    def __copy__(self) -> Any:
+        obj: Any = object.__new__(type(self))
+        for field in self._fields:
+            object.__setattr__(obj, field, getattr(self, field))
+        return obj
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        # Copied field by field, so that deepcopy() does not go through
+        # __reduce__ and objects shared within the tree stay shared.
+        obj: Any = object.__new__(type(self))
+        memo[id(self)] = obj
+        for field in self._fields:
+            object.__setattr__(
+                obj,
+                field,
+                copy.deepcopy(getattr(self, field), memo)
+            )
+        return obj
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Pickle through the compact binary snapshot encoding.
+        from .snapshot import _reduce
+        return _reduce(self)
+
+
+def _structural_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(map(_structural_equal, a, b))
+    return bool(a == b)
+
+
+def _structural_hash(value: Any) -> int:
+    if isinstance(value, (list, tuple)):
+        return hash(tuple(_structural_hash(v) for v in value))
+    if isinstance(value, Mapping):
+        # Mappings compare equal regardless of their order.
+        return hash(frozenset(
+            (k, _structural_hash(v)) for k, v in value.items()
+        ))
+    return hash(value)
+
+
+class XRandRDimensions(_XRandRBase, Generic[RationalT]):
     __slots__ = ('width', 'height')
     width: Optional[RationalT]
     height: Optional[RationalT]
@@ -25,7 +113,7 @@ class XRandRDimensions(Generic[RationalT]):
         self.height = heigth
 
 
-class XRandROffset(Generic[RationalT]):
+class XRandROffset(_XRandRBase, Generic[RationalT]):
     __slots__ = ('x', 'y')
     x: Optional[RationalT]
     y: Optional[RationalT]
@@ -39,21 +127,157 @@ class XRandROffset(Generic[RationalT]):
         self.y = y
 
 
-class XRandRGeometry(Generic[RationalT]):
-    __slots__ = ('dimensions', 'offset')
-    dimensions: Optional[XRandRDimensions[RationalT]]
-    offset: Optional[XRandROffset[RationalT]]
+class XRandRGeometry(_XRandRBase, Generic[RationalT]):
+    # The dimensions and the offset are stored inline instead of in separate
+    # XRandRDimensions and XRandROffset objects. The dimensions and offset
+    # attributes return views of the geometry, which read and write its
+    # width, height, x and y, or None if that part is not set.
+    __slots__ = ('width', 'height', 'x', 'y', '_parts')
+    width: Optional[RationalT]
+    height: Optional[RationalT]
+    x: Optional[RationalT]
+    y: Optional[RationalT]
+    _parts: int
+
+    _DIMENSIONS = 1
+    _OFFSET = 2
 
     def __init__(
             self,
             dimensions: Optional[XRandRDimensions[RationalT]] = None,
             offset: Optional[XRandROffset[RationalT]] = None
     ) -> None:
+        self._parts = 0
         self.dimensions = dimensions
         self.offset = offset
 
+    @classmethod
+    def from_values(
+            cls,
+            width: Optional[RationalT],
+            height: Optional[RationalT],
+            x: Optional[RationalT],
+            y: Optional[RationalT]
+    ) -> 'XRandRGeometry[RationalT]':
+        self: XRandRGeometry[RationalT] = object.__new__(cls)
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self._parts = cls._DIMENSIONS | cls._OFFSET
+        return self
+
+    @property
+    def dimensions(self) -> Optional[XRandRDimensions[RationalT]]:
+        if not self._parts & self._DIMENSIONS:
+            return None
+        return _XRandRGeometryDimensions(self)
 
-class XRandRBorder(Generic[RationalT]):
+    @dimensions.setter
+    def dimensions(
+            self,
+            dimensions: Optional[XRandRDimensions[RationalT]]
+    ) -> None:
+        if dimensions is None:
+            self.width = None
+            self.height = None
+            self._parts &= ~self._DIMENSIONS
+        else:
+            self.width = dimensions.width
+            self.height = dimensions.height
+            self._parts |= self._DIMENSIONS
+
+    @property
+    def offset(self) -> Optional[XRandROffset[RationalT]]:
+        if not self._parts & self._OFFSET:
+            return None
+        return _XRandRGeometryOffset(self)
+
+    @offset.setter
+    def offset(self, offset: Optional[XRandROffset[RationalT]]) -> None:
+        if offset is None:
+            self.x = None
+            self.y = None
+            self._parts &= ~self._OFFSET
+        else:
+            self.x = offset.x
+            self.y = offset.y
+            self._parts |= self._OFFSET
+
+
+class _XRandRGeometryDimensions(XRandRDimensions):
+    # Copies and pickles are plain XRandRDimensions objects.
+    __slots__ = ('_geometry',)
+    _caches = ('_hash', '_geometry')
+    _model_class = XRandRDimensions
+    _geometry: XRandRGeometry
+
+    def __init__(self, geometry: XRandRGeometry) -> None:
+        self._geometry = geometry
+
+    @property  # type: ignore
+    def width(self) -> Any:
+        return self._geometry.width
+
+    @width.setter
+    def width(self, width: Any) -> None:
+        self._geometry.width = width
+
+    @property  # type: ignore
+    def height(self) -> Any:
+        return self._geometry.height
+
+    @height.setter
+    def height(self, height: Any) -> None:
+        self._geometry.height = height
+
+    def __copy__(self) -> Any:
+        return XRandRDimensions(self.width, self.height)
+
+    def __deepcopy__(self, memo: Any) -> Any:
+        return XRandRDimensions(self.width, self.height)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return XRandRDimensions, (self.width, self.height)
+
+
+class _XRandRGeometryOffset(XRandROffset):
+    # Copies and pickles are plain XRandROffset objects.
+    __slots__ = ('_geometry',)
+    _caches = ('_hash', '_geometry')
+    _model_class = XRandROffset
+    _geometry: XRandRGeometry
+
+    def __init__(self, geometry: XRandRGeometry) -> None:
+        self._geometry = geometry
+
+    @property  # type: ignore
+    def x(self) -> Any:
+        return self._geometry.x
+
+    @x.setter
+    def x(self, x: Any) -> None:
+        self._geometry.x = x
+
+    @property  # type: ignore
+    def y(self) -> Any:
+        return self._geometry.y
+
+    @y.setter
+    def y(self, y: Any) -> None:
+        self._geometry.y = y
+
+    def __copy__(self) -> Any:
+        return XRandROffset(self.x, self.y)
+
+    def __deepcopy__(self, memo: Any) -> Any:
+        return XRandROffset(self.x, self.y)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return XRandROffset, (self.x, self.y)
+
+
+class XRandRBorder(_XRandRBase, Generic[RationalT]):
     __slots__ = ('left', 'top', 'right', 'bottom')
     left: Optional[RationalT]
     top: Optional[RationalT]
@@ -73,13 +297,18 @@ class XRandRBorder(Generic[RationalT]):
         self.bottom = bottom
 
 
-class XRandRTransform:
+class XRandRTransform(_XRandRBase):
+    # The matrix maps homogeneous output coordinates to framebuffer
+    # coordinates, row by row. Like the hash, the inverse is only cached by
+    # the frozen class (in _inverse).
     __slots__ = (
         'a', 'b', 'c',
         'd', 'e', 'f',
         'g', 'h', 'i',
-        'filter'
+        'filter',
+        '_inverse'
     )
+    _caches = ('_hash', '_inverse')
     a: Optional[Rational]
     b: Optional[Rational]
     c: Optional[Rational]
@@ -90,6 +319,7 @@ class XRandRTransform:
     h: Optional[Rational]
     i: Optional[Rational]
     filter: Optional[str]
+    _inverse: 'XRandRTransform'
 
     def __init__(
             self,
@@ -115,8 +345,123 @@ class XRandRTransform:
         self.i = i
         self.filter = filter
 
-
-class XRandRScreenDimensionsList:
+    @classmethod
+    def identity(cls, filter: Optional[str] = None) -> 'XRandRTransform':
+        return cls(1, 0, 0, 0, 1, 0, 0, 0, 1, filter)
+
+    @property
+    def matrix(self) -> Tuple[Rational, ...]:
+        matrix: Tuple[Optional[Rational], ...] = (
+            self.a, self.b, self.c,
+            self.d, self.e, self.f,
+            self.g, self.h, self.i
+        )
+        if None in matrix:
+            raise ValueError('Transform matrix is incomplete')
+        return matrix  # type: ignore
+
+    @property
+    def is_identity(self) -> bool:
+        return (self.a, self.b, self.c, self.d, self.e, self.f,
+                self.g, self.h, self.i) == (1, 0, 0, 0, 1, 0, 0, 0, 1)
+
+    @property
+    def is_affine(self) -> bool:
+        return self.g == 0 and self.h == 0 and self.i == 1
+
+    def compose(self, other: 'XRandRTransform') -> 'XRandRTransform':
+        # The result applies other first, then self.
+        a, b, c, d, e, f, g, h, i = self.matrix
+        o: Tuple[Rational, ...] = other.matrix
+        return XRandRTransform(
+            a * o[0] + b * o[3] + c * o[6],
+            a * o[1] + b * o[4] + c * o[7],
+            a * o[2] + b * o[5] + c * o[8],
+            d * o[0] + e * o[3] + f * o[6],
+            d * o[1] + e * o[4] + f * o[7],
+            d * o[2] + e * o[5] + f * o[8],
+            g * o[0] + h * o[3] + i * o[6],
+            g * o[1] + h * o[4] + i * o[7],
+            g * o[2] + h * o[5] + i * o[8],
+            self.filter
+        )
+
+    def invert(self) -> 'XRandRTransform':
+        a, b, c, d, e, f, g, h, i = self.matrix
+        A: Rational = e * i - f * h
+        B: Rational = f * g - d * i
+        C: Rational = d * h - e * g
+        determinant: Rational = a * A + b * B + c * C
+        if not determinant:
+            raise ValueError('Transform matrix is singular')
+        return XRandRTransform(
+            A / determinant,
+            (c * h - b * i) / determinant,
+            (b * f - c * e) / determinant,
+            B / determinant,
+            (a * i - c * g) / determinant,
+            (c * d - a * f) / determinant,
+            C / determinant,
+            (b * g - a * h) / determinant,
+            (a * e - b * d) / determinant,
+            self.filter
+        )
+
+    def apply(self, x: Rational, y: Rational) -> Tuple[float, float]:
+        a, b, c, d, e, f, g, h, i = self.matrix
+        w: Rational = g * x + h * y + i
+        if not w:
+            raise ValueError('Point is mapped to infinity')
+        return (a * x + b * y + c) / w, (d * x + e * y + f) / w
+
+    def apply_many(self, points: Any) -> Any:
+        # Points are either a NumPy array of shape (n, 2), which is
+        # transformed in a single vectorized operation, or a flat buffer of
+        # interleaved x and y doubles (or a list of them), which is
+        # returned as array('d').
+        if hasattr(points, 'ndim'):
+            return self._apply_numpy(points)
+
+        a, b, c, d, e, f, g, h, i = self.matrix
+        values: Sequence[float] = points \
+            if isinstance(points, (list, tuple)) \
+            else memoryview(points).cast('B').cast('d')
+        xs: Sequence[float] = values[0::2]
+        ys: Sequence[float] = values[1::2]
+        result: array.array = array.array('d', bytes(16 * len(xs)))
+        if g == 0 and h == 0:
+            if not i and xs:
+                raise ValueError('Point is mapped to infinity')
+            result[0::2] = array.array('d', [
+                (a * x + b * y + c) / i for x, y in zip(xs, ys)
+            ])
+            result[1::2] = array.array('d', [
+                (d * x + e * y + f) / i for x, y in zip(xs, ys)
+            ])
+        else:
+            ws: Sequence[float] = [g * x + h * y + i for x, y in zip(xs, ys)]
+            if 0 in ws:
+                raise ValueError('Point is mapped to infinity')
+            result[0::2] = array.array('d', [
+                (a * x + b * y + c) / w for x, y, w in zip(xs, ys, ws)
+            ])
+            result[1::2] = array.array('d', [
+                (d * x + e * y + f) / w for x, y, w in zip(xs, ys, ws)
+            ])
+        return result
+
+    def _apply_numpy(self, points: Any) -> Any:
+        import numpy
+        matrix: Any = numpy.array(self.matrix, dtype=float).reshape(3, 3)
+        points = numpy.asarray(points, dtype=float)
+        result: Any = points @ matrix[:2, :2].T + matrix[:2, 2]
+        w: Any = points @ matrix[2, :2] + matrix[2, 2]
+        if not w.all():
+            raise ValueError('Point is mapped to infinity')
+        return result / w[:, None]
+
+
+class XRandRScreenDimensionsList(_XRandRBase):
     __slots__ = ('minimum', 'current', 'maximum')
     minimum: Optional[XRandRDimensions[int]]
     current: Optional[XRandRDimensions[int]]
@@ -133,11 +478,13 @@ class XRandRScreenDimensionsList:
         self.maximum = maximum
 
 
-class XRandRScreen:
-    __slots__ = ('number', 'dimensions', 'outputs')
+class XRandRScreen(_XRandRBase):
+    __slots__ = ('number', 'dimensions', 'outputs', '_index')
+    _caches = ('_hash', '_index')
     number: int
     dimensions: Optional[XRandRScreenDimensionsList]
     outputs: Optional[Mapping[str, 'XRandROutput']]
+    _index: 'XRandRScreenIndex'
 
     def __init__(
             self,
@@ -149,8 +496,22 @@ class XRandRScreen:
         self.dimensions = dimensions
         self.outputs = outputs
 
+    @property
+    def index(self) -> 'XRandRScreenIndex':
+        # The index is built on first use and has to be rebuilt with
+        # reindex() after the outputs have been changed.
+        try:
+            return self._index
+        except AttributeError:
+            return self.reindex()
+
+    def reindex(self) -> 'XRandRScreenIndex':
+        from .indexes import XRandRScreenIndex
+        self._index = XRandRScreenIndex(self)
+        return self._index
 
-class XRandROutput:
+
+class XRandROutput(_XRandRBase):
     @enum.unique
     class Connection(enum.IntEnum):
         Connected = 0
@@ -166,7 +527,7 @@ class XRandROutput:
         Reflect_X = 16
         Reflect_Y = 32
 
-    class Mode:
+    class Mode(_XRandRBase):
         class Flags(enum.IntFlag):
             HSyncPositive = 1
             HSyncNegative = 2
@@ -338,7 +699,7 @@ class XRandROutput:
         self.modes = modes
 
 
-class XRandROutputProperties:
+class XRandROutputProperties(_XRandRBase):
     __slots__ = (
         'identifier',
         'timestamp',
@@ -364,7 +725,7 @@ class XRandROutputProperties:
         VerticalBGR = enum.auto()
         NoSubpixels = enum.auto()
 
-    class Gamma():
+    class Gamma(_XRandRBase):
         __slots__ = ('red', 'green', 'blue')
         red: Rational
         green: Rational
@@ -380,7 +741,7 @@ class XRandROutputProperties:
             self.green = green
             self.blue = blue
 
-    class OtherProperty():
+    class OtherProperty(_XRandRBase):
         __slots__ = ('name', 'value', 'range', 'supported')
         name: str
         value: Any
@@ -399,6 +760,16 @@ class XRandROutputProperties:
             self.range = range
             self.supported = supported
 
+    @property
+    def decoded_edid(self) -> Optional[XRandREdid]:
+        if not self.edid:
+            return None
+        try:
+            return decode_edid(self.edid)
+        except ValueError:
+            # Not an EDID, like the truncated ones some drivers report.
+            return None
+
     identifier: Optional[int]
     timestamp: Optional[int]
     subpixel_order: Optional[SubpixelOrder]
@@ -0,0 +1,210 @@
+import concurrent.futures
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .classes import XRandROutput, XRandRScreen
+from .configure import XRandRConfigurationOptions, _configure_outputs_args, \
+                       _configure_screens_args
+from .launcher import XRandRLauncher, default_launcher
+
+__all__ = ('XRandRConfigurationQueue',)
+
+_Options = XRandRConfigurationOptions
+
+# The units in which submissions are merged. Within one unit the latest
+# submission wins, the units of one output are combined.
+_output_attributes: Tuple[XRandRConfigurationOptions, ...] = (
+    _Options.ConfigureOutputMode | _Options.ConfigureOutputPosition,
+    _Options.ConfigureOutputRotation,
+    _Options.ConfigureOutputReflection,
+    _Options.ConfigureOutputPanning | _Options.ConfigureOutputTracking
+    | _Options.ConfigureOutputBorder,
+    _Options.ConfigureOutputProperties
+)
+
+
+class _Pending:
+    __slots__ = ('dimensions', 'primary', 'outputs', 'futures')
+    dimensions: Dict[int, XRandRScreen]
+    primary: Dict[int, Optional[str]]
+    outputs: Dict[Tuple[int, str],
+                  Dict[XRandRConfigurationOptions, XRandROutput]]
+    futures: List['concurrent.futures.Future[int]']
+
+    def __init__(self) -> None:
+        self.dimensions = {}
+        self.primary = {}
+        self.outputs = {}
+        self.futures = []
+
+
+class XRandRConfigurationQueue:
+    # Submissions are merged into one pending configuration until the
+    # applier thread picks it up, which happens at most once per
+    # min_interval. The futures of all merged submissions complete with the
+    # exit status of the single xrandr call. Unknown output properties are
+    # not queued, they need one xrandr call per property anyway.
+    __slots__ = ('display', 'launcher', 'min_interval', 'applied',
+                 '_pending', '_condition', '_thread', '_closed')
+    display: Optional[str]
+    launcher: XRandRLauncher
+    min_interval: float
+    applied: int
+    _pending: _Pending
+    _condition: threading.Condition
+    _thread: Optional[threading.Thread]
+    _closed: bool
+
+    def __init__(
+            self,
+            display: Optional[str] = None,
+            min_interval: float = 0.05,
+            launcher: XRandRLauncher = default_launcher
+    ) -> None:
+        self.display = display
+        self.launcher = launcher
+        self.min_interval = min_interval
+        self.applied = 0
+        self._pending = _Pending()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(
+            self,
+            screens: Union[Iterable[XRandRScreen], Dict[Any, XRandRScreen]],
+            config_options: XRandRConfigurationOptions =
+            ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties
+    ) -> 'concurrent.futures.Future[int]':
+        if isinstance(screens, dict):
+            screens = screens.values()
+        future: 'concurrent.futures.Future[int]' = \
+            concurrent.futures.Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Configuration queue is closed')
+            pending: _Pending = self._pending
+            for screen in screens:
+                self._merge(pending, screen, config_options)
+            pending.futures.append(future)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._apply_loop,
+                    name='xrandr-configuration-queue',
+                    daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    @staticmethod
+    def _merge(
+            pending: _Pending,
+            screen: XRandRScreen,
+            config_options: XRandRConfigurationOptions
+    ) -> None:
+        if config_options & _Options.ConfigureScreenDimensions:
+            pending.dimensions[screen.number] = screen
+        if config_options & _Options.ConfigureScreenPrimaryOutput:
+            pending.primary[screen.number] = next(
+                (name for name, output in (screen.outputs or {}).items()
+                 if output.primary),
+                None
+            )
+        for name, output in (screen.outputs or {}).items():
+            attributes: Dict[XRandRConfigurationOptions, XRandROutput] = \
+                pending.outputs.setdefault((screen.number, name), {})
+            for attribute in _output_attributes:
+                if config_options & attribute:
+                    attributes[attribute] = output
+
+    @staticmethod
+    def _args(pending: _Pending) -> List[str]:
+        numbers: List[int] = sorted(
+            set(pending.dimensions)
+            | set(pending.primary)
+            | {number for number, _ in pending.outputs}
+        )
+        args: List[str] = []
+        for number in numbers:
+            screen_args: List[str] = []
+            if number in pending.dimensions:
+                # Drop the leading --screen <number>.
+                screen_args.extend((_configure_screens_args(
+                    (XRandRScreen(
+                        number,
+                        pending.dimensions[number].dimensions
+                    ),),
+                    _Options.ConfigureScreenDimensions
+                ) or ())[2:])
+            primary: Optional[str] = pending.primary.get(number)
+            if number in pending.primary and primary is None:
+                screen_args.append('--noprimary')
+            elif primary is not None and \
+                    (number, primary) not in pending.outputs:
+                screen_args.extend(('--output', primary, '--primary'))
+            for (screen, name), attributes in pending.outputs.items():
+                if screen != number:
+                    continue
+                output_args: List[str] = \
+                    ['--primary'] if name == primary else []
+                for attribute, output in attributes.items():
+                    # Drop the leading --output <name>.
+                    output_args.extend((_configure_outputs_args(
+                        (output,),
+                        attribute
+                    ) or ())[2:])
+                if output_args:
+                    screen_args.extend(('--output', name))
+                    screen_args.extend(output_args)
+            if screen_args:
+                args.extend(('--screen', str(number)))
+                args.extend(screen_args)
+        return args
+
+    def _apply_loop(self) -> None:
+        last: Optional[float] = None
+        while True:
+            with self._condition:
+                while not self._pending.futures and not self._closed:
+                    self._condition.wait()
+                if not self._pending.futures:
+                    return
+            if last is not None:
+                delay: float = last + self.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            with self._condition:
+                pending: _Pending = self._pending
+                self._pending = _Pending()
+            last = time.monotonic()
+
+            try:
+                args: List[str] = self._args(pending)
+                status: int = 0
+                if args:
+                    status = self.launcher.run(args, self.display)[0]
+                    self.applied += 1
+            except BaseException as e:
+                for future in pending.futures:
+                    future.set_exception(e)
+            else:
+                for future in pending.futures:
+                    future.set_result(status)
+
+    def close(self, wait: bool = True) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread: Optional[threading.Thread] = self._thread
+        if wait and thread is not None:
+            thread.join()
+
+    def __enter__(self) -> 'XRandRConfigurationQueue':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -1,14 +1,16 @@
-import os
+import concurrent.futures
 import enum
-from typing import Dict, Iterable, List, Optional, Union
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
 from .classes import Any, XRandRBorder, XRandRDimensions, XRandRGeometry, \
                      XRandROffset, XRandROutput, XRandROutputProperties, \
                      XRandRScreen
+from .launcher import Argument, XRandRLauncher, default_launcher
 from .mappings import reflection_to_text, rotation_to_text
 
-__all__ = ('XRandRConfigurationOptions', 'configure_screens',
-           'configure_outputs')
+__all__ = ('XRandRConfigurationOptions', 'XRandRApplyResult',
+           'configure_screens', 'configure_outputs', 'configure_many')
 
 
 class XRandRConfigurationOptions(enum.Flag):
@@ -49,7 +51,9 @@ class XRandRConfigurationOptions(enum.Flag):
 def configure_screens(
         screens: Union[Iterable[XRandRScreen], Dict[str, XRandRScreen]],
         config_options: XRandRConfigurationOptions =
-        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties
+        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties,
+        display: Optional[str] = None,
+        validate_against: Optional[Mapping[Any, XRandRScreen]] = None
 ) -> None:
     if not config_options & XRandRConfigurationOptions.ConfigureAll:
         return
@@ -60,12 +64,23 @@ def configure_screens(
     else:
         _screens = screens
 
+    if validate_against is not None:
+        from .validation import XRandRValidationError, validate_screens
+        _screens = list(_screens)
+        violations = validate_screens(
+            _screens,
+            validate_against,
+            config_options
+        )
+        if violations:
+            raise XRandRValidationError(violations)
+
     args: Optional[Iterable[Union[str, bytes]]] = _configure_screens_args(
         _screens,
         config_options
     )
     if args:
-        os.spawnlp(os.P_WAIT, 'xrandr', 'xrandr', *args)
+        default_launcher.run(args, display)
 
     if not (config_options
             & XRandRConfigurationOptions.ConfigureUnknownOutputProperties):
@@ -79,7 +94,8 @@ def configure_screens(
                         screen.number,
                         output.name,
                         output.properties.other.values(),
-                        config_options
+                        config_options,
+                        display
                     )
 
 
@@ -87,7 +103,8 @@ def configure_outputs(
         screen_nr: int,
         outputs: Union[Iterable[XRandROutput], Dict[str, XRandROutput]],
         config_options: XRandRConfigurationOptions =
-        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties
+        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties,
+        display: Optional[str] = None
 ) -> None:
     if not config_options & XRandRConfigurationOptions.ConfigureOutputsAll:
         return
@@ -103,11 +120,7 @@ def configure_outputs(
         config_options
     )
     if args:
-        os.spawnlp(
-            os.P_WAIT,
-            'xrandr',
-            'xrandr', '--screen', str(screen_nr), *args
-        )
+        default_launcher.run(('--screen', str(screen_nr), *args), display)
 
     if not (config_options
             & XRandRConfigurationOptions.ConfigureUnknownOutputProperties):
@@ -119,8 +132,150 @@ def configure_outputs(
                 screen_nr,
                 output.name,
                 output.properties.other.values(),
-                config_options
+                config_options,
+                display
+            )
+
+
+class XRandRApplyResult:
+    __slots__ = ('display', 'status', 'latency', 'error')
+    display: str
+    status: Optional[int]
+    latency: float
+    error: Optional[BaseException]
+
+    def __init__(
+            self,
+            display: str,
+            status: Optional[int],
+            latency: float,
+            error: Optional[BaseException] = None
+    ) -> None:
+        self.display = display
+        self.status = status
+        self.latency = latency
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 0
+
+    def __repr__(self) -> str:
+        return '{}({!r}, {!r}, {:.3f}, {!r})'.format(
+            type(self).__qualname__,
+            self.display,
+            self.status,
+            self.latency,
+            self.error
+        )
+
+
+def configure_many(
+        targets: Union[Iterable[str], Mapping[str, Any]],
+        screens: Optional[Union[Iterable[XRandRScreen],
+                                Dict[str, XRandRScreen]]] = None,
+        config_options: XRandRConfigurationOptions =
+        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = None,
+        launcher: XRandRLauncher = default_launcher
+) -> Dict[str, XRandRApplyResult]:
+    # targets is either a list of displays that all get the given screens,
+    # or a mapping of displays to their own screens. The argument lists are
+    # built once per distinct set of screen objects. The timeout applies to
+    # all xrandr calls for one display together.
+    layouts: Dict[str, Tuple[XRandRScreen, ...]] = {}
+    if isinstance(targets, Mapping):
+        for display, _screens in targets.items():
+            layouts[display] = _screen_tuple(_screens)
+    else:
+        if screens is None:
+            raise TypeError('screens are required for a list of displays')
+        layout: Tuple[XRandRScreen, ...] = _screen_tuple(screens)
+        for display in targets:
+            if display in layouts:
+                raise ValueError(
+                    'Display {!r} is listed more than once'.format(display)
+                )
+            layouts[display] = layout
+
+    # Layouts are looked up by the identity of their screens, equal
+    # argument lists are then shared between the displays.
+    by_screens: Dict[Tuple[int, ...], Tuple[Tuple[Argument, ...], ...]] = {}
+    distinct: Dict[Tuple[Tuple[Argument, ...], ...],
+                   Tuple[Tuple[Argument, ...], ...]] = {}
+    argvs: Dict[str, Tuple[Tuple[Argument, ...], ...]] = {}
+    for display, layout in layouts.items():
+        key: Tuple[int, ...] = tuple(map(id, layout))
+        layout_argvs: Optional[Tuple[Tuple[Argument, ...], ...]] = \
+            by_screens.get(key)
+        if layout_argvs is None:
+            layout_argvs = tuple(
+                _configure_screens_argvs(layout, config_options)
             )
+            layout_argvs = distinct.setdefault(layout_argvs, layout_argvs)
+            by_screens[key] = layout_argvs
+        argvs[display] = layout_argvs
+
+    def apply(display: str) -> XRandRApplyResult:
+        start: float = time.monotonic()
+        status: int = 0
+        try:
+            for args in argvs[display]:
+                remaining: Optional[float] = None
+                if timeout is not None:
+                    remaining = max(0., start + timeout - time.monotonic())
+                status = launcher.run(args, display, timeout=remaining)[0]
+                if status:
+                    break
+        except Exception as e:
+            return XRandRApplyResult(display, None,
+                                     time.monotonic() - start, e)
+        return XRandRApplyResult(display, status, time.monotonic() - start)
+
+    results: Dict[str, XRandRApplyResult] = {}
+    with concurrent.futures.ThreadPoolExecutor(
+            max(1, min(max_concurrency, len(layouts)))
+    ) as executor:
+        for result in executor.map(apply, layouts):
+            results[result.display] = result
+    return results
+
+
+def _screen_tuple(
+        screens: Union[Iterable[XRandRScreen], Dict[str, XRandRScreen]]
+) -> Tuple[XRandRScreen, ...]:
+    if isinstance(screens, dict):
+        return tuple(screens.values())
+    return tuple(screens)
+
+
+def _configure_screens_argvs(
+        screens: Iterable[XRandRScreen],
+        config_options: XRandRConfigurationOptions
+) -> List[Tuple[Argument, ...]]:
+    # The xrandr calls configure_screens() makes, in the same order.
+    if not config_options & XRandRConfigurationOptions.ConfigureAll:
+        return []
+
+    argvs: List[Tuple[Argument, ...]] = []
+    args: Optional[List[str]] = _configure_screens_args(
+        screens,
+        config_options
+    )
+    if args:
+        argvs.append(tuple(args))
+    for screen in screens:
+        if screen.number >= 0 and screen.outputs:
+            for output in screen.outputs.values():
+                if output.properties and output.properties.other:
+                    argvs.extend(_configure_output_unknown_properties_args(
+                        screen.number,
+                        output.name,
+                        output.properties.other.values(),
+                        config_options
+                    ))
+    return argvs
 
 
 def _configure_screens_args(
@@ -133,6 +288,9 @@ def _configure_screens_args(
     args: List[str] = []
 
     for screen in screens:
+        # Screens with negative numbers exist on no X server.
+        if screen.number < 0:
+            continue
         _args: List[str] = []
 
         if ((config_options
@@ -352,7 +510,7 @@ def _merge_geometry_objects(
     if b is None:
         return a
 
-    ret: XRandRGeometry[int] = XRandRGeometry[int]()
+    ret: XRandRGeometry[int] = XRandRGeometry()
 
     if a.dimensions or b.dimensions:
         ret.dimensions = XRandRDimensions(None, None)
@@ -387,7 +545,7 @@ def _merge_border_objects(
     if b is None:
         return a
 
-    return XRandRBorder[int](
+    return XRandRBorder(
         a.left if a.left is not None else b.left,
         a.top if a.top is not None else b.top,
         a.right if a.right is not None else b.right,
@@ -400,7 +558,7 @@ def _configure_output_properties_args(
         config_options: XRandRConfigurationOptions
 ) -> Optional[List[str]]:
     if not (config_options
-            & ~XRandRConfigurationOptions.ConfigureOutputProperties):
+            & XRandRConfigurationOptions.ConfigureOutputProperties):
         return None
 
     args: List[str] = []
@@ -454,9 +612,6 @@ def _configure_output_properties_args(
                 and properties.transform.filter != 'bilinear'):
             args.extend(('--filter', str(properties.transform.filter)))
 
-    if properties.guid:
-        args.extend(('--set', 'GUID', _propval_to_str(properties.guid)))
-
     return args
 
 
@@ -464,28 +619,43 @@ def _configure_output_unknown_properties(
         screen_nr: int,
         output_name: str,
         properties: Iterable[XRandROutputProperties.OtherProperty],
-        config_options: XRandRConfigurationOptions
+        config_options: XRandRConfigurationOptions,
+        display: Optional[str] = None
 ) -> None:
+    for args in _configure_output_unknown_properties_args(
+            screen_nr,
+            output_name,
+            properties,
+            config_options
+    ):
+        default_launcher.run(args, display)
+
+
+def _configure_output_unknown_properties_args(
+        screen_nr: int,
+        output_name: str,
+        properties: Iterable[XRandROutputProperties.OtherProperty],
+        config_options: XRandRConfigurationOptions
+) -> List[Tuple[str, ...]]:
     if not (config_options
             & XRandRConfigurationOptions.ConfigureUnknownOutputProperties):
-        return
-
-    for _property in properties:
-        if _property.name:
-            os.spawnlp(
-                os.P_WAIT,
-                'xrandr',
-                'xrandr',
-                '--screen',
-                str(screen_nr),
-                '--output',
-                str(output_name),
-                '--set',
-                str(_property.name),
-                _propval_to_str(_property.value)
-                if _property.value is not None
-                else ''
-            )
+        return []
+
+    return [
+        (
+            '--screen',
+            str(screen_nr),
+            '--output',
+            str(output_name),
+            '--set',
+            str(_property.name),
+            _propval_to_str(_property.value)
+            if _property.value is not None
+            else ''
+        )
+        for _property in properties
+        if _property.name
+    ]
 
 
 def _propval_to_str(v: Any) -> str:
@@ -0,0 +1,132 @@
+import enum
+from typing import Any, Dict, Hashable, List, Mapping, Sequence, Tuple
+
+from .classes import XRandRGeometry, _XRandRBase
+from .frozen import _frozen_class_set
+
+__all__ = ('XRandRChange', 'diff')
+
+# Attributes compared instead of the fields, for classes that do not store
+# their public structure in the fields.
+_diff_attributes: Dict[type, Tuple[str, ...]] = {
+    XRandRGeometry: ('dimensions', 'offset')
+}
+
+
+class XRandRChange:
+    @enum.unique
+    class Kind(enum.IntEnum):
+        Added = 0
+        Removed = 1
+        Changed = 2
+
+    __slots__ = ('kind', 'path', 'old', 'new')
+    kind: Kind
+    path: Tuple[Hashable, ...]
+    old: Any
+    new: Any
+
+    def __init__(
+            self,
+            kind: Kind,
+            path: Tuple[Hashable, ...],
+            old: Any = None,
+            new: Any = None
+    ) -> None:
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self) -> str:
+        return '{}({!s}, {!r}, {!r}, {!r})'.format(
+            type(self).__qualname__,
+            self.kind.name,
+            self.path,
+            self.old,
+            self.new
+        )
+
+
+def diff(old: Any, new: Any) -> List[XRandRChange]:
+    changes: List[XRandRChange] = []
+    _diff((), old, new, changes)
+    return changes
+
+
+def _diff(
+        path: Tuple[Hashable, ...],
+        old: Any,
+        new: Any,
+        changes: List[XRandRChange]
+) -> None:
+    if old is new:
+        return
+
+    if (isinstance(old, _XRandRBase)
+            and getattr(new, '_model_class', None) is old._model_class):
+        # Frozen subtrees with identical structural hashes are skipped
+        # without looking at their contents. Their hashes are cached, the
+        # ones of mutable objects would have to be computed from the whole
+        # subtree every time.
+        if (type(old) in _frozen_class_set
+                and type(new) in _frozen_class_set
+                and hash(old) == hash(new)):
+            return
+        for field in _diff_attributes.get(old._model_class, old._fields):
+            _diff(
+                path + (field.lstrip('_'),),
+                getattr(old, field),
+                getattr(new, field),
+                changes
+            )
+    elif isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key, value in old.items():
+            if key in new:
+                _diff(path + (key,), value, new[key], changes)
+            else:
+                changes.append(XRandRChange(
+                    XRandRChange.Kind.Removed,
+                    path + (key,),
+                    old=value
+                ))
+        for key, value in new.items():
+            if key not in old:
+                changes.append(XRandRChange(
+                    XRandRChange.Kind.Added,
+                    path + (key,),
+                    new=value
+                ))
+    elif (isinstance(old, (list, tuple))
+          and isinstance(new, (list, tuple))):
+        _diff_sequences(path, old, new, changes)
+    elif type(old) is not type(new) or old != new:
+        changes.append(XRandRChange(
+            XRandRChange.Kind.Changed,
+            path,
+            old,
+            new
+        ))
+
+
+def _diff_sequences(
+        path: Tuple[Hashable, ...],
+        old: Sequence[Any],
+        new: Sequence[Any],
+        changes: List[XRandRChange]
+) -> None:
+    common: int = min(len(old), len(new))
+    for index in range(common):
+        _diff(path + (index,), old[index], new[index], changes)
+    for index in range(common, len(old)):
+        changes.append(XRandRChange(
+            XRandRChange.Kind.Removed,
+            path + (index,),
+            old=old[index]
+        ))
+    for index in range(common, len(new)):
+        changes.append(XRandRChange(
+            XRandRChange.Kind.Added,
+            path + (index,),
+            new=new[index]
+        ))
@@ -0,0 +1,189 @@
+import collections
+import hashlib
+import struct
+import threading
+from typing import Optional, Sequence, Tuple
+
+__all__ = ('XRandREdid', 'decode_edid')
+
+_EDID_HEADER: bytes = b'\x00\xff\xff\xff\xff\xff\xff\x00'
+_EDID_BLOCK_SIZE: int = 128
+_CTA_EXTENSION_TAG: int = 0x02
+
+
+class XRandREdid:
+    class DetailedTiming:
+        __slots__ = ('pixel_clock', 'h_active', 'h_blanking', 'h_sync_offset',
+                     'h_sync_width', 'v_active', 'v_blanking',
+                     'v_sync_offset', 'v_sync_width', 'width_mm',
+                     'height_mm', 'interlaced')
+        pixel_clock: int
+        h_active: int
+        h_blanking: int
+        h_sync_offset: int
+        h_sync_width: int
+        v_active: int
+        v_blanking: int
+        v_sync_offset: int
+        v_sync_width: int
+        width_mm: int
+        height_mm: int
+        interlaced: bool
+
+        def __init__(self, descriptor: bytes) -> None:
+            d: bytes = descriptor
+            self.pixel_clock = (d[0] | d[1] << 8) * 10000
+            self.h_active = d[2] | (d[4] & 0xf0) << 4
+            self.h_blanking = d[3] | (d[4] & 0x0f) << 8
+            self.v_active = d[5] | (d[7] & 0xf0) << 4
+            self.v_blanking = d[6] | (d[7] & 0x0f) << 8
+            self.h_sync_offset = d[8] | (d[11] & 0xc0) << 2
+            self.h_sync_width = d[9] | (d[11] & 0x30) << 4
+            self.v_sync_offset = d[10] >> 4 | (d[11] & 0x0c) << 2
+            self.v_sync_width = d[10] & 0x0f | (d[11] & 0x03) << 4
+            self.width_mm = d[12] | (d[14] & 0xf0) << 4
+            self.height_mm = d[13] | (d[14] & 0x0f) << 8
+            self.interlaced = bool(d[17] & 0x80)
+
+        @property
+        def refresh(self) -> float:
+            total: int = ((self.h_active + self.h_blanking)
+                          * (self.v_active + self.v_blanking))
+            if not total:
+                return 0
+            return self.pixel_clock / total
+
+    __slots__ = ('manufacturer', 'product_code', 'serial_number',
+                 'manufacture_week', 'manufacture_year', 'version',
+                 'width_cm', 'height_cm', 'monitor_name', 'monitor_serial',
+                 'text', 'detailed_timings', 'cta_revision', 'video_codes',
+                 'vendor_ouis', 'cta_detailed_timings')
+    manufacturer: str
+    product_code: int
+    serial_number: int
+    manufacture_week: int
+    manufacture_year: int
+    version: Tuple[int, int]
+    width_cm: int
+    height_cm: int
+    monitor_name: Optional[str]
+    monitor_serial: Optional[str]
+    text: Optional[str]
+    detailed_timings: Sequence[DetailedTiming]
+    cta_revision: Optional[int]
+    video_codes: Sequence[int]
+    vendor_ouis: Sequence[int]
+    cta_detailed_timings: Sequence[DetailedTiming]
+
+    def __init__(self, data: bytes) -> None:
+        if (len(data) < _EDID_BLOCK_SIZE
+                or data[:len(_EDID_HEADER)] != _EDID_HEADER):
+            raise ValueError('Not an EDID base block')
+
+        manufacturer: int = data[8] << 8 | data[9]
+        self.manufacturer = ''.join(
+            chr(ord('A') - 1 + (manufacturer >> shift & 0x1f))
+            for shift in (10, 5, 0)
+        )
+        self.product_code, self.serial_number = \
+            struct.unpack_from('<HI', data, 10)
+        self.manufacture_week = data[16]
+        self.manufacture_year = data[17] + 1990
+        self.version = (data[18], data[19])
+        self.width_cm = data[21]
+        self.height_cm = data[22]
+
+        self.monitor_name = None
+        self.monitor_serial = None
+        self.text = None
+        detailed_timings = []
+        for offset in range(54, 126, 18):
+            descriptor: bytes = data[offset:offset + 18]
+            if descriptor[0] or descriptor[1]:
+                detailed_timings.append(
+                    XRandREdid.DetailedTiming(descriptor)
+                )
+            elif descriptor[3] == 0xfc:
+                self.monitor_name = _descriptor_text(descriptor)
+            elif descriptor[3] == 0xff:
+                self.monitor_serial = _descriptor_text(descriptor)
+            elif descriptor[3] == 0xfe:
+                self.text = _descriptor_text(descriptor)
+        self.detailed_timings = tuple(detailed_timings)
+
+        self.cta_revision = None
+        self.video_codes = ()
+        self.vendor_ouis = ()
+        self.cta_detailed_timings = ()
+        for offset in range(_EDID_BLOCK_SIZE,
+                            len(data) - _EDID_BLOCK_SIZE + 1,
+                            _EDID_BLOCK_SIZE):
+            if data[offset] == _CTA_EXTENSION_TAG:
+                self._decode_cta(data[offset:offset + _EDID_BLOCK_SIZE])
+                break
+
+    def _decode_cta(self, block: bytes) -> None:
+        self.cta_revision = block[1]
+        dtd_offset: int = block[2]
+        if dtd_offset < 4 or dtd_offset > _EDID_BLOCK_SIZE - 1:
+            dtd_offset = 4
+
+        video_codes = []
+        vendor_ouis = []
+        offset: int = 4
+        while offset < dtd_offset:
+            tag: int = block[offset] >> 5
+            length: int = block[offset] & 0x1f
+            payload: bytes = block[offset + 1:offset + 1 + length]
+            if tag == 2:
+                for svd in payload:
+                    # Codes 129 to 192 mark native formats 1 to 64.
+                    if 129 <= svd <= 192:
+                        svd &= 0x7f
+                    video_codes.append(svd)
+            elif tag == 3 and length >= 3:
+                vendor_ouis.append(
+                    payload[0] | payload[1] << 8 | payload[2] << 16
+                )
+            offset += 1 + length
+        self.video_codes = tuple(video_codes)
+        self.vendor_ouis = tuple(vendor_ouis)
+
+        cta_detailed_timings = []
+        for offset in range(dtd_offset, _EDID_BLOCK_SIZE - 18, 18):
+            descriptor: bytes = block[offset:offset + 18]
+            if not (descriptor[0] or descriptor[1]):
+                break
+            cta_detailed_timings.append(
+                XRandREdid.DetailedTiming(descriptor)
+            )
+        self.cta_detailed_timings = tuple(cta_detailed_timings)
+
+
+def _descriptor_text(descriptor: bytes) -> str:
+    return descriptor[5:18].split(b'\n', 1)[0] \
+        .decode('cp437').rstrip(' ')
+
+
+_EDID_CACHE_SIZE: int = 64
+_edid_cache: 'collections.OrderedDict[bytes, XRandREdid]' = \
+    collections.OrderedDict()
+_edid_cache_lock: threading.Lock = threading.Lock()
+
+
+def decode_edid(data: bytes) -> XRandREdid:
+    # Decoded EDIDs are shared between all callers, they must not be
+    # modified.
+    digest: bytes = hashlib.blake2b(data, digest_size=16).digest()
+    with _edid_cache_lock:
+        edid: Optional[XRandREdid] = _edid_cache.get(digest)
+        if edid is not None:
+            _edid_cache.move_to_end(digest)
+            return edid
+
+    edid = XRandREdid(data)
+    with _edid_cache_lock:
+        _edid_cache[digest] = edid
+        while len(_edid_cache) > _EDID_CACHE_SIZE:
+            _edid_cache.popitem(last=False)
+    return edid
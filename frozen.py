@@ -0,0 +1,327 @@
+import collections
+import dataclasses
+from typing import Any, Deque, Dict, Iterator, List, Mapping, \
+                   MutableMapping, Optional, Tuple, Type
+
+from .classes import XRandRBorder, XRandRDimensions, XRandRGeometry, \
+                     XRandROffset, XRandROutput, XRandROutputProperties, \
+                     XRandRScreen, XRandRScreenDimensionsList, \
+                     XRandRTransform, _XRandRBase, _structural_hash
+from .modetable import XRandRModeTable
+
+__all__ = ('XRandRFrozenMapping', 'XRandRHistory', 'freeze', 'evolve')
+
+Pool = MutableMapping[Any, Any]
+
+
+class XRandRFrozenMapping(Mapping[Any, Any]):
+    __slots__ = ('_data', '_hash')
+    _data: Dict[Any, Any]
+    _hash: int
+
+    def __init__(self, data: Optional[Mapping[Any, Any]] = None) -> None:
+        self._data = dict(data) if data is not None else {}
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, XRandRFrozenMapping):
+            if hash(self) != hash(other):
+                return False
+            return self._data == other._data
+        if isinstance(other, Mapping):
+            return self._data == dict(other.items())
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        self._hash = _structural_hash(self._data)
+        return self._hash
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        return self
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(type(self).__qualname__, self._data)
+
+
+def _frozen_setattr(self: _XRandRBase, name: str, value: Any) -> None:
+    if name not in self._caches:
+        raise dataclasses.FrozenInstanceError(
+            'cannot assign to field {!r}'.format(name)
+        )
+    object.__setattr__(self, name, value)
+
+
+def _frozen_delattr(self: _XRandRBase, name: str) -> None:
+    raise dataclasses.FrozenInstanceError(
+        'cannot delete field {!r}'.format(name)
+    )
+
+
+def _frozen_hash(self: _XRandRBase) -> int:
+    # Frozen objects cannot change, so their hash is only computed once.
+    try:
+        return self._hash
+    except AttributeError:
+        pass
+    self._hash = self._model_class.__hash__(self)
+    return self._hash
+
+
+def _frozen_deepcopy(self: _XRandRBase, memo: Dict[int, Any]) -> Any:
+    # Frozen objects only hold frozen and immutable values.
+    return self
+
+
+def _frozen_invert(self: XRandRTransform) -> XRandRTransform:
+    # Frozen transforms cannot change, so their inverse is only computed
+    # once.
+    try:
+        return self._inverse
+    except AttributeError:
+        pass
+    inverse: XRandRTransform = freeze(XRandRTransform.invert(self))
+    inverse._inverse = self
+    self._inverse = inverse
+    return inverse
+
+
+def _frozen_eq(self: _XRandRBase, other: object) -> bool:
+    if (type(other) in _frozen_class_set
+            and hash(self) != hash(other)):
+        return False
+    return self._model_class.__eq__(self, other)
+
+
+def freeze(value: Any, pool: Optional[Pool] = None) -> Any:
+    if pool is not None:
+        frozen: Any = _freeze(value, pool)
+        return pool.setdefault(frozen, frozen)
+    return _freeze(value, pool)
+
+
+def _freeze(value: Any, pool: Optional[Pool]) -> Any:
+    cls: type = type(value)
+    if cls in _frozen_class_set:
+        if pool is None or pool.get(value) is value:
+            return value
+        # Frozen already, but not interned, like the objects evolve()
+        # creates. Pooled objects only hold pooled children, so the
+        # children only have to be interned here.
+        children: List[Any] = [
+            _freeze_child(getattr(value, field), pool)
+            for field in cls._fields
+        ]
+        if all(child is getattr(value, field)
+               for child, field in zip(children, cls._fields)):
+            return value
+        interned: Any = object.__new__(cls)
+        for field, child in zip(cls._fields, children):
+            object.__setattr__(interned, field, child)
+        return interned
+    if isinstance(value, _XRandRBase):
+        model_cls: type = value._model_class
+        frozen: Any = object.__new__(_frozen_classes[model_cls])
+        for field in model_cls._fields:
+            object.__setattr__(
+                frozen,
+                field,
+                _freeze_child(getattr(value, field), pool)
+            )
+        return frozen
+    if isinstance(value, (list, tuple, XRandRModeTable)):
+        return tuple(_freeze_child(v, pool) for v in value)
+    if cls is XRandRFrozenMapping and (
+            pool is None or pool.get(value) is value):
+        return value
+    if isinstance(value, Mapping):
+        return XRandRFrozenMapping({
+            k: _freeze_child(v, pool) for k, v in value.items()
+        })
+    return value
+
+
+def _freeze_child(value: Any, pool: Optional[Pool]) -> Any:
+    if isinstance(value,
+                  (_XRandRBase, list, tuple, XRandRModeTable, Mapping)):
+        return freeze(value, pool)
+    return value
+
+
+def evolve(obj: Any, **changes: Any) -> Any:
+    cls: type = type(obj)
+    if cls not in _frozen_class_set:
+        raise TypeError('{} is not frozen'.format(cls.__qualname__))
+
+    # The changes are applied to a mutable copy, so that properties like
+    # XRandRGeometry.dimensions can be changed as well as fields.
+    model_cls: type = cls._model_class
+    fields: Tuple[str, ...] = cls._fields
+    copy: Any = object.__new__(model_cls)
+    for field in fields:
+        object.__setattr__(copy, field, getattr(obj, field))
+    for name, value in changes.items():
+        if isinstance(getattr(model_cls, name, None), property) \
+                or name in fields:
+            setattr(copy, name, value)
+        elif '_' + name in fields:
+            setattr(copy, '_' + name, value)
+        else:
+            raise TypeError('{} has no field {!r}'.format(
+                cls.__qualname__,
+                name
+            ))
+
+    new: Any = object.__new__(cls)
+    for field in fields:
+        value = getattr(copy, field)
+        if value is not getattr(obj, field):
+            value = freeze(value)
+        object.__setattr__(new, field, value)
+    return new
+
+
+# Methods that the frozen classes override on top of the common ones.
+_frozen_methods: Dict[type, Dict[str, Any]] = {
+    XRandRTransform: {'invert': _frozen_invert}
+}
+
+
+def _make_frozen_class(cls: Type[_XRandRBase]) -> Type[_XRandRBase]:
+    return type(cls)(
+        'Frozen' + cls.__name__,
+        (cls,),
+        {
+            '__slots__': (),
+            '__module__': __name__,
+            '__qualname__': 'Frozen' + cls.__qualname__,
+            '_model_class': cls,
+            '__setattr__': _frozen_setattr,
+            '__delattr__': _frozen_delattr,
+            '__hash__': _frozen_hash,
+            '__eq__': _frozen_eq,
+            '__deepcopy__': _frozen_deepcopy,
+            'evolve': evolve,
+            **_frozen_methods.get(cls, {})
+        }
+    )
+
+
+_frozen_classes: Dict[type, type] = {
+    cls: _make_frozen_class(cls)
+    for cls in (
+        XRandRDimensions,
+        XRandROffset,
+        XRandRGeometry,
+        XRandRBorder,
+        XRandRTransform,
+        XRandRScreenDimensionsList,
+        XRandRScreen,
+        XRandROutput,
+        XRandROutput.Mode,
+        XRandROutputProperties,
+        XRandROutputProperties.Gamma,
+        XRandROutputProperties.OtherProperty
+    )
+}
+_frozen_class_set = frozenset(_frozen_classes.values())
+
+
+def _children(value: Any) -> Iterator[Any]:
+    if isinstance(value, _XRandRBase):
+        for field in value._fields:
+            yield getattr(value, field)
+    elif isinstance(value, tuple):
+        yield from value
+    elif isinstance(value, XRandRFrozenMapping):
+        yield from value.values()
+
+
+class XRandRHistory:
+    __slots__ = ('max_objects', 'max_snapshots', '_snapshots', '_pool',
+                 '_refcounts')
+    max_objects: int
+    max_snapshots: Optional[int]
+    _snapshots: Deque[Any]
+    _pool: Dict[Any, Any]
+    _refcounts: Dict[int, int]
+
+    def __init__(
+            self,
+            max_objects: int,
+            max_snapshots: Optional[int] = None
+    ) -> None:
+        self.max_objects = max_objects
+        self.max_snapshots = max_snapshots
+        self._snapshots = collections.deque()
+        self._pool = {}
+        self._refcounts = {}
+
+    @property
+    def object_count(self) -> int:
+        return len(self._refcounts)
+
+    def append(self, snapshot: Any) -> Any:
+        frozen: Any = freeze(snapshot, self._pool)
+        self._snapshots.append(frozen)
+        self._incref(frozen)
+
+        while len(self._snapshots) > 1 and (
+                len(self._refcounts) > self.max_objects
+                or (self.max_snapshots is not None
+                    and len(self._snapshots) > self.max_snapshots)):
+            self._decref(self._snapshots.popleft())
+
+        return frozen
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+        self._pool.clear()
+        self._refcounts.clear()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def __getitem__(self, index: int) -> Any:
+        return self._snapshots[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._snapshots)
+
+    def _incref(self, value: Any) -> None:
+        if not isinstance(value, (_XRandRBase, tuple, XRandRFrozenMapping)):
+            return
+        count: int = self._refcounts.get(id(value), 0)
+        self._refcounts[id(value)] = count + 1
+        if count == 0:
+            for child in _children(value):
+                self._incref(child)
+
+    def _decref(self, value: Any) -> None:
+        if not isinstance(value, (_XRandRBase, tuple, XRandRFrozenMapping)):
+            return
+        count: int = self._refcounts[id(value)] - 1
+        if count:
+            self._refcounts[id(value)] = count
+            return
+        del self._refcounts[id(value)]
+        if self._pool.get(value) is value:
+            del self._pool[value]
+        for child in _children(value):
+            self._decref(child)
@@ -0,0 +1,115 @@
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .classes import XRandROutput, XRandRScreen
+
+__all__ = ('XRandRScreenIndex',)
+
+
+class XRandRScreenIndex:
+    # Lookups for outputs and modes that are not keyed by output name.
+    # Where several outputs share a key, the lists keep the output order of
+    # the screen; the single-valued maps keep the first output or mode.
+    __slots__ = ('outputs', 'by_crtc', 'by_edid', 'by_connection',
+                 'modes_by_id', 'outputs_by_mode_id', 'modes_by_size',
+                 'mode_lists_by_size', 'outputs_by_supported_crtc',
+                 'current_modes', 'preferred_modes')
+    outputs: Mapping[str, XRandROutput]
+    by_crtc: Dict[int, XRandROutput]
+    by_edid: Dict[bytes, XRandROutput]
+    by_connection: Dict[XRandROutput.Connection, List[XRandROutput]]
+    modes_by_id: Dict[int, XRandROutput.Mode]
+    outputs_by_mode_id: Dict[int, List[XRandROutput]]
+    modes_by_size: Dict[Tuple[str, int, int], XRandROutput.Mode]
+    mode_lists_by_size: Dict[Tuple[str, int, int], List[XRandROutput.Mode]]
+    outputs_by_supported_crtc: Dict[int, List[XRandROutput]]
+    current_modes: Dict[str, XRandROutput.Mode]
+    preferred_modes: Dict[str, XRandROutput.Mode]
+
+    def __init__(self, screen: XRandRScreen) -> None:
+        self.outputs = screen.outputs or {}
+        self.by_crtc = {}
+        self.by_edid = {}
+        self.by_connection = {}
+        self.modes_by_id = {}
+        self.outputs_by_mode_id = {}
+        self.modes_by_size = {}
+        self.mode_lists_by_size = {}
+        self.outputs_by_supported_crtc = {}
+        self.current_modes = {}
+        self.preferred_modes = {}
+
+        for name, output in self.outputs.items():
+            properties = output.properties
+            if properties is not None:
+                if properties.crtc is not None:
+                    self.by_crtc.setdefault(properties.crtc, output)
+                if properties.edid:
+                    self.by_edid.setdefault(properties.edid, output)
+                for crtc in properties.crtcs or ():
+                    outputs_for_crtc: List[XRandROutput] = \
+                        self.outputs_by_supported_crtc.setdefault(crtc, [])
+                    if not outputs_for_crtc \
+                            or outputs_for_crtc[-1] is not output:
+                        outputs_for_crtc.append(output)
+            if output.connection is not None:
+                self.by_connection.setdefault(output.connection, []) \
+                    .append(output)
+
+            for mode in output.modes or ():
+                if mode.id is not None:
+                    self.modes_by_id.setdefault(mode.id, mode)
+                    outputs: List[XRandROutput] = \
+                        self.outputs_by_mode_id.setdefault(mode.id, [])
+                    if not outputs or outputs[-1] is not output:
+                        outputs.append(output)
+                if mode.width is not None and mode.height is not None:
+                    size: Tuple[str, int, int] = \
+                        (name, mode.width, mode.height)
+                    self.modes_by_size.setdefault(size, mode)
+                    self.mode_lists_by_size.setdefault(size, []) \
+                        .append(mode)
+                if mode.current and name not in self.current_modes:
+                    self.current_modes[name] = mode
+                if mode.preferred and name not in self.preferred_modes:
+                    self.preferred_modes[name] = mode
+
+    @property
+    def connected(self) -> Sequence[XRandROutput]:
+        return self.by_connection.get(XRandROutput.Connection.Connected, ())
+
+    def current_mode(
+            self,
+            output: Union[str, XRandROutput]
+    ) -> Optional[XRandROutput.Mode]:
+        return self._mode(output, self.current_modes, 'current')
+
+    def preferred_mode(
+            self,
+            output: Union[str, XRandROutput]
+    ) -> Optional[XRandROutput.Mode]:
+        return self._mode(output, self.preferred_modes, 'preferred')
+
+    def _mode(
+            self,
+            output: Union[str, XRandROutput],
+            modes: Dict[str, XRandROutput.Mode],
+            flag: str
+    ) -> Optional[XRandROutput.Mode]:
+        if isinstance(output, str):
+            return modes.get(output)
+        if self.outputs.get(output.name) is output:
+            return modes.get(output.name)
+        # Not an output of the indexed screen.
+        return _flagged_mode(output, flag)
+
+
+def _flagged_mode(
+        output: XRandROutput,
+        flag: str
+) -> Optional[XRandROutput.Mode]:
+    # The first mode with the flag set, looked up in the output itself
+    # instead of an index that may be older than the output.
+    for mode in output.modes or ():
+        if getattr(mode, flag):
+            return mode
+    return None
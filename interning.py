@@ -0,0 +1,49 @@
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from .classes import XRandROutput, XRandRScreen
+from .frozen import freeze
+
+__all__ = ('XRandRModeInternTable',)
+
+
+class XRandRModeInternTable:
+    # Interned modes are frozen, so they can be shared between outputs and
+    # snapshots. The per-output current and preferred flags are part of the
+    # key, which means there are at most four shared variants per modeline.
+    __slots__ = ('_modes',)
+    _modes: Dict[Tuple[Any, ...], XRandROutput.Mode]
+
+    def __init__(self) -> None:
+        self._modes = {}
+
+    def intern(self, mode: XRandROutput.Mode) -> XRandROutput.Mode:
+        key: Tuple[Any, ...] = tuple(
+            getattr(mode, field) for field in XRandROutput.Mode._fields
+        )
+        try:
+            return self._modes[key]
+        except KeyError:
+            pass
+        shared: XRandROutput.Mode = freeze(mode)
+        self._modes[key] = shared
+        return shared
+
+    def intern_modes(
+            self,
+            modes: Iterable[XRandROutput.Mode]
+    ) -> List[XRandROutput.Mode]:
+        return [self.intern(mode) for mode in modes]
+
+    def intern_screens(self, screens: Mapping[Any, XRandRScreen]) -> None:
+        for screen in screens.values():
+            if not screen.outputs:
+                continue
+            for output in screen.outputs.values():
+                if output.modes:
+                    output.modes = self.intern_modes(output.modes)
+
+    def clear(self) -> None:
+        self._modes.clear()
+
+    def __len__(self) -> int:
+        return len(self._modes)
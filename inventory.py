@@ -0,0 +1,326 @@
+import hashlib
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .classes import XRandROutput, XRandRScreen, XRandRTransform
+from .edid import XRandREdid, decode_edid
+
+__all__ = ('XRandRInventory',)
+
+Snapshot = Tuple[str, Mapping[Any, XRandRScreen], Optional[float]]
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    taken_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS screens (
+    id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    number INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    max_width INTEGER,
+    max_height INTEGER
+);
+CREATE TABLE IF NOT EXISTS edids (
+    digest BLOB PRIMARY KEY,
+    data BLOB NOT NULL,
+    manufacturer TEXT,
+    product_code INTEGER,
+    serial_number INTEGER,
+    monitor_name TEXT,
+    monitor_serial TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outputs (
+    id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    screen_id INTEGER NOT NULL REFERENCES screens (id),
+    name TEXT NOT NULL,
+    connection INTEGER,
+    is_primary INTEGER NOT NULL,
+    crtc INTEGER,
+    width INTEGER,
+    height INTEGER,
+    x INTEGER,
+    y INTEGER,
+    mode_id INTEGER,
+    rotation INTEGER,
+    reflection INTEGER,
+    transformed INTEGER,
+    edid_digest BLOB REFERENCES edids (digest)
+);
+CREATE TABLE IF NOT EXISTS modes (
+    output_id INTEGER NOT NULL REFERENCES outputs (id),
+    name TEXT,
+    mode_id INTEGER,
+    width INTEGER,
+    height INTEGER,
+    dotclock REAL,
+    refresh REAL,
+    is_current INTEGER NOT NULL,
+    is_preferred INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    output_id INTEGER NOT NULL REFERENCES outputs (id),
+    name TEXT NOT NULL,
+    value
+);
+CREATE INDEX IF NOT EXISTS snapshots_host ON snapshots (host, taken_at);
+CREATE INDEX IF NOT EXISTS screens_snapshot ON screens (snapshot_id);
+CREATE INDEX IF NOT EXISTS edids_monitor_serial ON edids (monitor_serial);
+CREATE INDEX IF NOT EXISTS edids_serial_number ON edids (serial_number);
+CREATE INDEX IF NOT EXISTS outputs_snapshot ON outputs (snapshot_id);
+CREATE INDEX IF NOT EXISTS outputs_name ON outputs (name);
+CREATE INDEX IF NOT EXISTS outputs_edid ON outputs (edid_digest);
+CREATE INDEX IF NOT EXISTS outputs_primary ON outputs (is_primary)
+    WHERE is_primary;
+CREATE INDEX IF NOT EXISTS outputs_transformed ON outputs (transformed)
+    WHERE transformed;
+CREATE INDEX IF NOT EXISTS modes_output ON modes (output_id);
+CREATE INDEX IF NOT EXISTS modes_current_refresh ON modes (refresh)
+    WHERE is_current;
+CREATE INDEX IF NOT EXISTS properties_output ON properties (output_id, name);
+CREATE INDEX IF NOT EXISTS properties_name ON properties (name);
+'''
+
+
+class XRandRInventory:
+    # Rows are ingested in batches, each batch is a single transaction
+    # with one executemany() call per table. Row ids are assigned up front
+    # so child rows can reference their parents without a round trip.
+    __slots__ = ('connection', 'batch_size')
+    connection: sqlite3.Connection
+    batch_size: int
+
+    def __init__(self, database: str = ':memory:',
+                 batch_size: int = 256) -> None:
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(_SCHEMA)
+        self.batch_size = batch_size
+
+    def ingest(
+            self,
+            screens: Mapping[Any, XRandRScreen],
+            host: str = '',
+            taken_at: Optional[float] = None
+    ) -> int:
+        return self.ingest_many(((host, screens, taken_at),))[0]
+
+    def ingest_many(self, snapshots: Iterable[Snapshot]) -> List[int]:
+        ids: List[int] = []
+        batch: List[Snapshot] = []
+        for snapshot in snapshots:
+            batch.append(snapshot)
+            if len(batch) >= self.batch_size:
+                ids.extend(self._ingest_batch(batch))
+                batch = []
+        if batch:
+            ids.extend(self._ingest_batch(batch))
+        return ids
+
+    def _next_id(self, table: str) -> int:
+        return self.connection.execute(
+            'SELECT coalesce(max(id), 0) + 1 FROM ' + table
+        ).fetchone()[0]
+
+    def _ingest_batch(self, batch: List[Snapshot]) -> List[int]:
+        snapshot_rows: List[Tuple[Any, ...]] = []
+        screen_rows: List[Tuple[Any, ...]] = []
+        edid_rows: Dict[bytes, Tuple[Any, ...]] = {}
+        output_rows: List[Tuple[Any, ...]] = []
+        mode_rows: List[Tuple[Any, ...]] = []
+        property_rows: List[Tuple[Any, ...]] = []
+
+        with self.connection:
+            # The ids are read before the first insert, the write lock has
+            # to be taken first so that other connections to the same file
+            # cannot hand out the same ids.
+            self.connection.execute('BEGIN IMMEDIATE')
+            snapshot_id: int = self._next_id('snapshots')
+            screen_id: int = self._next_id('screens')
+            output_id: int = self._next_id('outputs')
+            ids: List[int] = []
+            for host, screens, taken_at in batch:
+                snapshot_rows.append((
+                    snapshot_id,
+                    host,
+                    time.time() if taken_at is None else taken_at
+                ))
+                ids.append(snapshot_id)
+                for screen in screens.values():
+                    screen_rows.append(
+                        (screen_id, snapshot_id) + _screen_row(screen)
+                    )
+                    for output in (screen.outputs or {}).values():
+                        digest: Optional[bytes] = _edid_digest(output)
+                        if digest is not None and digest not in edid_rows:
+                            edid_rows[digest] = _edid_row(digest, output)
+                        output_rows.append(
+                            (output_id, snapshot_id, screen_id)
+                            + _output_row(output)
+                            + (digest,)
+                        )
+                        for mode in output.modes or ():
+                            mode_rows.append((output_id,) + _mode_row(mode))
+                        properties = output.properties
+                        if properties is not None and properties.other:
+                            for prop in properties.other.values():
+                                property_rows.append((
+                                    output_id,
+                                    prop.name,
+                                    _sql_value(prop.value)
+                                ))
+                        output_id += 1
+                    screen_id += 1
+                snapshot_id += 1
+
+            self.connection.executemany(
+                'INSERT INTO snapshots VALUES (?, ?, ?)', snapshot_rows
+            )
+            self.connection.executemany(
+                'INSERT INTO screens VALUES (?, ?, ?, ?, ?, ?, ?)',
+                screen_rows
+            )
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO edids VALUES (?, ?, ?, ?, ?, ?, ?)',
+                edid_rows.values()
+            )
+            self.connection.executemany(
+                'INSERT INTO outputs VALUES '
+                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                output_rows
+            )
+            self.connection.executemany(
+                'INSERT INTO modes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                mode_rows
+            )
+            self.connection.executemany(
+                'INSERT INTO properties VALUES (?, ?, ?)', property_rows
+            )
+        return ids
+
+    def query(self, sql: str, *parameters: Any) -> List[Tuple[Any, ...]]:
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def find_edid_serial(self, serial: str) -> List[Tuple[Any, ...]]:
+        serial_number: Optional[int] = \
+            int(serial) if serial.isdigit() else None
+        return self.query(
+            'SELECT DISTINCT s.host, s.id, o.name FROM edids e '
+            'JOIN outputs o ON o.edid_digest = e.digest '
+            'JOIN snapshots s ON s.id = o.snapshot_id '
+            'WHERE e.monitor_serial = ? '
+            'UNION '
+            'SELECT DISTINCT s.host, s.id, o.name FROM edids e '
+            'JOIN outputs o ON o.edid_digest = e.digest '
+            'JOIN snapshots s ON s.id = o.snapshot_id '
+            'WHERE e.serial_number = ?',
+            serial,
+            serial_number
+        )
+
+    def find_refresh_below(
+            self,
+            refresh: float,
+            primary_only: bool = False
+    ) -> List[Tuple[Any, ...]]:
+        return self.query(
+            'SELECT s.host, s.id, o.name, m.name, m.refresh FROM modes m '
+            'JOIN outputs o ON o.id = m.output_id '
+            'JOIN snapshots s ON s.id = o.snapshot_id '
+            'WHERE m.is_current AND m.refresh < ?'
+            + (' AND o.is_primary' if primary_only else ''),
+            refresh
+        )
+
+    def find_transformed(self) -> List[Tuple[Any, ...]]:
+        return self.query(
+            'SELECT s.host, s.id, o.name FROM outputs o '
+            'JOIN snapshots s ON s.id = o.snapshot_id '
+            'WHERE o.transformed'
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def _screen_row(screen: XRandRScreen) -> Tuple[Any, ...]:
+    dimensions = screen.dimensions
+    current = dimensions.current if dimensions is not None else None
+    maximum = dimensions.maximum if dimensions is not None else None
+    return (
+        screen.number,
+        current.width if current is not None else None,
+        current.height if current is not None else None,
+        maximum.width if maximum is not None else None,
+        maximum.height if maximum is not None else None
+    )
+
+
+def _output_row(output: XRandROutput) -> Tuple[Any, ...]:
+    geometry = output.geometry
+    properties = output.properties
+    transform: Optional[XRandRTransform] = \
+        properties.transform if properties is not None else None
+    return (
+        output.name,
+        _sql_value(output.connection),
+        bool(output.primary),
+        properties.crtc if properties is not None else None,
+        geometry.width if geometry is not None else None,
+        geometry.height if geometry is not None else None,
+        geometry.x if geometry is not None else None,
+        geometry.y if geometry is not None else None,
+        output.mode,
+        _sql_value(output.rotation),
+        _sql_value(output.reflection),
+        None if transform is None else not transform.is_identity
+    )
+
+
+def _mode_row(mode: XRandROutput.Mode) -> Tuple[Any, ...]:
+    return (
+        mode.name,
+        mode.id,
+        mode.width,
+        mode.height,
+        mode.dotclock,
+        mode.refresh,
+        bool(mode.current),
+        bool(mode.preferred)
+    )
+
+
+def _edid_digest(output: XRandROutput) -> Optional[bytes]:
+    if output.properties is None or not output.properties.edid:
+        return None
+    return hashlib.blake2b(output.properties.edid, digest_size=16).digest()
+
+
+def _edid_row(digest: bytes, output: XRandROutput) -> Tuple[Any, ...]:
+    assert output.properties is not None and output.properties.edid
+    data: bytes = bytes(output.properties.edid)
+    try:
+        edid: Optional[XRandREdid] = decode_edid(data)
+    except ValueError:
+        edid = None
+    if edid is None:
+        return (digest, data, None, None, None, None, None)
+    return (
+        digest,
+        data,
+        edid.manufacturer,
+        edid.product_code,
+        edid.serial_number,
+        edid.monitor_name,
+        edid.monitor_serial
+    )
+
+
+def _sql_value(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return int(value) if isinstance(value, int) else value
+    return str(value)
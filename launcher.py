@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+from typing import Iterable, Mapping, Optional, Tuple, Union
+
+__all__ = ('XRandRLauncher', 'default_launcher')
+
+Argument = Union[str, bytes]
+
+
+class XRandRLauncher:
+    __slots__ = ('name', '_path')
+    name: str
+    _path: Optional[str]
+
+    def __init__(self, name: str = 'xrandr') -> None:
+        self.name = name
+        self._path = None
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            return self.resolve()
+        return self._path
+
+    def resolve(self) -> str:
+        self._path = shutil.which(self.name)
+        if not self._path:
+            raise FileNotFoundError(self.name + ' not found')
+        return self._path
+
+    def run(
+            self,
+            args: Iterable[Argument] = (),
+            display: Optional[str] = None,
+            capture_output: bool = False,
+            timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[bytes]]:
+        # With a timeout, the process is killed and subprocess.TimeoutExpired
+        # is raised when it does not exit in time.
+        argv: Tuple[Argument, ...] = (self.name, *args)
+        env: Mapping[str, str] = os.environ
+        if display is not None:
+            env = dict(os.environ, DISPLAY=display)
+
+        if self._path is not None:
+            try:
+                return _spawn(self._path, argv, env, capture_output, timeout)
+            except FileNotFoundError:
+                # The cached executable went away, look it up again.
+                pass
+        return _spawn(self.resolve(), argv, env, capture_output, timeout)
+
+
+default_launcher: XRandRLauncher = XRandRLauncher()
+
+
+def _spawn(
+        path: str,
+        argv: Tuple[Argument, ...],
+        env: Mapping[str, str],
+        capture_output: bool,
+        timeout: Optional[float] = None
+) -> Tuple[int, Optional[bytes]]:
+    if timeout is not None or not hasattr(os, 'posix_spawn'):
+        return _spawn_subprocess(path, argv, env, capture_output, timeout)
+
+    if not capture_output:
+        pid: int = os.posix_spawn(path, argv, env)
+        return _wait(pid), None
+
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.posix_spawn(
+            path,
+            argv,
+            env,
+            file_actions=((os.POSIX_SPAWN_DUP2, write_fd, 1),)
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+
+    with open(read_fd, 'rb') as pipe:
+        output: bytes = pipe.read()
+    return _wait(pid), output
+
+
+def _spawn_subprocess(
+        path: str,
+        argv: Tuple[Argument, ...],
+        env: Mapping[str, str],
+        capture_output: bool,
+        timeout: Optional[float] = None
+) -> Tuple[int, Optional[bytes]]:
+    with subprocess.Popen(
+            argv,
+            executable=path,
+            env=env,
+            stdout=subprocess.PIPE if capture_output else None
+    ) as popen:
+        try:
+            output: Optional[bytes] = popen.communicate(timeout=timeout)[0]
+        except subprocess.TimeoutExpired:
+            popen.kill()
+            raise
+    return popen.returncode, output
+
+
+def _wait(pid: int) -> int:
+    status: int = os.waitpid(pid, 0)[1]
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
@@ -0,0 +1,355 @@
+import collections
+import enum
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .classes import XRandRDimensions, XRandRGeometry, XRandROutput, \
+                     XRandRScreen, XRandRScreenDimensionsList
+from .frozen import _frozen_class_set, evolve
+from .indexes import _flagged_mode
+from .spatial import Extent, _extent
+
+__all__ = ('XRandRLayout',)
+
+Size = Tuple[int, int]
+Position = Tuple[int, int]
+
+
+class XRandRLayout:
+    @enum.unique
+    class Alignment(enum.IntEnum):
+        Start = 0
+        Center = 1
+        End = 2
+
+    class Result:
+        __slots__ = ('positions', 'sizes', 'framebuffer', 'overlaps')
+        positions: Dict[str, Position]
+        sizes: Dict[str, Size]
+        framebuffer: Size
+        overlaps: List[Tuple[str, str]]
+
+        def __init__(
+                self,
+                positions: Dict[str, Position],
+                sizes: Dict[str, Size],
+                framebuffer: Size,
+                overlaps: List[Tuple[str, str]]
+        ) -> None:
+            self.positions = positions
+            self.sizes = sizes
+            self.framebuffer = framebuffer
+            self.overlaps = overlaps
+
+    # Every constraint is turned into edges "b is at a + (dx, dy)", the
+    # positions are then propagated through the edges breadth-first from
+    # the fixed outputs. Groups that are not connected to a fixed output
+    # are laid out left to right, and without fixed outputs the whole
+    # layout is shifted to the origin. Outputs without constraints are left
+    # alone, but the enabled ones still count for the framebuffer size and
+    # the overlaps. If any output ends up at a negative position, all of
+    # them are shifted, and the result includes the moved unconstrained
+    # outputs too.
+    __slots__ = ('screen', 'sizes', '_fixed', '_edges', '_mirrors')
+    screen: XRandRScreen
+    sizes: Dict[str, Size]
+    _fixed: Dict[str, Position]
+    _edges: Dict[str, List[Tuple[str, int, int]]]
+    _mirrors: List[Sequence[str]]
+
+    def __init__(self, screen: XRandRScreen) -> None:
+        self.screen = screen
+        self.sizes = {}
+        for name, output in (screen.outputs or {}).items():
+            size: Optional[Size] = _output_size(output)
+            if size is not None:
+                self.sizes[name] = size
+        self._fixed = {}
+        self._edges = {}
+        self._mirrors = []
+
+    def _size(self, name: str) -> Size:
+        try:
+            return self.sizes[name]
+        except KeyError:
+            raise ValueError(
+                'Output {!r} has no mode or size'.format(name)
+            ) from None
+
+    def _edge(self, a: str, b: str, dx: int, dy: int) -> None:
+        self._edges.setdefault(a, []).append((b, dx, dy))
+        self._edges.setdefault(b, []).append((a, -dx, -dy))
+
+    def place(self, name: str, x: int, y: int) -> None:
+        self._size(name)
+        self._fixed[name] = (x, y)
+
+    def left_of(
+            self,
+            name: str,
+            other: str,
+            align: Alignment = Alignment.Start
+    ) -> None:
+        w, h = self._size(name)
+        dy: int = _align(self._size(other)[1], h, align)
+        self._edge(other, name, -w, dy)
+
+    def right_of(
+            self,
+            name: str,
+            other: str,
+            align: Alignment = Alignment.Start
+    ) -> None:
+        self.left_of(other, name, align)
+
+    def above(
+            self,
+            name: str,
+            other: str,
+            align: Alignment = Alignment.Start
+    ) -> None:
+        w, h = self._size(name)
+        dx: int = _align(self._size(other)[0], w, align)
+        self._edge(other, name, dx, -h)
+
+    def below(
+            self,
+            name: str,
+            other: str,
+            align: Alignment = Alignment.Start
+    ) -> None:
+        self.above(other, name, align)
+
+    def mirror(self, names: Sequence[str]) -> None:
+        for name in names[1:]:
+            self._size(name)
+            self._edge(names[0], name, 0, 0)
+        self._mirrors.append(names)
+
+    def grid(
+            self,
+            rows: Sequence[Sequence[Optional[str]]],
+            align: Alignment = Alignment.Start
+    ) -> None:
+        # Columns are as wide as their widest output and rows as high as
+        # their highest one, outputs are aligned within their cell.
+        columns: int = max((len(row) for row in rows), default=0)
+        widths: List[int] = [0] * columns
+        heights: List[int] = [0] * len(rows)
+        for r, row in enumerate(rows):
+            for c, name in enumerate(row):
+                if name is not None:
+                    w, h = self._size(name)
+                    widths[c] = max(widths[c], w)
+                    heights[r] = max(heights[r], h)
+
+        origin: Optional[str] = None
+        origin_offset: Position = (0, 0)
+        y: int = 0
+        for r, row in enumerate(rows):
+            x: int = 0
+            for c, name in enumerate(row):
+                if name is not None:
+                    w, h = self.sizes[name]
+                    offset: Position = (
+                        x + _align(widths[c], w, align),
+                        y + _align(heights[r], h, align)
+                    )
+                    if origin is None:
+                        origin = name
+                        origin_offset = offset
+                    else:
+                        self._edge(origin, name,
+                                   offset[0] - origin_offset[0],
+                                   offset[1] - origin_offset[1])
+                x += widths[c]
+            y += heights[r]
+
+    def _unconstrained(self) -> Dict[str, Extent]:
+        extents: Dict[str, Extent] = {}
+        for name, output in (self.screen.outputs or {}).items():
+            if name in self._fixed or name in self._edges:
+                continue
+            extent: Optional[Extent] = _extent(output, False)
+            if extent is not None:
+                extents[name] = extent
+        return extents
+
+    def solve(self) -> 'XRandRLayout.Result':
+        others: Dict[str, Extent] = self._unconstrained()
+        positions: Dict[str, Position] = {}
+        queue: Deque[str] = collections.deque()
+        for name, position in self._fixed.items():
+            positions[name] = position
+            queue.append(name)
+        self._propagate(positions, queue)
+
+        # Groups without a fixed output go to the right of everything
+        # placed so far, including the enabled outputs without constraints.
+        for name in self.sizes:
+            if name in positions or name not in self._edges:
+                continue
+            right: int = max(
+                (x + self.sizes[n][0] for n, (x, _) in positions.items()),
+                default=0
+            )
+            right = max([right] + [e[2] for e in others.values()])
+            positions[name] = (right, 0)
+            queue.append(name)
+            group: List[str] = self._propagate(positions, queue)
+            left: int = min(positions[n][0] for n in group)
+            top: int = min(positions[n][1] for n in group)
+            for n in group:
+                positions[n] = (positions[n][0] + right - left,
+                                positions[n][1] - top)
+
+        if not self._fixed and positions:
+            left = min(x for x, _ in positions.values())
+            top = min(y for _, y in positions.values())
+            if left or top:
+                for n, (x, y) in positions.items():
+                    positions[n] = (x - left, y - top)
+
+        sizes: Dict[str, Size] = {n: self.sizes[n] for n in positions}
+        all_positions: Dict[str, Position] = dict(positions)
+        all_sizes: Dict[str, Size] = dict(sizes)
+        for n, (x0, y0, x1, y1) in others.items():
+            all_positions[n] = (x0, y0)
+            all_sizes[n] = (x1 - x0, y1 - y0)
+
+        # xrandr rejects negative positions.
+        left = min((x for x, _ in all_positions.values()), default=0)
+        top = min((y for _, y in all_positions.values()), default=0)
+        if left < 0 or top < 0:
+            left = min(left, 0)
+            top = min(top, 0)
+            for n, (x, y) in all_positions.items():
+                all_positions[n] = (x - left, y - top)
+            positions = all_positions.copy()
+            sizes = all_sizes.copy()
+
+        framebuffer: Size = (
+            max((x + all_sizes[n][0] for n, (x, _) in all_positions.items()),
+                default=0),
+            max((y + all_sizes[n][1] for n, (_, y) in all_positions.items()),
+                default=0)
+        )
+        return XRandRLayout.Result(
+            positions,
+            sizes,
+            framebuffer,
+            self._overlaps(all_positions, all_sizes)
+        )
+
+    def _propagate(
+            self,
+            positions: Dict[str, Position],
+            queue: Deque[str]
+    ) -> List[str]:
+        placed: List[str] = list(queue)
+        while queue:
+            name: str = queue.popleft()
+            x, y = positions[name]
+            for other, dx, dy in self._edges.get(name, ()):
+                position: Position = (x + dx, y + dy)
+                current: Optional[Position] = positions.get(other)
+                if current is None:
+                    positions[other] = position
+                    placed.append(other)
+                    queue.append(other)
+                elif current != position:
+                    raise ValueError(
+                        'Conflicting positions for output {!r}: {} and {}'
+                        .format(other, current, position)
+                    )
+        return placed
+
+    def _overlaps(
+            self,
+            positions: Dict[str, Position],
+            sizes: Dict[str, Size]
+    ) -> List[Tuple[str, str]]:
+        mirrored: Dict[str, int] = {}
+        for i, names in enumerate(self._mirrors):
+            for name in names:
+                mirrored[name] = i
+
+        # Sweep along x, keeping the outputs whose x interval is still
+        # open, and compare the y intervals of those only.
+        overlaps: List[Tuple[str, str]] = []
+        active: List[str] = []
+        for name in sorted(positions, key=lambda n: positions[n][0]):
+            x, y = positions[name]
+            w, h = sizes[name]
+            active = [
+                n for n in active if positions[n][0] + sizes[n][0] > x
+            ]
+            for other in active:
+                oy: int = positions[other][1]
+                if (oy < y + h and y < oy + sizes[other][1]
+                        and (name not in mirrored
+                             or mirrored.get(other) != mirrored[name])):
+                    overlaps.append((other, name))
+            active.append(name)
+        return overlaps
+
+    def apply(self, result: Optional['XRandRLayout.Result'] = None) \
+            -> XRandRScreen:
+        # Mutable screens are changed in place, frozen ones are evolved
+        # into a new screen, the layout keeps the old one.
+        if result is None:
+            result = self.solve()
+        screen: XRandRScreen = self.screen
+        geometries: Dict[str, XRandRGeometry] = {
+            name: XRandRGeometry.from_values(*result.sizes[name], x, y)
+            for name, (x, y) in result.positions.items()
+        }
+        current: XRandRDimensions = XRandRDimensions(*result.framebuffer)
+
+        if type(screen) not in _frozen_class_set:
+            outputs = screen.outputs or {}
+            for name, geometry in geometries.items():
+                outputs[name].geometry = geometry
+            if screen.dimensions is None:
+                screen.dimensions = XRandRScreenDimensionsList()
+            screen.dimensions.current = current
+            return screen
+
+        changes: Dict[str, Any] = {}
+        if geometries:
+            changes['outputs'] = {
+                name: evolve(output, geometry=geometries[name])
+                if name in geometries else output
+                for name, output in screen.outputs.items()
+            }
+        if screen.dimensions is None:
+            changes['dimensions'] = \
+                XRandRScreenDimensionsList(current=current)
+        else:
+            changes['dimensions'] = \
+                evolve(screen.dimensions, current=current)
+        return evolve(screen, **changes)
+
+
+def _align(outer: int, inner: int, align: XRandRLayout.Alignment) -> int:
+    if align == XRandRLayout.Alignment.Start:
+        return 0
+    if align == XRandRLayout.Alignment.Center:
+        return (outer - inner) // 2
+    return outer - inner
+
+
+def _output_size(output: XRandROutput) -> Optional[Size]:
+    # The mode is looked up in the output itself, the screen index may be
+    # older than the outputs.
+    mode: Optional[XRandROutput.Mode] = \
+        _flagged_mode(output, 'current') or \
+        _flagged_mode(output, 'preferred')
+    if mode is not None and mode.width and mode.height:
+        if output.rotation in (XRandROutput.Rotation.Rotate_90,
+                               XRandROutput.Rotation.Rotate_270):
+            return mode.height, mode.width
+        return mode.width, mode.height
+    geometry = output.geometry
+    if geometry is not None and geometry.width and geometry.height:
+        return geometry.width, geometry.height
+    return None
@@ -0,0 +1,264 @@
+import array
+import itertools
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, \
+                   Tuple, Union
+
+from .classes import XRandROutput, _structural_equal
+
+__all__ = ('XRandRModeTable',)
+
+_NAN: float = math.nan
+
+_int_columns: Tuple[str, ...] = (
+    'id', 'flags', 'width', 'h_sync_start', 'h_sync_end', 'h_total', 'h_skew',
+    'height', 'v_sync_start', 'v_sync_end', 'v_total'
+)
+_float_columns: Tuple[str, ...] = ('dotclock', '_h_clock', '_refresh')
+_bool_columns: Tuple[str, ...] = ('current', 'preferred')
+
+
+class XRandRModeTable(Sequence[XRandROutput.Mode]):
+    # Integer columns use -1 and float columns NaN for missing values.
+    # Indexing creates a new Mode object from the columns, changes to that
+    # object are not written back into the table.
+    __slots__ = ('names', '_columns', '_h_clock', '_refresh')
+    names: List[Optional[str]]
+    _columns: Dict[str, array.array]
+    _h_clock: Optional[array.array]
+    _refresh: Optional[array.array]
+
+    def __init__(
+            self,
+            modes: Iterable[XRandROutput.Mode] = ()
+    ) -> None:
+        self.names = []
+        self._columns = {}
+        for column in _int_columns:
+            self._columns[column] = array.array('q')
+        for column in _float_columns:
+            self._columns[column] = array.array('d')
+        for column in _bool_columns:
+            self._columns[column] = array.array('b')
+        self._h_clock = None
+        self._refresh = None
+        self.extend(modes)
+
+    def append(self, mode: XRandROutput.Mode) -> None:
+        self.names.append(mode.name)
+        columns: Dict[str, array.array] = self._columns
+        value: Any
+        for column in _int_columns:
+            value = getattr(mode, column)
+            columns[column].append(-1 if value is None else value)
+        for column in _float_columns:
+            value = getattr(mode, column)
+            columns[column].append(_NAN if value is None else value)
+        for column in _bool_columns:
+            columns[column].append(bool(getattr(mode, column)))
+        self._h_clock = None
+        self._refresh = None
+
+    def extend(self, modes: Iterable[XRandROutput.Mode]) -> None:
+        for mode in modes:
+            self.append(mode)
+
+    def column(self, name: str) -> array.array:
+        if name == 'h_clock':
+            return self.h_clock
+        if name == 'refresh':
+            return self.refresh
+        return self._columns[name]
+
+    @property
+    def h_clock(self) -> array.array:
+        if self._h_clock is None:
+            self._compute_clocks()
+        assert self._h_clock is not None
+        return self._h_clock
+
+    @property
+    def refresh(self) -> array.array:
+        if self._refresh is None:
+            self._compute_clocks()
+        assert self._refresh is not None
+        return self._refresh
+
+    def _compute_clocks(self) -> None:
+        # Same rules as XRandROutput.Mode.h_clock and .refresh, for all modes
+        # at once.
+        try:
+            import numpy
+        except ImportError:
+            self._compute_clocks_python()
+        else:
+            self._compute_clocks_numpy(numpy)
+
+    def _compute_clocks_numpy(self, numpy: Any) -> None:
+        columns: Dict[str, Any] = {
+            name: numpy.frombuffer(self._columns[name],
+                                   dtype=self._columns[name].typecode)
+            for name in ('dotclock', 'h_total', 'v_total', 'flags',
+                         '_h_clock', '_refresh')
+        }
+        dotclock: Any = columns['dotclock']
+        h_total: Any = columns['h_total']
+        v_total: Any = columns['v_total']
+        flags: Any = columns['flags']
+        h_clock: Any = columns['_h_clock']
+        refresh: Any = columns['_refresh']
+
+        # The modes the Python loop leaves as they are.
+        keep: Any = (~numpy.isnan(h_clock) & ~numpy.isnan(refresh)) \
+            | numpy.isnan(dotclock) | (h_total < 0)
+        has_flags: Any = flags > 0
+        double_scan: int = int(XRandROutput.Mode.Flags.DoubleScan)
+        interlace: int = int(XRandROutput.Mode.Flags.Interlace)
+        v: Any = v_total.astype('d')
+        v = numpy.where(has_flags & (flags & double_scan != 0), v * 2, v)
+        v = numpy.where(has_flags & (flags & interlace != 0), v / 2, v)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            h_clocks: Any = numpy.where(
+                keep | ~numpy.isnan(h_clock),
+                h_clock,
+                numpy.where(h_total != 0, dotclock / h_total, 0.)
+            )
+            refreshes: Any = numpy.where(
+                keep | ~numpy.isnan(refresh) | (v_total < 0),
+                refresh,
+                numpy.where((h_total != 0) & (v != 0),
+                            dotclock / (h_total * v), 0.)
+            )
+        self._h_clock = array.array('d', h_clocks.tobytes())
+        self._refresh = array.array('d', refreshes.tobytes())
+
+    def _compute_clocks_python(self) -> None:
+        columns: Dict[str, array.array] = self._columns
+        double_scan: int = XRandROutput.Mode.Flags.DoubleScan
+        interlace: int = XRandROutput.Mode.Flags.Interlace
+        h_clocks: array.array = array.array('d')
+        refreshes: array.array = array.array('d')
+        for dotclock, h_total, v_total, flags, h_clock, refresh in zip(
+                columns['dotclock'],
+                columns['h_total'],
+                columns['v_total'],
+                columns['flags'],
+                columns['_h_clock'],
+                columns['_refresh']
+        ):
+            if (h_clock == h_clock and refresh == refresh
+                    or dotclock != dotclock or h_total < 0):
+                h_clocks.append(h_clock)
+                refreshes.append(refresh)
+                continue
+            if h_clock != h_clock:
+                h_clock = dotclock / h_total if h_total else 0.
+            h_clocks.append(h_clock)
+            if refresh != refresh and v_total >= 0:
+                v: float = v_total
+                if flags > 0:
+                    if flags & double_scan:
+                        v *= 2
+                    if flags & interlace:
+                        v /= 2
+                if not h_total or not v:
+                    refresh = 0.
+                else:
+                    refresh = dotclock / (h_total * v)
+            refreshes.append(refresh)
+        self._h_clock = h_clocks
+        self._refresh = refreshes
+
+    def where(self, mask: Iterable[Any]) -> 'XRandRModeTable':
+        return self.take(itertools.compress(range(len(self)), mask))
+
+    def sorted(
+            self,
+            *columns: str,
+            reverse: bool = False
+    ) -> 'XRandRModeTable':
+        keys: List[array.array] = [self.column(c) for c in columns]
+        return self.take(sorted(
+            range(len(self)),
+            key=lambda i: tuple(key[i] for key in keys),
+            reverse=reverse
+        ))
+
+    def take(self, indices: Iterable[int]) -> 'XRandRModeTable':
+        indices = list(indices)
+        table: XRandRModeTable = XRandRModeTable()
+        table.names = [self.names[i] for i in indices]
+        for name, column in self._columns.items():
+            table._columns[name] = array.array(
+                column.typecode,
+                [column[i] for i in indices]
+            )
+        if self._h_clock is not None and self._refresh is not None:
+            table._h_clock = array.array(
+                'd', [self._h_clock[i] for i in indices]
+            )
+            table._refresh = array.array(
+                'd', [self._refresh[i] for i in indices]
+            )
+        return table
+
+    def numpy(self) -> Dict[str, Any]:
+        import numpy
+
+        views: Dict[str, Any] = {
+            name: numpy.frombuffer(column, dtype=column.typecode)
+            for name, column in self._columns.items()
+        }
+        views['h_clock'] = numpy.frombuffer(self.h_clock, dtype='d')
+        views['refresh'] = numpy.frombuffer(self.refresh, dtype='d')
+        return views
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, XRandRModeTable):
+            return self.names == other.names and all(
+                column.tobytes() == other._columns[name].tobytes()
+                for name, column in self._columns.items()
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) \
+                and all(map(_structural_equal, self, other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Equal to the structural hash of a list of the same modes.
+        return hash(tuple(map(hash, self)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(
+            self,
+            index: Union[int, slice]
+    ) -> Union[XRandROutput.Mode, 'XRandRModeTable']:
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('mode table index out of range')
+
+        columns: Dict[str, array.array] = self._columns
+        mode: XRandROutput.Mode = XRandROutput.Mode(self.names[index])
+        value: Any
+        for column in _int_columns:
+            value = columns[column][index]
+            setattr(mode, column, None if value < 0 else value)
+        if mode.flags is not None:
+            mode.flags = XRandROutput.Mode.Flags(mode.flags)
+        for column in _float_columns:
+            value = columns[column][index]
+            setattr(mode, column, None if value != value else value)
+        for column in _bool_columns:
+            setattr(mode, column, bool(columns[column][index]))
+        return mode
+
+    def __iter__(self) -> Iterator[XRandROutput.Mode]:
+        for index in range(len(self)):
+            yield self[index]
@@ -1,9 +1,11 @@
-import dataclasses
 import enum
-from typing import Any, Callable, Iterable, Iterator, Match, Optional, \
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Match, Optional, \
                    Pattern, Tuple, Union
 
-__all__ = ('ParserAction', 'ParserState', 'parse')
+__all__ = ('ParserAction', 'ParserState', 'ParserFragmentStats',
+           'ParserProfile', 'parse', 'parse_nested')
 
 
 @enum.unique
@@ -14,13 +16,47 @@ class ParserAction(enum.Enum):
     Again = enum.auto()
 
 
-@dataclasses.dataclass
+_Restart: ParserAction = ParserAction.Restart
+_Continue: ParserAction = ParserAction.Continue
+_Stop: ParserAction = ParserAction.Stop
+_Again: ParserAction = ParserAction.Again
+
+
 class ParserState:
-    string: str = ''
-    position: int = 0
-    data: Any = None
-    default_action: ParserAction = ParserAction.Restart
-    again_not_matched_action: ParserAction = ParserAction.Continue
+    __slots__ = ('string', 'position', 'data', 'default_action',
+                 'again_not_matched_action', 'endpos')
+    string: str
+    position: int
+    data: Any
+    default_action: ParserAction
+    again_not_matched_action: ParserAction
+    endpos: int
+
+    def __init__(
+            self,
+            string: str = '',
+            position: int = 0,
+            data: Any = None,
+            default_action: ParserAction = ParserAction.Restart,
+            again_not_matched_action: ParserAction = ParserAction.Continue,
+            endpos: int = sys.maxsize
+    ) -> None:
+        self.string = string
+        self.position = position
+        self.data = data
+        self.default_action = default_action
+        self.again_not_matched_action = again_not_matched_action
+        self.endpos = endpos
+
+    def __repr__(self) -> str:
+        return '{}({!r}, {!r}, {!r}, {!s}, {!s})'.format(
+            type(self).__qualname__,
+            self.string,
+            self.position,
+            self.data,
+            self.default_action,
+            self.again_not_matched_action
+        )
 
 
 MatchCallbackReturn = Union[Optional[ParserAction],
@@ -28,84 +64,289 @@ MatchCallbackReturn = Union[Optional[ParserAction],
 MatchCallback = Callable[[ParserState, Match[str]], MatchCallbackReturn]
 
 
+class ParserFragmentStats:
+    # match_time is spent in the regex only, for all attempts. time also
+    # includes the callbacks, and with them all nested parses.
+    __slots__ = ('regex', 'callback', 'attempts', 'matches', 'failures',
+                 'bytes', 'match_time', 'time')
+    regex: Pattern[str]
+    callback: MatchCallback
+    attempts: int
+    matches: int
+    failures: int
+    bytes: int
+    match_time: float
+    time: float
+
+    def __init__(self, regex: Pattern[str], callback: MatchCallback) -> None:
+        self.regex = regex
+        self.callback = callback
+        self.attempts = 0
+        self.matches = 0
+        self.failures = 0
+        self.bytes = 0
+        self.match_time = 0.
+        self.time = 0.
+
+    @property
+    def name(self) -> str:
+        return getattr(self.callback, '__name__', repr(self.callback))
+
+    def __repr__(self) -> str:
+        return '{}({!s}, {}, {}, {}, {}, {:.6f}, {:.6f})'.format(
+            type(self).__qualname__,
+            self.name,
+            self.attempts,
+            self.matches,
+            self.failures,
+            self.bytes,
+            self.match_time,
+            self.time
+        )
+
+
+class ParserProfile:
+    # While a profile is active, every parse in the process records into
+    # it, from all threads. Parses in worker processes are not recorded.
+    __slots__ = ('fragments', '_previous')
+    fragments: Dict[Tuple[Pattern[str], MatchCallback], ParserFragmentStats]
+    _previous: Optional['ParserProfile']
+
+    def __init__(self) -> None:
+        self.fragments = {}
+        self._previous = None
+
+    def fragment(
+            self,
+            regex: Pattern[str],
+            callback: MatchCallback
+    ) -> ParserFragmentStats:
+        try:
+            return self.fragments[regex, callback]
+        except KeyError:
+            stats: ParserFragmentStats = \
+                ParserFragmentStats(regex, callback)
+            self.fragments[regex, callback] = stats
+            return stats
+
+    def ranked(self, key: str = 'match_time') -> List[ParserFragmentStats]:
+        return sorted(
+            self.fragments.values(),
+            key=lambda stats: getattr(stats, key),
+            reverse=True
+        )
+
+    def __enter__(self) -> 'ParserProfile':
+        global _profile
+        self._previous = _profile
+        _profile = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _profile
+        _profile = self._previous
+        self._previous = None
+
+
+# Annotated with a comment, Python 3.7 rejects annotated globals that
+# functions declare global.
+_profile = None  # type: Optional[ParserProfile]
+
+
 def parse(
         string: str,
         position: int,
         regexes: Iterable[Tuple[Pattern[str], MatchCallback]],
         data: Any = None,
         default_action: ParserAction = ParserAction.Restart,
-        again_not_matched_action: ParserAction = ParserAction.Continue
+        again_not_matched_action: ParserAction = ParserAction.Continue,
+        endpos: int = sys.maxsize
 ) -> Tuple[str, int, Any, int]:
-    if again_not_matched_action == ParserAction.Again:
+    if again_not_matched_action is ParserAction.Again:
         raise ValueError('Parameter again_not_matched_action may not be '
                          'ParserAction.Again')
 
     state: ParserState = ParserState(string, position, data, default_action,
-                                     again_not_matched_action)
+                                     again_not_matched_action, endpos)
     matches: int = _parse(state, regexes)
     return state.string, state.position, state.data, matches
 
 
+def parse_nested(
+        state: ParserState,
+        regexes: Iterable[Tuple[Pattern[str], MatchCallback]],
+        data: Any = None,
+        default_action: ParserAction = ParserAction.Restart,
+        again_not_matched_action: ParserAction = ParserAction.Continue
+) -> Any:
+    # Like parse(), but continues at the position of an existing state and
+    # leaves it behind the parsed text. Only the data is returned.
+    if again_not_matched_action is ParserAction.Again:
+        raise ValueError('Parameter again_not_matched_action may not be '
+                         'ParserAction.Again')
+
+    outer_data: Any = state.data
+    outer_default_action: ParserAction = state.default_action
+    outer_again_not_matched_action: ParserAction = \
+        state.again_not_matched_action
+
+    state.data = data
+    state.default_action = default_action
+    state.again_not_matched_action = again_not_matched_action
+    try:
+        _parse(state, regexes)
+        return state.data
+    finally:
+        state.data = outer_data
+        state.default_action = outer_default_action
+        state.again_not_matched_action = outer_again_not_matched_action
+
+
 def _parse(
         state: ParserState,
         regexes: Iterable[Tuple[Pattern[str], MatchCallback]]
 ) -> int:
+    if _profile is not None:
+        return _parse_profiled(state, regexes, _profile)
+
+    parsers: List[Tuple[Callable[[str, int, int], Optional[Match[str]]],
+                        MatchCallback]] = \
+        [(regex.match, func) for regex, func in regexes]
     matches: int = 0
 
-    action: ParserAction = ParserAction.Restart
-    matched: bool
-    regex_iter: Iterator[Tuple[Pattern[str], MatchCallback]]
-    while action != ParserAction.Stop:
-        if action == ParserAction.Restart:
-            matched = False
-            regex_iter = iter(regexes)
-            action = ParserAction.Continue
-
-        regex: Pattern[str]
-        func: MatchCallback
-        if action == ParserAction.Continue:
-            try:
-                regex, func = next(regex_iter)
-            except StopIteration:
-                if not matched:
+    action: ParserAction
+    match: Optional[Match[str]]
+    while True:
+        matched: bool = False
+        for match_regex, func in parsers:
+            again: bool = False
+            while True:
+                match = match_regex(state.string, state.position,
+                                    state.endpos)
+                if match is None:
+                    if not again:
+                        action = _Continue
+                        break
+                    action = state.again_not_matched_action
+                else:
+                    matched = True
+                    matches += 1
+
+                    ret: MatchCallbackReturn = func(state, match)
+                    if ret is None:
+                        action = state.default_action
+                        state.position = match.end()
+                    elif type(ret) is ParserAction:
+                        action = ret  # type: ignore
+                        state.position = match.end()
+                    else:
+                        action = _tuple_action(state, match, ret)
+
+                if action is _Again:
+                    again = True
+                elif action is _Continue:
                     break
-                action = ParserAction.Restart
-                continue
+                elif action is _Stop:
+                    return matches
+                else:
+                    assert action is _Restart, \
+                        'Internal parser state corrupt'
+                    break
+            if action is _Restart:
+                break
         else:
-            assert action == ParserAction.Again, \
-                'Internal parser state corrupt'
-
-        match: Optional[Match[str]] = \
-            regex.match(state.string, pos=state.position)
-        if not match:
-            if action == ParserAction.Again:
-                action = state.again_not_matched_action
-            continue
-        matched = True
-        matches += 1
-
-        ret: MatchCallbackReturn = func(state, match)
-        if ret is None:
-            action = state.default_action
-            state.position = match.end()
-        elif isinstance(ret, ParserAction):
-            action = ret
-            state.position = match.end()
-        elif isinstance(ret, tuple):
-            if len(ret) > 2:
-                raise ValueError(
-                    'Too many values returned from match callback'
-                )
-
-            if ret[0] is None:
-                action = state.default_action
-            elif isinstance(ret[0], ParserAction):
-                action = ret[0]
-            else:
-                raise ValueError('Returned action value is not a ParserAction')
-            if len(ret) > 1 and ret[1]:
-                state.position += match.end() - match.start()
+            if not matched:
+                return matches
+
+
+def _parse_profiled(
+        state: ParserState,
+        regexes: Iterable[Tuple[Pattern[str], MatchCallback]],
+        profile: ParserProfile
+) -> int:
+    # The same as _parse(), but records every attempt.
+    perf_counter: Callable[[], float] = time.perf_counter
+    parsers: List[Tuple[Callable[[str, int, int], Optional[Match[str]]],
+                        MatchCallback, ParserFragmentStats]] = \
+        [(regex.match, func, profile.fragment(regex, func))
+         for regex, func in regexes]
+    matches: int = 0
+
+    action: ParserAction
+    match: Optional[Match[str]]
+    while True:
+        matched: bool = False
+        for match_regex, func, stats in parsers:
+            again: bool = False
+            while True:
+                start: float = perf_counter()
+                match = match_regex(state.string, state.position,
+                                    state.endpos)
+                matched_at: float = perf_counter()
+                stats.attempts += 1
+                stats.match_time += matched_at - start
+                if match is None:
+                    stats.failures += 1
+                    stats.time += matched_at - start
+                    if not again:
+                        action = _Continue
+                        break
+                    action = state.again_not_matched_action
+                else:
+                    matched = True
+                    matches += 1
+                    stats.matches += 1
+                    stats.bytes += match.end() - match.start()
+                    ret: MatchCallbackReturn = func(state, match)
+                    if ret is None:
+                        action = state.default_action
+                        state.position = match.end()
+                    elif type(ret) is ParserAction:
+                        action = ret  # type: ignore
+                        state.position = match.end()
+                    else:
+                        action = _tuple_action(state, match, ret)
+                    stats.time += perf_counter() - start
+
+                if action is _Again:
+                    again = True
+                elif action is _Continue:
+                    break
+                elif action is _Stop:
+                    return matches
+                else:
+                    assert action is _Restart, \
+                        'Internal parser state corrupt'
+                    break
+            if action is _Restart:
+                break
         else:
-            raise ValueError('Invalid value returned from match callback')
+            if not matched:
+                return matches
+
+
+def _tuple_action(
+        state: ParserState,
+        match: Match[str],
+        ret: MatchCallbackReturn
+) -> ParserAction:
+    if isinstance(ret, ParserAction):
+        state.position = match.end()
+        return ret
+    if not isinstance(ret, tuple):
+        raise ValueError('Invalid value returned from match callback')
+    if len(ret) > 2:
+        raise ValueError(
+            'Too many values returned from match callback'
+        )
 
-    return matches
+    action: ParserAction
+    if ret[0] is None:
+        action = state.default_action
+    elif isinstance(ret[0], ParserAction):
+        action = ret[0]
+    else:
+        raise ValueError('Returned action value is not a ParserAction')
+    if len(ret) > 1 and ret[1]:
+        state.position += match.end() - match.start()
+    return action
@@ -1,36 +1,243 @@
-import shutil
-import subprocess
-from typing import Tuple, Dict
+import concurrent.futures
+import concurrent.futures.process
+import locale
+import os
+import threading
+from typing import Container, Dict, List, Optional, Pattern, Sequence, \
+                   Tuple
 
-from .parser import parse
-from .classes import XRandRScreen
-from .parsing_fragments import screen_func, screen_regex
+from .parser import MatchCallback, ParserAction, ParserState, parse, \
+                    parse_nested
+from .classes import XRandROutput, XRandRScreen
+from .interning import XRandRModeInternTable
+from .launcher import default_launcher
+from .parsing_fragments import output_func, \
+                               output_mode_nonverbose_func, \
+                               output_mode_nonverbose_regex, \
+                               output_mode_verbose_func, \
+                               output_mode_verbose_regex, \
+                               output_property_other_parser_list, \
+                               output_property_parsers_by_name, \
+                               output_regex, screen_func, screen_regex
+from .tokenizer import XRandRTextBlock, tokenize
 
-__all__ = ('parse_xrandr', 'parse_screens')
+__all__ = ('parse_xrandr', 'parse_screens', 'parse_output_block')
 
+_mode_parser_list: Tuple[Tuple[Pattern[str], MatchCallback], ...] = (
+    (output_mode_nonverbose_regex, output_mode_nonverbose_func),
+    (output_mode_verbose_regex, output_mode_verbose_func)
+)
 
-def parse_xrandr() -> Tuple[Dict[str, XRandRScreen], bool]:
-    xrandr_path = shutil.which('xrandr')
-    if not xrandr_path:
-        raise FileNotFoundError('xrandr not found')
 
-    with subprocess.Popen(('xrandr', '--verbose'), executable=xrandr_path,
-                          stdout=subprocess.PIPE, universal_newlines=True
-                          ) as popen:
-        xrandr_output: str = popen.stdout.read()
+def parse_xrandr(
+        display: Optional[str] = None,
+        mode_table: Optional[XRandRModeInternTable] = None
+) -> Tuple[Dict[str, XRandRScreen], bool]:
+    output: Optional[bytes] = default_launcher.run(
+        ('--verbose',),
+        display,
+        capture_output=True
+    )[1]
+    assert output is not None
 
-    return parse_screens(xrandr_output)
+    xrandr_output: str = output.decode(locale.getpreferredencoding(False))
+    return parse_screens(xrandr_output, mode_table=mode_table)
 
 
 def parse_screens(
         xrandr_output: str,
-        start: int = 0
+        start: int = 0,
+        mode_table: Optional[XRandRModeInternTable] = None,
+        output_names: Optional[Container[str]] = None,
+        processes: int = 1,
+        parallel_threshold: int = 256 * 1024,
+        executor: Optional[concurrent.futures.Executor] = None
 ) -> Tuple[Dict[str, XRandRScreen], bool]:
-    xrandr_output, start, screens = parse(
-        xrandr_output,
-        start,
-        ((screen_regex, screen_func),),
-        {}
-    )[:-1]
-    success = start == len(xrandr_output)
+    screens: Dict[int, XRandRScreen] = {}
+    success: bool = True
+
+    position: int = start
+    for screen_block in tokenize(xrandr_output, start):
+        if screen_block.start != position:
+            success = False
+
+        if screen_block.header_end == screen_block.start:
+            # Output blocks in front of the first Screen line belong to no
+            # screen, they are skipped.
+            success = False
+            position = screen_block.end
+            continue
+        header_end: int = parse(
+            xrandr_output,
+            screen_block.start,
+            ((screen_regex, screen_func),),
+            screens,
+            endpos=screen_block.header_end
+        )[1]
+        if header_end != screen_block.header_end:
+            success = False
+            break
+        screen: XRandRScreen = screens[int(screen_block.name)]
+
+        position = screen_block.header_end
+        output_blocks: List[XRandRTextBlock] = []
+        for output_block in screen_block.children:
+            if (output_names is None
+                    or output_block.name in output_names):
+                output_blocks.append(output_block)
+            position = output_block.end
+
+        results: List[Tuple[Optional[XRandROutput], bool]]
+        if ((executor is not None or processes > 1)
+                and screen_block.end - screen_block.start
+                >= parallel_threshold):
+            results = _parse_output_blocks_parallel(
+                output_blocks,
+                executor,
+                processes
+            )
+        else:
+            results = [parse_output_block(block) for block in output_blocks]
+
+        for output, output_success in results:
+            if output is not None:
+                screen.outputs[output.name] = output
+            success = success and output_success
+    if position != len(xrandr_output):
+        success = False
+
+    if mode_table is not None:
+        mode_table.intern_screens(screens)
+    for screen in screens.values():
+        screen.reindex()
     return screens, success
+
+
+def parse_output_block(
+        block: XRandRTextBlock
+) -> Tuple[Optional[XRandROutput], bool]:
+    text: str = block.text
+    outputs: Dict[str, XRandROutput] = {}
+    state: ParserState = ParserState(
+        text,
+        block.start,
+        outputs,
+        endpos=block.header_end
+    )
+    parse_nested(state, ((output_regex, output_func),), outputs)
+    output: Optional[XRandROutput] = next(iter(outputs.values()), None)
+    if (output is None or len(outputs) != 1
+            or state.position != block.header_end):
+        return output, False
+    assert output.properties is not None and output.modes is not None
+
+    # Every property block is parsed on its own, from behind the tab the
+    # property regexes look behind for, with only the fragments that can
+    # match its name. Runs of mode blocks are parsed in one go.
+    children: Sequence[XRandRTextBlock] = block.children
+    success: bool = True
+    position: int = block.header_end
+    index: int = 0
+    while index < len(children):
+        child: XRandRTextBlock = children[index]
+        if not _is_space(text, position, child.start):
+            success = False
+        if child.kind == XRandRTextBlock.Kind.Property:
+            state.position = child.start + 1
+            state.endpos = position = child.end
+            parse_nested(
+                state,
+                output_property_parsers_by_name.get(
+                    child.name,
+                    output_property_other_parser_list
+                ),
+                output.properties,
+                ParserAction.Continue
+            )
+            index += 1
+        else:
+            index += 1
+            while (index < len(children) and children[index].kind
+                   == XRandRTextBlock.Kind.Mode):
+                index += 1
+            state.position = child.start + (
+                3 if text.startswith('   ', child.start) else 2
+            )
+            state.endpos = position = children[index - 1].end
+            parse_nested(
+                state,
+                _mode_parser_list,
+                output.modes,
+                ParserAction.Again
+            )
+        if state.position != position:
+            success = False
+    return output, success and _is_space(text, position, block.end)
+
+
+def _is_space(text: str, start: int, end: int) -> bool:
+    return start == end or text[start:end].isspace()
+
+
+def _parse_output_text(text: str) -> Tuple[Optional[XRandROutput], bool]:
+    return parse_output_block(XRandRTextBlock(
+        XRandRTextBlock.Kind.Output,
+        text,
+        0,
+        len(text)
+    ))
+
+
+def _parse_output_blocks_parallel(
+        blocks: List[XRandRTextBlock],
+        executor: Optional[concurrent.futures.Executor],
+        processes: int
+) -> List[Tuple[Optional[XRandROutput], bool]]:
+    # Output blocks always start at the beginning of a line, so they can be
+    # parsed on their own. Only the block text is sent to the workers.
+    texts: List[str] = [str(block) for block in blocks]
+    workers: int = processes if processes > 1 else os.cpu_count() or 1
+    chunksize: int = max(1, len(texts) // (workers * 4))
+
+    if executor is not None:
+        return list(executor.map(
+            _parse_output_text,
+            texts,
+            chunksize=chunksize
+        ))
+    pool: concurrent.futures.ProcessPoolExecutor = _process_pool(processes)
+    try:
+        return list(pool.map(_parse_output_text, texts, chunksize=chunksize))
+    except concurrent.futures.process.BrokenProcessPool:
+        # A worker died, the next call starts a new pool.
+        _shutdown_process_pool(pool)
+        raise
+
+
+# Starting the worker processes costs more than parsing most dumps, so the
+# pool is created on first use and kept for the following calls. It is
+# replaced when a different number of processes is asked for.
+_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_pool_processes: int = 0
+_pool_lock: threading.Lock = threading.Lock()
+
+
+def _process_pool(processes: int) -> concurrent.futures.ProcessPoolExecutor:
+    global _pool, _pool_processes
+    with _pool_lock:
+        if _pool is None or _pool_processes != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = concurrent.futures.ProcessPoolExecutor(processes)
+            _pool_processes = processes
+        return _pool
+
+
+def _shutdown_process_pool(
+        pool: concurrent.futures.ProcessPoolExecutor
+) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
@@ -1,12 +1,12 @@
 import re
-from typing import Iterable, Match, Optional, Pattern, Tuple
+from typing import Dict, Iterable, Match, Optional, Pattern, Tuple
 
 from .classes import XRandRBorder, XRandRDimensions, XRandRGeometry, \
-                     XRandROffset, XRandROutput, XRandROutputProperties, \
-                     XRandRScreen, XRandRScreenDimensionsList, XRandRTransform
+                     XRandROutput, XRandROutputProperties, XRandRScreen, \
+                     XRandRScreenDimensionsList, XRandRTransform
 from .mappings import text_to_flag, text_to_reflection, text_to_rotation, \
                       text_to_subpixel_order, text_to_supported_reflection
-from .parser import MatchCallback, ParserAction, ParserState, parse
+from .parser import MatchCallback, ParserAction, ParserState, parse_nested
 
 
 screen_regex = re.compile(r'Screen\s*(?P<screen_number>\d+):\s*')
@@ -19,18 +19,16 @@ def screen_func(
 
     state.position = match.end()
 
-    state.string, state.position, screen.dimensions = parse(
-        state.string,
-        state.position,
+    screen.dimensions = parse_nested(
+        state,
         ((screen_dimensions_regex, screen_dimensions_func),),
         XRandRScreenDimensionsList()
-    )[:-1]
-    state.string, state.position, screen.outputs = parse(
-        state.string,
-        state.position,
+    )
+    screen.outputs = parse_nested(
+        state,
         ((output_regex, output_func),),
         {}
-    )[:-1]
+    )
 
     return ParserAction.Again, False
 
@@ -101,15 +99,11 @@ def output_func(
     output.primary = bool(match.group('primary'))
 
     if match.group('geometry'):
-        output.geometry = XRandRGeometry(
-            XRandRDimensions(
-                int(match.group('width')),
-                int(match.group('height'))
-            ),
-            XRandROffset(
-                int(match.group('x')),
-                int(match.group('y'))
-            )
+        output.geometry = XRandRGeometry.from_values(
+            int(match.group('width')),
+            int(match.group('height')),
+            int(match.group('x')),
+            int(match.group('y'))
         )
 
     if match.group('mode'):
@@ -126,54 +120,48 @@ def output_func(
 
     state.position = match.end()
 
-    if (len(state.string) > state.position
-            and state.string[state.position] == '('):
+    if state.string.startswith('(', state.position, state.endpos):
         state.position += 1
 
-        state.string, state.position, output.supported_rotations = parse(
-            state.string,
-            state.position,
+        output.supported_rotations = parse_nested(
+            state,
             ((
                 output_supported_rotation_regex,
                 output_supported_rotation_func
             ),),
             []
-        )[:-1]
-        state.string, state.position, output.supported_reflections = parse(
-            state.string,
-            state.position,
+        )
+        output.supported_reflections = parse_nested(
+            state,
             ((
                 output_supported_reflection_regex,
                 output_supported_reflection_func
             ),),
             []
-        )[:-1]
+        )
 
-    state.string, state.position, output = parse(
-        state.string,
-        state.position,
+    output = parse_nested(
+        state,
         ((output_regex2, output_func2),),
         output
-    )[:-1]
+    )
 
-    state.string, state.position, output.properties = parse(
-        state.string,
-        state.position,
+    output.properties = parse_nested(
+        state,
         output_property_parser_list,
         XRandROutputProperties(),
         ParserAction.Continue
-    )[:-1]
+    )
 
-    state.string, state.position, output.modes = parse(
-        state.string,
-        state.position,
+    output.modes = parse_nested(
+        state,
         (
             (output_mode_nonverbose_regex, output_mode_nonverbose_func),
             (output_mode_verbose_regex, output_mode_verbose_func)
         ),
         [],
         ParserAction.Again
-    )[:-1]
+    )
 
     return ParserAction.Again, False
 
@@ -233,34 +221,26 @@ output_regex2 = re.compile(
 )
 def output_func2(state: ParserState, match: Match[str]) -> ParserAction:
     output: XRandROutput = state.data
-    output.dimensions_mm = XRandRDimensions[int](
+    output.dimensions_mm = XRandRDimensions(
         int(match.group('width_mm')),
         int(match.group('height_mm'))
     )
     if match.group('panning'):
-        output.panning = XRandRGeometry[int](
-            XRandRDimensions[int](
-                int(match.group('pan_width')),
-                int(match.group('pan_height'))
-            ),
-            XRandROffset[int](
-                int(match.group('pan_left')),
-                int(match.group('pan_top'))
-            )
+        output.panning = XRandRGeometry.from_values(
+            int(match.group('pan_width')),
+            int(match.group('pan_height')),
+            int(match.group('pan_left')),
+            int(match.group('pan_top'))
         )
     if match.group('tracking'):
-        output.tracking = XRandRGeometry[int](
-            XRandRDimensions[int](
-                int(match.group('track_width')),
-                int(match.group('track_height'))
-            ),
-            XRandROffset[int](
-                int(match.group('track_left')),
-                int(match.group('track_top'))
-            )
+        output.tracking = XRandRGeometry.from_values(
+            int(match.group('track_width')),
+            int(match.group('track_height')),
+            int(match.group('track_left')),
+            int(match.group('track_top'))
         )
     if match.group('border'):
-        output.border = XRandRBorder[int](
+        output.border = XRandRBorder(
             int(match.group('border_left')),
             int(match.group('border_top')),
             int(match.group('border_right')),
@@ -320,9 +300,9 @@ def output_property_subpixel_order_func(
 output_property_gamma_regex = re.compile(
     r'''
     (?<=^\t)Gamma:\s*
-    (?P<gamma_red>\d*\.\d*(?:e\d+)?)
-    :(?P<gamma_green>\d*\.\d*(?:e\d+)?)
-    :(?P<gamma_blue>\d*\.\d*(?:e\d+)?)
+    (?P<gamma_red>(?:\d+\.\d*|\.\d+)(?:e\d+)?)
+    :(?P<gamma_green>(?:\d+\.\d*|\.\d+)(?:e\d+)?)
+    :(?P<gamma_blue>(?:\d+\.\d*|\.\d+)(?:e\d+)?)
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -341,7 +321,7 @@ def output_property_gamma_func(
 output_property_brightness_regex = re.compile(
     r'''
     (?<=^\t)Brightness:\s*
-    (?P<brightness>\d*\.\d*(?:e\d+)?)
+    (?P<brightness>(?:\d+\.\d*|\.\d+)(?:e\d+)?)
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -355,7 +335,7 @@ def output_property_brightness_func(
 
 output_property_clones_regex = re.compile(
     r'''(?<=^\t)
-    Clones:[^\S\n]*(?P<clones>(?:\S+[^\S\n]*)*)
+    Clones:[^\S\n]*(?P<clones>[^\n]*)
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -383,7 +363,7 @@ def output_property_crtc_func(
 
 output_property_crtcs_regex = re.compile(
     r'''(?<=^\t)
-    CRTCs:\s*(?P<crtcs>(?:\d+(?:$|\s+))+)
+    CRTCs:[^\S\n]*(?P<crtcs>\d[\d\t\ ]*)
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -410,15 +390,11 @@ def output_property_panning_func(
         state: ParserState,
         match: Match[str]
 ) -> None:
-    state.data.panning = XRandRGeometry(
-        XRandRDimensions(
-            int(match.group('pan_width')),
-            int(match.group('pan_height'))
-        ),
-        XRandROffset(
-            int(match.group('pan_left')),
-            int(match.group('pan_top'))
-        )
+    state.data.panning = XRandRGeometry.from_values(
+        int(match.group('pan_width')),
+        int(match.group('pan_height')),
+        int(match.group('pan_left')),
+        int(match.group('pan_top'))
     )
 
 
@@ -435,15 +411,11 @@ def output_property_tracking_func(
         state: ParserState,
         match: Match[str]
 ) -> None:
-    state.data.tracking = XRandRGeometry(
-        XRandRDimensions(
-            int(match.group('track_width')),
-            int(match.group('track_height'))
-        ),
-        XRandROffset(
-            int(match.group('track_left')),
-            int(match.group('track_top'))
-        )
+    state.data.tracking = XRandRGeometry.from_values(
+        int(match.group('track_width')),
+        int(match.group('track_height')),
+        int(match.group('track_left')),
+        int(match.group('track_top'))
     )
 
 
@@ -475,8 +447,8 @@ output_property_transform_regex = re.compile(
     r'''
     (?<=^\t)Transform:\s*
     (?P<matrix>
-        (?:\d*(?:\.\d*)\s+){8}
-        \d*(?:\.\d*)
+        (?:-?(?:\d+\.\d*|\.\d+)\s+){8}
+        -?(?:\d+\.\d*|\.\d+)
     )\s*
     (?:
         filter:[^\S\n]*
@@ -498,10 +470,10 @@ def output_property_transform_func(
 
 output_property_edid_regex = re.compile(
     r'''
-    (?<=^\t)EDID:\s*
+    (?<=^\t)EDID:[^\S\n]*
     (?P<edid>
-        (?:(?:[0-9A-Fa-f][0-9A-Fa-f]){16}\s*)*
-        (?:[0-9A-Fa-f][0-9A-Fa-f])*
+        [0-9A-Fa-f]*
+        (?:[^\S\n]*\n\t\t[0-9A-Fa-f]+)*
     )\s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -510,7 +482,9 @@ def output_property_edid_func(
         state: ParserState,
         match: Match[str]
 ) -> None:
-    state.data.edid = bytes.fromhex(match.group('edid'))
+    edid: str = ''.join(match.group('edid').split())
+    # A truncated dump may end in the middle of a byte.
+    state.data.edid = bytes.fromhex(edid[:len(edid) & ~1])
 
 
 output_property_guid_regex = re.compile(
@@ -536,14 +510,14 @@ def output_property_guid_func(
         state: ParserState,
         match: Match[str]
 ) -> None:
-    state.data.edid = bytes.fromhex(
+    state.data.guid = bytes.fromhex(
         match.group('guid')[1:-1].replace('-', '')
     )
 
 
 output_property_other_regex = re.compile(
     r'''
-    (?<=^\t)(?P<name>[^:]+):[^\S\n]*(?P<value>.*)\s*
+    (?<=^\t)(?P<name>[^:\n]+):[^\S\n]*(?P<value>.*)\s*
     (?:(?P<range>range:)|(?P<supported>supported:))?
     ''',
     re.VERBOSE | re.MULTILINE
@@ -559,7 +533,7 @@ def output_property_other_func(
     if state.data.other is None:
         state.data.other = {}
     state.data.other[output_property.name] = output_property
-    if output_property.value[-1] == ' ':
+    if output_property.value.endswith(' '):
         output_property.value = output_property.value[:-1]
 
     regex = None
@@ -577,20 +551,19 @@ def output_property_other_func(
 
     state.position = match.end()
     if regex is not None:
-        state.string, state.position, output_property = parse(
-            state.string,
-            state.position,
+        output_property = parse_nested(
+            state,
             (regex,),
             output_property
-        )[:-1]
+        )
         return None, False
     return None
 
 
 output_property_other_range_regex = re.compile(
     r'''
-    \ \((?P<start_val>[^,]+),
-    \ (?P<end_val>[^)]+)\)
+    \ \((?P<start_val>[^,\n]+),
+    \ (?P<end_val>[^)\n]+)\)
     (?:,|(?P<end>$\s*))
     ''',
     re.VERBOSE | re.MULTILINE
@@ -642,6 +615,46 @@ output_property_parser_list: Iterable[Tuple[Pattern[str], MatchCallback]] = (
     (output_property_guid_regex, output_property_guid_func),
     (output_property_other_regex, output_property_other_func)
 )
+# The fragments to try for a property line, by the name in front of the
+# colon. The names not listed here are other properties.
+output_property_parsers_by_name: \
+    Dict[str, Tuple[Tuple[Pattern[str], MatchCallback], ...]] = {
+        name: (
+            (regex, func),
+            (output_property_other_regex, output_property_other_func)
+        )
+        for name, regex, func in (
+            ('Identifier', output_property_identifier_regex,
+             output_property_identifier_func),
+            ('Timestamp', output_property_timestamp_regex,
+             output_property_timestamp_func),
+            ('Subpixel', output_property_subpixel_order_regex,
+             output_property_subpixel_order_func),
+            ('Gamma', output_property_gamma_regex,
+             output_property_gamma_func),
+            ('Brightness', output_property_brightness_regex,
+             output_property_brightness_func),
+            ('Clones', output_property_clones_regex,
+             output_property_clones_func),
+            ('CRTC', output_property_crtc_regex, output_property_crtc_func),
+            ('CRTCs', output_property_crtcs_regex,
+             output_property_crtcs_func),
+            ('Panning', output_property_panning_regex,
+             output_property_panning_func),
+            ('Tracking', output_property_tracking_regex,
+             output_property_tracking_func),
+            ('Border', output_property_border_regex,
+             output_property_border_func),
+            ('Transform', output_property_transform_regex,
+             output_property_transform_func),
+            ('EDID', output_property_edid_regex, output_property_edid_func),
+            ('GUID', output_property_guid_regex, output_property_guid_func)
+        )
+    }
+output_property_other_parser_list: \
+    Tuple[Tuple[Pattern[str], MatchCallback], ...] = (
+        (output_property_other_regex, output_property_other_func),
+    )
 
 
 output_mode_nonverbose_regex = re.compile(
@@ -652,7 +665,7 @@ output_mode_nonverbose_regex = re.compile(
 )
 output_mode_nonverbose_clock_regex = re.compile(
     r'''
-    (?P<clock>\d*\.\d*)
+    (?P<clock>\d+\.\d*|\.\d+)
     (?P<current>\*|\ )
     (?P<preferred>\+|\ )
     \s*
@@ -672,7 +685,8 @@ def output_mode_nonverbose_func(
     while True:
         _match = output_mode_nonverbose_clock_regex.match(
             state.string,
-            pos=state.position
+            state.position,
+            state.endpos
         )
         if not _match:
             break
@@ -688,14 +702,14 @@ def output_mode_nonverbose_func(
         state.data.append(mode)
         state.position = _match.end()
 
-    return ParserAction.Again
+    return ParserAction.Again, False
 
 
 output_mode_verbose_regex = re.compile(
     r'''
     (?<=^\ {2})(?P<name>\S+)\s+
     \((?P<id>0x[0-9A-Fa-f]+)\)\s+
-    (?P<dotclock>\d*\.\d*)MHz
+    (?P<dotclock>\d+\.\d*|\.\d+)MHz
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -713,18 +727,16 @@ def output_mode_verbose_func(
 
     state.position = match.end()
 
-    state.string, state.position, mode.flags = parse(
-        state.string,
-        state.position,
+    mode.flags = parse_nested(
+        state,
         ((output_mode_verbose_flag_regex, output_mode_verbose_flag_func),),
         XRandROutput.Mode.Flags(0)
-    )[:-1]
-    state.string, state.position, mode = parse(
-        state.string,
-        state.position,
+    )
+    mode = parse_nested(
+        state,
         ((output_mode_verbose_regex2, output_mode_verbose_func2),),
         mode
-    )[:-1]
+    )
 
     return ParserAction.Again, False
 
@@ -756,14 +768,14 @@ output_mode_verbose_regex2 = re.compile(
     end\s+(?P<h_sync_end>\d+)\s+
     total\s+(?P<h_total>\d+)\s+
     skew\s+(?P<h_skew>\d+)\s+
-    clock\s+(?P<h_clock>\d*\.\d*)KHz\s+
+    clock\s+(?P<h_clock>\d+\.\d*|\.\d+)KHz\s+
 
     (?<=^\ {8})v:\s*
     height\s+(?P<height>\d+)\s+
     start\s+(?P<v_sync_start>\d+)\s+
     end\s+(?P<v_sync_end>\d+)\s+
     total\s+(?P<v_total>\d+)\s+
-    clock\s+(?P<refresh>\d*\.\d*)Hz
+    clock\s+(?P<refresh>\d+\.\d*|\.\d+)Hz
     \s*
     ''',
     re.VERBOSE | re.MULTILINE
@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from .parser import ParserFragmentStats, ParserProfile
+from .parsing_entry import parse_screens
+
+__all__ = ('profile_screens', 'format_profile')
+
+
+def profile_screens(
+        xrandr_output: str,
+        repeat: int = 1,
+        profile: Optional[ParserProfile] = None
+) -> ParserProfile:
+    # Parses in this process only, so that every fragment is recorded.
+    if profile is None:
+        profile = ParserProfile()
+    with profile:
+        for _ in range(repeat):
+            parse_screens(xrandr_output)
+    return profile
+
+
+def format_profile(
+        profile: ParserProfile,
+        limit: Optional[int] = None,
+        key: str = 'match_time'
+) -> str:
+    ranked: List[ParserFragmentStats] = profile.ranked(key)[:limit]
+    total: float = sum(
+        stats.match_time for stats in profile.fragments.values()
+    ) or 1.
+    lines: List[str] = ['{:<40} {:>8} {:>8} {:>8} {:>9} {:>9} {:>9} {:>6}'
+                        .format('fragment', 'attempts', 'matches', 'failed',
+                                'bytes', 'match ms', 'total ms', 'share')]
+    for stats in ranked:
+        lines.append(
+            '{:<40} {:>8} {:>8} {:>8} {:>9} {:>9.2f} {:>9.2f} {:>6.1%}'
+            .format(stats.name[:40], stats.attempts, stats.matches,
+                    stats.failures, stats.bytes, stats.match_time * 1e3,
+                    stats.time * 1e3, stats.match_time / total)
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .launcher import XRandRLauncher, default_launcher
+
+__all__ = ('XRandRRampScheduler',)
+
+Gamma = Tuple[float, float, float]
+
+
+class _Ramp:
+    __slots__ = ('start', 'target', 'start_time', 'duration')
+    start: Tuple[float, ...]
+    target: Tuple[float, ...]
+    start_time: float
+    duration: float
+
+    def __init__(
+            self,
+            start: Tuple[float, ...],
+            target: Tuple[float, ...],
+            start_time: float,
+            duration: float
+    ) -> None:
+        self.start = start
+        self.target = target
+        self.start_time = start_time
+        self.duration = duration
+
+    def value(self, now: float) -> Tuple[float, ...]:
+        if self.duration <= 0 or now >= self.start_time + self.duration:
+            return self.target
+        t: float = max(0., (now - self.start_time) / self.duration)
+        return tuple(s + (e - s) * t for s, e in zip(self.start, self.target))
+
+    def done(self, now: float) -> bool:
+        return now >= self.start_time + self.duration
+
+
+class XRandRRampScheduler:
+    # Frames are computed from the clock when they are sent, not queued, so
+    # a slow xrandr call simply skips the frames that were due in the
+    # meantime; those are counted as dropped. Every frame updates all
+    # ramping outputs with a single xrandr call. Ramps may be added from
+    # other threads while run() is active.
+    __slots__ = ('screen', 'max_rate', 'display', 'launcher', 'clock',
+                 'frames_sent', 'frames_dropped', '_ramps', '_values',
+                 '_sent', '_last_frame', '_lock')
+    screen: int
+    max_rate: float
+    display: Optional[str]
+    launcher: XRandRLauncher
+    clock: Callable[[], float]
+    frames_sent: int
+    frames_dropped: int
+    _ramps: Dict[Tuple[str, str], _Ramp]
+    _values: Dict[Tuple[str, str], Tuple[float, ...]]
+    _sent: Dict[Tuple[str, str], Tuple[float, ...]]
+    _last_frame: Optional[float]
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            screen: int = 0,
+            max_rate: float = 30.,
+            display: Optional[str] = None,
+            launcher: XRandRLauncher = default_launcher,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.screen = screen
+        self.max_rate = max_rate
+        self.display = display
+        self.launcher = launcher
+        self.clock = clock
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self._ramps = {}
+        self._values = {}
+        self._sent = {}
+        self._last_frame = None
+        self._lock = threading.Lock()
+
+    def ramp(
+            self,
+            output: str,
+            brightness: Optional[float] = None,
+            gamma: Optional[Gamma] = None,
+            duration: float = 0.,
+            start_brightness: Optional[float] = None,
+            start_gamma: Optional[Gamma] = None
+    ) -> None:
+        # Without an explicit start value a ramp starts at the value the
+        # output currently has according to the scheduler, or 1.
+        now: float = self.clock()
+        with self._lock:
+            if brightness is not None:
+                self._add(output, 'brightness', (brightness,), duration, now,
+                          None if start_brightness is None
+                          else (start_brightness,))
+            if gamma is not None:
+                self._add(output, 'gamma', tuple(gamma), duration, now,
+                          None if start_gamma is None else tuple(start_gamma))
+
+    def _add(
+            self,
+            output: str,
+            prop: str,
+            target: Tuple[float, ...],
+            duration: float,
+            now: float,
+            start: Optional[Tuple[float, ...]]
+    ) -> None:
+        key: Tuple[str, str] = (output, prop)
+        if start is None:
+            ramp: Optional[_Ramp] = self._ramps.get(key)
+            if ramp is not None:
+                start = ramp.value(now)
+            else:
+                start = self._values.get(key, (1.,) * len(target))
+        self._ramps[key] = _Ramp(start, target, now, duration)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._ramps)
+
+    def tick(self) -> bool:
+        now: float = self.clock()
+        with self._lock:
+            frame: Dict[str, Dict[str, Tuple[float, ...]]] = {}
+            for key, ramp in list(self._ramps.items()):
+                value: Tuple[float, ...] = tuple(
+                    round(v, 4) for v in ramp.value(now)
+                )
+                self._values[key] = value
+                if ramp.done(now):
+                    del self._ramps[key]
+                if self._sent.get(key) != value:
+                    frame.setdefault(key[0], {})[key[1]] = value
+            active: bool = bool(self._ramps)
+
+        if self._last_frame is not None and self.max_rate > 0:
+            missed: int = int((now - self._last_frame) * self.max_rate) - 1
+            if missed > 0:
+                self.frames_dropped += missed
+        self._last_frame = now if active else None
+        if not frame:
+            return active
+
+        args: List[str] = ['--screen', str(self.screen)]
+        for output, values in frame.items():
+            args.extend(('--output', output))
+            if 'brightness' in values:
+                args.extend(('--brightness', str(values['brightness'][0])))
+            if 'gamma' in values:
+                args.extend(('--gamma', ':'.join(
+                    str(v) for v in values['gamma']
+                )))
+        self.launcher.run(args, self.display)
+        with self._lock:
+            for output, values in frame.items():
+                for prop, value in values.items():
+                    self._sent[output, prop] = value
+        self.frames_sent += 1
+        return active
+
+    def run(self, sleep: Callable[[float], None] = time.sleep) -> None:
+        interval: float = 1 / self.max_rate if self.max_rate > 0 else 0.
+        while self.tick():
+            delay: float = (self._last_frame or 0.) + interval - self.clock()
+            if delay > 0:
+                sleep(delay)
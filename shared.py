@@ -0,0 +1,189 @@
+import struct
+import time
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Set
+
+from .classes import XRandRScreen
+from .parsing_entry import parse_xrandr
+from .snapshot import decode_snapshot, encode_snapshot
+
+if TYPE_CHECKING:
+    # multiprocessing.shared_memory is new in Python 3.8, it is imported
+    # when a segment is created or opened.
+    from multiprocessing import shared_memory
+
+__all__ = ('XRandRSharedStatePublisher', 'XRandRSharedStateReader')
+
+_MAGIC: bytes = b'XRRM'
+_VERSION: int = 1
+
+# magic, version, sequence, snapshot length, capacity
+_HEADER = struct.Struct('<4sBxxxQQQ')
+_SEQUENCE = struct.Struct('<Q')
+_SEQUENCE_OFFSET: int = 8
+_LENGTH = struct.Struct('<Q')
+_LENGTH_OFFSET: int = 16
+
+_DEFAULT_CAPACITY: int = 1 << 20
+
+_published_names: Set[str] = set()
+
+
+class XRandRSharedStatePublisher:
+    # The segment is guarded by a sequence lock: the sequence number is odd
+    # while a snapshot is being written, readers retry until they see the
+    # same even number before and after decoding. Only one publisher may
+    # write to a segment.
+    __slots__ = ('_memory', '_sequence', 'capacity')
+    _memory: 'shared_memory.SharedMemory'
+    _sequence: int
+    capacity: int
+
+    def __init__(
+            self,
+            name: Optional[str] = None,
+            capacity: int = _DEFAULT_CAPACITY
+    ) -> None:
+        from multiprocessing import shared_memory
+        self._memory = shared_memory.SharedMemory(
+            name,
+            create=True,
+            size=_HEADER.size + capacity
+        )
+        _published_names.add(self._memory.name)
+        self._sequence = 0
+        self.capacity = capacity
+        _HEADER.pack_into(self._memory.buf, 0, _MAGIC, _VERSION, 0, 0,
+                          capacity)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def generation(self) -> int:
+        return self._sequence // 2
+
+    def publish(self, screens: Mapping[Any, XRandRScreen]) -> int:
+        data: bytes = encode_snapshot(screens)
+        if len(data) > self.capacity:
+            raise ValueError(
+                'Snapshot of {} bytes exceeds the capacity of {} bytes'
+                .format(len(data), self.capacity)
+            )
+
+        buf: memoryview = self._memory.buf
+        self._sequence += 1
+        _SEQUENCE.pack_into(buf, _SEQUENCE_OFFSET, self._sequence)
+        buf[_HEADER.size:_HEADER.size + len(data)] = data
+        _LENGTH.pack_into(buf, _LENGTH_OFFSET, len(data))
+        self._sequence += 1
+        _SEQUENCE.pack_into(buf, _SEQUENCE_OFFSET, self._sequence)
+        return self.generation
+
+    def publish_xrandr(self, display: Optional[str] = None) -> bool:
+        screens, success = parse_xrandr(display)
+        self.publish(screens)
+        return success
+
+    def close(self) -> None:
+        self._memory.close()
+
+    def unlink(self) -> None:
+        self._memory.unlink()
+        _published_names.discard(self._memory.name)
+
+    def __enter__(self) -> 'XRandRSharedStatePublisher':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+        self.unlink()
+
+
+class XRandRSharedStateReader:
+    # Snapshots are decoded straight from the shared segment, and only once
+    # per generation. The returned objects are frozen because they are
+    # handed out to every caller until the next generation is published.
+    __slots__ = ('_memory', '_sequence', '_screens')
+    _memory: 'shared_memory.SharedMemory'
+    _sequence: int
+    _screens: Optional[Mapping[Any, XRandRScreen]]
+
+    def __init__(self, name: str) -> None:
+        from multiprocessing import shared_memory
+        self._memory = shared_memory.SharedMemory(name)
+        if self._memory.name not in _published_names:
+            _untrack(self._memory)
+        magic, version = _HEADER.unpack_from(self._memory.buf)[:2]
+        if magic != _MAGIC:
+            self._memory.close()
+            raise ValueError('Not an xrandr shared state segment')
+        if version != _VERSION:
+            self._memory.close()
+            raise ValueError(
+                'Unsupported xrandr shared state version {}'.format(version)
+            )
+        self._sequence = 0
+        self._screens = None
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def generation(self) -> int:
+        return _SEQUENCE.unpack_from(self._memory.buf,
+                                     _SEQUENCE_OFFSET)[0] // 2
+
+    def read(self) -> Optional[Mapping[Any, XRandRScreen]]:
+        buf: memoryview = self._memory.buf
+        while True:
+            sequence: int = _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if sequence == self._sequence:
+                return self._screens
+
+            length: int = _LENGTH.unpack_from(buf, _LENGTH_OFFSET)[0]
+            screens: Any = None
+            # Only the message of a failure is kept. The exception would
+            # keep the decoder's view of the segment alive through its
+            # traceback, and close() cannot release the segment until then.
+            error: Optional[str] = None
+            with buf[_HEADER.size:_HEADER.size + length] as view:
+                try:
+                    screens = decode_snapshot(view, True)
+                except Exception as e:
+                    error = str(e)
+            if sequence != _SEQUENCE.unpack_from(buf, _SEQUENCE_OFFSET)[0]:
+                continue
+            if error is not None:
+                raise ValueError(error)
+            self._sequence = sequence
+            self._screens = screens
+            return screens
+
+    def close(self) -> None:
+        self._screens = None
+        self._memory.close()
+
+    def __enter__(self) -> 'XRandRSharedStateReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _untrack(memory: 'shared_memory.SharedMemory') -> None:
+    # Before Python 3.13 attaching to a segment registers it with the
+    # resource tracker, which would unlink it when the reader exits. The
+    # tracker is shared within a process, so segments published by this
+    # process are left alone.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(getattr(memory, '_name'),
+                                    'shared_memory')
+    except Exception:
+        pass
+
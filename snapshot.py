@@ -0,0 +1,319 @@
+import enum
+import struct
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .classes import XRandRBorder, XRandRDimensions, XRandRGeometry, \
+                     XRandROffset, XRandROutput, XRandROutputProperties, \
+                     XRandRScreen, XRandRScreenDimensionsList, \
+                     XRandRTransform, _XRandRBase
+from .frozen import XRandRFrozenMapping, _frozen_class_set, _frozen_classes
+
+__all__ = ('encode_snapshot', 'decode_snapshot')
+
+_MAGIC: bytes = b'XRRS'
+_VERSION: int = 1
+
+_HEADER = struct.Struct('<4sBI')
+_U8 = struct.Struct('<B')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_ENUM = struct.Struct('<Bq')
+# None mask, then the XRandROutput.Mode fields in _fields order.
+_MODE = struct.Struct('<IIqdIBBqqqqqdqqqqd')
+
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_BIG_INT = 4
+_TAG_FLOAT = 5
+_TAG_STR = 6
+_TAG_BYTES = 7
+_TAG_LIST = 8
+_TAG_TUPLE = 9
+_TAG_DICT = 10
+_TAG_OBJECT = 11
+_TAG_ENUM = 12
+_TAG_MODES = 13
+_tags: Tuple[bytes, ...] = tuple(bytes((tag,)) for tag in range(14))
+
+_model_classes: Tuple[type, ...] = (
+    XRandRDimensions,
+    XRandROffset,
+    XRandRGeometry,
+    XRandRBorder,
+    XRandRTransform,
+    XRandRScreenDimensionsList,
+    XRandRScreen,
+    XRandROutput,
+    XRandROutput.Mode,
+    XRandROutputProperties,
+    XRandROutputProperties.Gamma,
+    XRandROutputProperties.OtherProperty
+)
+_model_class_ids: Dict[type, int] = {
+    cls: i for i, cls in enumerate(_model_classes)
+}
+_enum_classes: Tuple[type, ...] = (
+    XRandROutput.Connection,
+    XRandROutput.Rotation,
+    XRandROutput.Reflection,
+    XRandROutput.Mode.Flags,
+    XRandROutputProperties.SubpixelOrder
+)
+_enum_class_ids: Dict[type, int] = {
+    cls: i for i, cls in enumerate(_enum_classes)
+}
+
+_mode_fields: Tuple[str, ...] = XRandROutput.Mode._fields
+_mode_defaults: Tuple[Any, ...] = (
+    0, 0, 0., 0, False, False, 0, 0, 0, 0, 0, 0., 0, 0, 0, 0, 0.
+)
+
+
+class _Encoder:
+    __slots__ = ('chunks', 'strings')
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.strings: Dict[str, int] = {}
+
+    def string(self, value: str) -> int:
+        return self.strings.setdefault(value, len(self.strings))
+
+    def value(self, value: Any) -> None:
+        chunks: List[bytes] = self.chunks
+        cls: type = type(value)
+        if value is None:
+            chunks.append(_tags[_TAG_NONE])
+        elif cls is bool:
+            chunks.append(_tags[_TAG_TRUE] if value else _tags[_TAG_FALSE])
+        elif cls is int:
+            if -(1 << 63) <= value < 1 << 63:
+                chunks.append(_tags[_TAG_INT] + _I64.pack(value))
+            else:
+                chunks.append(_tags[_TAG_BIG_INT]
+                              + _U32.pack(self.string(str(value))))
+        elif cls is float:
+            chunks.append(_tags[_TAG_FLOAT] + _F64.pack(value))
+        elif cls is str:
+            chunks.append(_tags[_TAG_STR] + _U32.pack(self.string(value)))
+        elif isinstance(value, _XRandRBase):
+            model_class: type = value._model_class
+            chunks.append(_tags[_TAG_OBJECT]
+                          + _U8.pack(_model_class_ids[model_class]))
+            for field in model_class._fields:
+                item: Any = getattr(value, field)
+                if (field == 'modes'
+                        and model_class is XRandROutput
+                        and item is not None):
+                    self.modes(item)
+                else:
+                    self.value(item)
+        elif isinstance(value, enum.Enum):
+            chunks.append(_tags[_TAG_ENUM] + _ENUM.pack(
+                _enum_class_ids[type(value)],
+                value.value
+            ))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            data: bytes = bytes(value)
+            chunks.append(_tags[_TAG_BYTES] + _U32.pack(len(data)))
+            chunks.append(data)
+        elif isinstance(value, (list, tuple)):
+            chunks.append(_tags[_TAG_TUPLE if cls is tuple else _TAG_LIST]
+                          + _U32.pack(len(value)))
+            for element in value:
+                self.value(element)
+        elif hasattr(value, 'items'):
+            chunks.append(_tags[_TAG_DICT] + _U32.pack(len(value)))
+            for key, element in value.items():
+                self.value(key)
+                self.value(element)
+        else:
+            raise TypeError('Cannot encode value of type {}'.format(
+                cls.__qualname__
+            ))
+
+    def modes(self, modes: Sequence[XRandROutput.Mode]) -> None:
+        pack: Callable[..., bytes] = _MODE.pack
+        chunks: List[bytes] = [_tags[_TAG_MODES] + _U32.pack(len(modes))]
+        try:
+            for mode in modes:
+                values: List[Any] = [getattr(mode, f) for f in _mode_fields]
+                mask: int = 0
+                for i, v in enumerate(values):
+                    if v is None:
+                        mask |= 1 << i
+                        values[i] = _mode_defaults[i]
+                if values[0] is not None and not mask & 1:
+                    values[0] = self.string(values[0])
+                chunks.append(pack(mask, *values))
+        except struct.error:
+            # Values that do not fit the packed layout, like a float width,
+            # are encoded like any other list.
+            self.value(list(modes))
+            return
+        self.chunks.extend(chunks)
+
+    def result(self) -> bytes:
+        strings: List[bytes] = [
+            s.encode('utf-8', 'surrogatepass') for s in self.strings
+        ]
+        table: List[bytes] = []
+        for s in strings:
+            table.append(_U32.pack(len(s)))
+            table.append(s)
+        return b''.join((
+            _HEADER.pack(_MAGIC, _VERSION, len(strings)),
+            *table,
+            *self.chunks
+        ))
+
+
+def encode_snapshot(value: Any) -> bytes:
+    encoder: _Encoder = _Encoder()
+    encoder.value(value)
+    return encoder.result()
+
+
+class _Decoder:
+    # Frozen results are built directly instead of freezing a mutable copy.
+    __slots__ = ('data', 'offset', 'strings', 'frozen')
+
+    def __init__(self, data: bytes, frozen: bool = False) -> None:
+        self.data: memoryview = memoryview(data)
+        self.frozen: bool = frozen
+        magic, version, count = _HEADER.unpack_from(self.data)
+        if magic != _MAGIC:
+            raise ValueError('Not an xrandr snapshot')
+        if version != _VERSION:
+            raise ValueError(
+                'Unsupported xrandr snapshot version {}'.format(version)
+            )
+        offset: int = _HEADER.size
+        strings: List[str] = []
+        for _ in range(count):
+            length: int = _U32.unpack_from(self.data, offset)[0]
+            offset += 4
+            strings.append(str(self.data[offset:offset + length],
+                               'utf-8', 'surrogatepass'))
+            offset += length
+        self.offset: int = offset
+        self.strings: List[str] = strings
+
+    def value(self) -> Any:
+        data: memoryview = self.data
+        tag: int = data[self.offset]
+        self.offset += 1
+        if tag == _TAG_NONE:
+            return None
+        if tag == _TAG_FALSE:
+            return False
+        if tag == _TAG_TRUE:
+            return True
+        if tag == _TAG_INT:
+            self.offset += 8
+            return _I64.unpack_from(data, self.offset - 8)[0]
+        if tag == _TAG_FLOAT:
+            self.offset += 8
+            return _F64.unpack_from(data, self.offset - 8)[0]
+        if tag in (_TAG_STR, _TAG_BIG_INT):
+            self.offset += 4
+            string: str = self.strings[_U32.unpack_from(data,
+                                                        self.offset - 4)[0]]
+            return string if tag == _TAG_STR else int(string)
+        if tag == _TAG_OBJECT:
+            cls: type = _model_classes[data[self.offset]]
+            self.offset += 1
+            obj: Any = object.__new__(
+                _frozen_classes[cls] if self.frozen else cls
+            )
+            for field in cls._fields:
+                object.__setattr__(obj, field, self.value())
+            return obj
+        if tag == _TAG_ENUM:
+            class_id, enum_value = _ENUM.unpack_from(data, self.offset)
+            self.offset += _ENUM.size
+            return _enum_classes[class_id](enum_value)
+        if tag == _TAG_MODES:
+            return self.modes()
+
+        self.offset += 4
+        count: int = _U32.unpack_from(data, self.offset - 4)[0]
+        if tag == _TAG_BYTES:
+            self.offset += count
+            return bytes(data[self.offset - count:self.offset])
+        if tag == _TAG_LIST and not self.frozen:
+            return [self.value() for _ in range(count)]
+        if tag == _TAG_LIST:
+            return tuple([self.value() for _ in range(count)])
+        if tag == _TAG_TUPLE:
+            return tuple([self.value() for _ in range(count)])
+        if tag == _TAG_DICT:
+            result: Dict[Any, Any] = {}
+            for _ in range(count):
+                key: Any = self.value()
+                result[key] = self.value()
+            if self.frozen:
+                return XRandRFrozenMapping(result)
+            return result
+        raise ValueError('Corrupt xrandr snapshot: unknown tag {}'.format(tag))
+
+    def modes(self) -> Sequence[XRandROutput.Mode]:
+        data: memoryview = self.data
+        count: int = _U32.unpack_from(data, self.offset)[0]
+        start: int = self.offset + 4
+        self.offset = start + count * _MODE.size
+        strings: List[str] = self.strings
+        flags_class: type = XRandROutput.Mode.Flags
+        mode_class: type = XRandROutput.Mode
+        frozen_class: Optional[type] = \
+            _frozen_classes[mode_class] if self.frozen else None
+        setattr_: Callable[[Any, str, Any], None] = object.__setattr__
+
+        modes: List[XRandROutput.Mode] = []
+        for mask, *values in _MODE.iter_unpack(data[start:self.offset]):
+            if mask:
+                for i in range(len(values)):
+                    if mask & 1 << i:
+                        values[i] = None
+            if values[0] is not None:
+                values[0] = strings[values[0]]
+            if values[3] is not None:
+                values[3] = flags_class(values[3])
+            values[4] = bool(values[4])
+            values[5] = bool(values[5])
+            if frozen_class is None:
+                modes.append(mode_class(*values))
+                continue
+            mode: Any = object.__new__(frozen_class)
+            for field, value in zip(_mode_fields, values):
+                setattr_(mode, field, value)
+            modes.append(mode)
+        if frozen_class is not None:
+            return tuple(modes)
+        return modes
+
+
+def decode_snapshot(data: bytes, frozen: bool = False) -> Any:
+    try:
+        decoder: _Decoder = _Decoder(data, frozen)
+        value: Any = decoder.value()
+    except (struct.error, IndexError, KeyError, TypeError,
+            UnicodeDecodeError) as e:
+        raise ValueError('Corrupt xrandr snapshot') from e
+    if decoder.offset != len(decoder.data):
+        raise ValueError('Corrupt xrandr snapshot: truncated or trailing data')
+    return value
+
+
+def _reduce(obj: _XRandRBase) -> Tuple[Callable[..., Any], Tuple[Any, ...]]:
+    return _decode_reduced, (
+        encode_snapshot(obj),
+        type(obj) in _frozen_class_set
+    )
+
+
+def _decode_reduced(data: bytes, frozen: bool) -> Any:
+    return decode_snapshot(data, frozen)
@@ -0,0 +1,208 @@
+import heapq
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .classes import XRandROutput, XRandRScreen
+from .indexes import _flagged_mode
+
+__all__ = ('XRandRSpatialIndex',)
+
+Extent = Tuple[int, int, int, int]
+
+_LEAF_SIZE: int = 4
+
+
+class XRandRSpatialIndex:
+    # The extents are kept in a bounding volume hierarchy, split at the
+    # median along the longer side of each box, so memory stays linear in
+    # the number of outputs. Leaves hold up to _LEAF_SIZE outputs. Where
+    # several outputs match, the one that comes first in the screen wins.
+    # Extents are half-open, [x, x + width).
+    __slots__ = ('outputs', 'extents', '_boxes', '_children', '_leaves')
+    outputs: Sequence[XRandROutput]
+    extents: Sequence[Extent]
+    _boxes: List[Extent]
+    _children: List[Optional[Tuple[int, int]]]
+    _leaves: List[Tuple[int, ...]]
+
+    def __init__(self, screen: XRandRScreen, panning: bool = False) -> None:
+        outputs: List[XRandROutput] = []
+        extents: List[Extent] = []
+        for output in (screen.outputs or {}).values():
+            extent: Optional[Extent] = _extent(output, panning)
+            if extent is not None:
+                outputs.append(output)
+                extents.append(extent)
+        self.outputs = outputs
+        self.extents = extents
+
+        self._boxes = []
+        self._children = []
+        self._leaves = []
+        if extents:
+            self._build(list(range(len(extents))))
+
+    def _build(self, indices: List[int]) -> int:
+        extents: Sequence[Extent] = self.extents
+        box: Extent = (
+            min(extents[i][0] for i in indices),
+            min(extents[i][1] for i in indices),
+            max(extents[i][2] for i in indices),
+            max(extents[i][3] for i in indices)
+        )
+        node: int = len(self._boxes)
+        self._boxes.append(box)
+        self._children.append(None)
+        if len(indices) <= _LEAF_SIZE:
+            self._leaves.append(tuple(sorted(indices)))
+            return node
+        self._leaves.append(())
+
+        axis: int = 0 if box[2] - box[0] >= box[3] - box[1] else 1
+        indices.sort(key=lambda i: extents[i][axis] + extents[i][axis + 2])
+        half: int = len(indices) // 2
+        left: int = self._build(indices[:half])
+        self._children[node] = (left, self._build(indices[half:]))
+        return node
+
+    def _hits(self, x: int, y: int) -> List[int]:
+        hits: List[int] = []
+        if not self._boxes:
+            return hits
+        boxes: List[Extent] = self._boxes
+        children: List[Optional[Tuple[int, int]]] = self._children
+        leaves: List[Tuple[int, ...]] = self._leaves
+        extents: Sequence[Extent] = self.extents
+
+        stack: List[int] = [0]
+        while stack:
+            node: int = stack.pop()
+            x0, y0, x1, y1 = boxes[node]
+            if not (x0 <= x < x1 and y0 <= y < y1):
+                continue
+            pair: Optional[Tuple[int, int]] = children[node]
+            if pair is not None:
+                stack.extend(pair)
+                continue
+            for i in leaves[node]:
+                x0, y0, x1, y1 = extents[i]
+                if x0 <= x < x1 and y0 <= y < y1:
+                    hits.append(i)
+        return hits
+
+    def output_at(self, x: int, y: int) -> Optional[XRandROutput]:
+        hits: List[int] = self._hits(x, y)
+        return self.outputs[min(hits)] if hits else None
+
+    def outputs_at(self, x: int, y: int) -> List[XRandROutput]:
+        return [self.outputs[i] for i in sorted(self._hits(x, y))]
+
+    def outputs_at_points(
+            self,
+            points: Iterable[Tuple[int, int]]
+    ) -> List[Optional[XRandROutput]]:
+        outputs: Sequence[XRandROutput] = self.outputs
+        hits_at = self._hits
+
+        results: List[Optional[XRandROutput]] = []
+        append = results.append
+        for x, y in points:
+            hits: List[int] = hits_at(x, y)
+            append(outputs[min(hits)] if hits else None)
+        return results
+
+    def outputs_in(
+            self,
+            x: int,
+            y: int,
+            width: int,
+            height: int
+    ) -> List[XRandROutput]:
+        found: List[int] = []
+        if not self._boxes:
+            return []
+        x1: int = x + width
+        y1: int = y + height
+
+        stack: List[int] = [0]
+        while stack:
+            node: int = stack.pop()
+            box: Extent = self._boxes[node]
+            if not (box[0] < x1 and box[2] > x
+                    and box[1] < y1 and box[3] > y):
+                continue
+            pair: Optional[Tuple[int, int]] = self._children[node]
+            if pair is not None:
+                stack.extend(pair)
+                continue
+            for i in self._leaves[node]:
+                e: Extent = self.extents[i]
+                if e[0] < x1 and e[2] > x and e[1] < y1 and e[3] > y:
+                    found.append(i)
+        found.sort()
+        return [self.outputs[i] for i in found]
+
+    def nearest(self, x: int, y: int) -> Optional[XRandROutput]:
+        hits: List[int] = self._hits(x, y)
+        if hits:
+            return self.outputs[min(hits)]
+        if not self._boxes:
+            return None
+
+        # Branch and bound, nodes are visited by the distance to their box,
+        # which no output inside the box can be closer than.
+        best: Optional[Tuple[int, int]] = None
+        heap: List[Tuple[int, int]] = [(_distance(self._boxes[0], x, y), 0)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if best is not None and distance > best[0]:
+                break
+            pair: Optional[Tuple[int, int]] = self._children[node]
+            if pair is not None:
+                for child in pair:
+                    heapq.heappush(
+                        heap,
+                        (_distance(self._boxes[child], x, y), child)
+                    )
+                continue
+            for i in self._leaves[node]:
+                candidate: Tuple[int, int] = \
+                    (_distance(self.extents[i], x, y), i)
+                if best is None or candidate < best:
+                    best = candidate
+        return None if best is None else self.outputs[best[1]]
+
+
+def _distance(extent: Extent, x: int, y: int) -> int:
+    x0, y0, x1, y1 = extent
+    dx: int = max(x0 - x, 0, x - (x1 - 1))
+    dy: int = max(y0 - y, 0, y - (y1 - 1))
+    return dx * dx + dy * dy
+
+
+def _extent(output: XRandROutput, panning: bool) -> Optional[Extent]:
+    if panning:
+        area = output.panning
+        if area is None and output.properties is not None:
+            area = output.properties.panning
+        if (area is not None and area.width and area.height
+                and area.x is not None and area.y is not None):
+            return (area.x, area.y, area.x + area.width,
+                    area.y + area.height)
+
+    geometry = output.geometry
+    if geometry is None or geometry.x is None or geometry.y is None:
+        return None
+    width: Optional[int] = geometry.width
+    height: Optional[int] = geometry.height
+    if not width or not height:
+        # The geometry xrandr reports is already rotated and transformed,
+        # the mode has to be rotated here. The mode is looked up in the
+        # output itself, the screen index may be older than the outputs.
+        mode: Optional[XRandROutput.Mode] = _flagged_mode(output, 'current')
+        if mode is None or not mode.width or not mode.height:
+            return None
+        width, height = mode.width, mode.height
+        if output.rotation in (XRandROutput.Rotation.Rotate_90,
+                               XRandROutput.Rotation.Rotate_270):
+            width, height = height, width
+    return (geometry.x, geometry.y, geometry.x + width, geometry.y + height)
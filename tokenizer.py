@@ -0,0 +1,163 @@
+import enum
+import re
+from typing import List, Optional, Pattern, Sequence
+
+__all__ = ('XRandRTextBlock', 'tokenize')
+
+# Both match the newline in front of the line, a literal first character
+# lets the regex engine skip ahead to the next newline.
+_top_level_regex: Pattern[str] = re.compile(r'\n(?=\S)')
+_output_level_regex: Pattern[str] = re.compile(r'\n(?=\t\S|\ \ \ ?\S)')
+
+
+class XRandRTextBlock:
+    @enum.unique
+    class Kind(enum.IntEnum):
+        Screen = 0
+        Output = 1
+        Property = 2
+        Mode = 3
+
+    # A block spans from the start of its header line up to the start of the
+    # next block on the same or a lower indentation level. The children of
+    # output blocks are only split up when they are first accessed.
+    __slots__ = ('kind', 'text', 'start', 'header_end', 'end', 'name',
+                 '_children')
+    kind: Kind
+    text: str
+    start: int
+    header_end: int
+    end: int
+    name: str
+    _children: Optional[List['XRandRTextBlock']]
+
+    def __init__(
+            self,
+            kind: Kind,
+            text: str,
+            start: int,
+            end: int,
+            children: Optional[List['XRandRTextBlock']] = None
+    ) -> None:
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        header_end: int = text.find('\n', start, end)
+        self.header_end = end if header_end < 0 else header_end + 1
+        self.name = _block_name(kind, text, start, self.header_end)
+        self._children = children
+
+    @property
+    def children(self) -> Sequence['XRandRTextBlock']:
+        if self._children is None:
+            if self.kind == XRandRTextBlock.Kind.Output:
+                self._children = _split_output(self)
+            else:
+                self._children = []
+        return self._children
+
+    @property
+    def header(self) -> str:
+        return self.text[self.start:self.header_end]
+
+    def __str__(self) -> str:
+        return self.text[self.start:self.end]
+
+    def __repr__(self) -> str:
+        return '{}({!s}, {!r}, {!r}, {!r})'.format(
+            type(self).__qualname__,
+            self.kind.name,
+            self.name,
+            self.start,
+            self.end
+        )
+
+
+def _block_name(
+        kind: XRandRTextBlock.Kind,
+        text: str,
+        start: int,
+        end: int
+) -> str:
+    header: str = text[start:end].strip()
+    if kind == XRandRTextBlock.Kind.Screen:
+        return header[len('Screen'):].split(':', 1)[0].strip()
+    if kind == XRandRTextBlock.Kind.Property:
+        return header.split(':', 1)[0]
+    return header.split(None, 1)[0] if header else ''
+
+
+def tokenize(text: str, start: int = 0) -> List[XRandRTextBlock]:
+    starts: List[int] = [
+        match.start() + 1 for match in _top_level_regex.finditer(text, start)
+    ]
+    if start < len(text) and (not starts or starts[0] != start):
+        # The regex only finds the blocks behind a newline, the first one
+        # may also start in the middle of a line or with whitespace.
+        starts.insert(0, start)
+    starts.append(len(text))
+
+    screens: List[XRandRTextBlock] = []
+    orphans: List[XRandRTextBlock] = []
+    outputs: List[XRandRTextBlock] = orphans
+    for index in range(len(starts) - 1):
+        block_start: int = starts[index]
+        if text.startswith('Screen', block_start):
+            outputs = []
+            screens.append(XRandRTextBlock(
+                XRandRTextBlock.Kind.Screen,
+                text,
+                block_start,
+                starts[index + 1],
+                outputs
+            ))
+        else:
+            outputs.append(XRandRTextBlock(
+                XRandRTextBlock.Kind.Output,
+                text,
+                block_start,
+                starts[index + 1]
+            ))
+    if orphans:
+        # Output blocks in front of the first Screen line go into a screen
+        # block without a header and without a name.
+        screen = XRandRTextBlock(
+            XRandRTextBlock.Kind.Screen,
+            text,
+            orphans[0].start,
+            orphans[-1].end,
+            orphans
+        )
+        screen.header_end = screen.start
+        screen.name = ''
+        screens.insert(0, screen)
+    for screen in screens:
+        if screen._children:
+            screen.end = screen._children[-1].end
+    return screens
+
+
+def _split_output(output: XRandRTextBlock) -> List[XRandRTextBlock]:
+    text: str = output.text
+    starts: List[int] = [
+        match.start() + 1 for match in _output_level_regex.finditer(
+            text,
+            output.header_end - 1,
+            output.end
+        )
+    ]
+    starts.append(output.end)
+
+    children: List[XRandRTextBlock] = []
+    for index in range(len(starts) - 1):
+        children.append(XRandRTextBlock(
+            XRandRTextBlock.Kind.Property
+            if text[starts[index]] == '\t'
+            else XRandRTextBlock.Kind.Mode,
+            text,
+            starts[index],
+            starts[index + 1],
+            []
+        ))
+    return children
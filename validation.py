@@ -0,0 +1,305 @@
+import enum
+from typing import Any, Dict, Iterable, List, Mapping, Optional, \
+                   Tuple, Union
+
+from .classes import XRandROutput, XRandRScreen
+from .configure import XRandRConfigurationOptions
+from .indexes import XRandRScreenIndex
+
+__all__ = ('XRandRViolation', 'XRandRValidationError', 'validate_screens')
+
+
+class XRandRViolation:
+    @enum.unique
+    class Kind(enum.IntEnum):
+        UnknownScreen = 0
+        UnknownOutput = 1
+        UnknownMode = 2
+        FramebufferTooLarge = 3
+        FramebufferTooSmall = 4
+        OutsideFramebuffer = 5
+        TooManyOutputs = 6
+        UnsupportedCrtc = 7
+        CrtcConflict = 8
+        UnknownRate = 9
+
+    __slots__ = ('kind', 'screen', 'output', 'message')
+    kind: Kind
+    screen: int
+    output: Optional[str]
+    message: str
+
+    def __init__(
+            self,
+            kind: Kind,
+            screen: int,
+            output: Optional[str],
+            message: str
+    ) -> None:
+        self.kind = kind
+        self.screen = screen
+        self.output = output
+        self.message = message
+
+    def __str__(self) -> str:
+        if self.output is None:
+            return 'screen {}: {}'.format(self.screen, self.message)
+        return 'screen {}, output {}: {}'.format(
+            self.screen,
+            self.output,
+            self.message
+        )
+
+    def __repr__(self) -> str:
+        return '{}({!s}, {!r}, {!r}, {!r})'.format(
+            type(self).__qualname__,
+            self.kind.name,
+            self.screen,
+            self.output,
+            self.message
+        )
+
+
+class XRandRValidationError(ValueError):
+    violations: List[XRandRViolation]
+
+    def __init__(self, violations: List[XRandRViolation]) -> None:
+        super().__init__('; '.join(str(v) for v in violations))
+        self.violations = violations
+
+
+def validate_screens(
+        screens: Union[Iterable[XRandRScreen], Dict[Any, XRandRScreen]],
+        current: Mapping[Any, XRandRScreen],
+        config_options: XRandRConfigurationOptions =
+        ~XRandRConfigurationOptions.ConfigureUnknownOutputProperties
+) -> List[XRandRViolation]:
+    # Checks the desired screens against the capabilities of the current
+    # ones, only for the parts configure_screens() would apply with the
+    # same options.
+    if isinstance(screens, dict):
+        screens = screens.values()
+    by_number: Dict[int, XRandRScreen] = {
+        screen.number: screen for screen in current.values()
+    }
+
+    violations: List[XRandRViolation] = []
+    for screen in screens:
+        limits: Optional[XRandRScreen] = by_number.get(screen.number)
+        if limits is None:
+            violations.append(XRandRViolation(
+                XRandRViolation.Kind.UnknownScreen,
+                screen.number,
+                None,
+                'screen does not exist'
+            ))
+            continue
+        violations.extend(_validate_screen(screen, limits, config_options))
+    return violations
+
+
+def _validate_screen(
+        screen: XRandRScreen,
+        limits: XRandRScreen,
+        config_options: XRandRConfigurationOptions
+) -> List[XRandRViolation]:
+    violations: List[XRandRViolation] = []
+
+    def violation(
+            kind: XRandRViolation.Kind,
+            output: Optional[str],
+            message: str
+    ) -> None:
+        violations.append(
+            XRandRViolation(kind, screen.number, output, message)
+        )
+
+    framebuffer: Optional[Tuple[int, int]] = None
+    if (screen.dimensions is not None
+            and screen.dimensions.current is not None
+            and screen.dimensions.current.width is not None
+            and screen.dimensions.current.height is not None):
+        framebuffer = (screen.dimensions.current.width,
+                       screen.dimensions.current.height)
+    if (framebuffer is not None
+            and config_options
+            & XRandRConfigurationOptions.ConfigureScreenDimensions
+            and limits.dimensions is not None):
+        maximum = limits.dimensions.maximum
+        minimum = limits.dimensions.minimum
+        if (maximum is not None
+                and maximum.width is not None
+                and maximum.height is not None
+                and (framebuffer[0] > maximum.width
+                     or framebuffer[1] > maximum.height)):
+            violation(
+                XRandRViolation.Kind.FramebufferTooLarge,
+                None,
+                'framebuffer {}x{} exceeds the maximum of {}x{}'.format(
+                    *framebuffer, maximum.width, maximum.height
+                )
+            )
+        if (minimum is not None
+                and minimum.width is not None
+                and minimum.height is not None
+                and (framebuffer[0] < minimum.width
+                     or framebuffer[1] < minimum.height)):
+            violation(
+                XRandRViolation.Kind.FramebufferTooSmall,
+                None,
+                'framebuffer {}x{} is below the minimum of {}x{}'.format(
+                    *framebuffer, minimum.width, minimum.height
+                )
+            )
+
+    check_modes: bool = bool(
+        config_options & XRandRConfigurationOptions.ConfigureOutputMode
+    )
+    check_crtcs: bool = bool(
+        config_options & XRandRConfigurationOptions.ConfigureOutputProperties
+    )
+    # limits is the current state, its index is up to date. The desired
+    # screen's index may be older than its outputs, so the requested mode
+    # is read from the outputs directly.
+    index: XRandRScreenIndex = limits.index
+    outputs: Mapping[str, XRandROutput] = limits.outputs or {}
+    crtcs: int = len(index.outputs_by_supported_crtc)
+
+    active: List[str] = []
+    used_crtcs: Dict[int, Tuple[str, Any]] = {}
+    for name, output in (screen.outputs or {}).items():
+        available: Optional[XRandROutput] = outputs.get(name)
+        if available is None:
+            violation(
+                XRandRViolation.Kind.UnknownOutput,
+                name,
+                'output does not exist'
+            )
+            continue
+
+        size, mode_id, rate = _selected_mode(output)
+        if size is None and mode_id is None:
+            continue
+        active.append(name)
+
+        if check_modes:
+            problem: Optional[Tuple[XRandRViolation.Kind, str]] = \
+                _check_mode(index, available, size, mode_id, rate)
+            if problem is not None:
+                violation(problem[0], name, problem[1])
+
+        geometry = output.geometry
+        if (framebuffer is not None
+                and geometry is not None
+                and geometry.x is not None and geometry.y is not None
+                and geometry.width and geometry.height
+                and (geometry.x < 0 or geometry.y < 0
+                     or geometry.x + geometry.width > framebuffer[0]
+                     or geometry.y + geometry.height > framebuffer[1])):
+            violation(
+                XRandRViolation.Kind.OutsideFramebuffer,
+                name,
+                '{}x{}+{}+{} is outside the {}x{} framebuffer'.format(
+                    geometry.width, geometry.height, geometry.x, geometry.y,
+                    *framebuffer
+                )
+            )
+
+        crtc: Optional[int] = \
+            output.properties.crtc if output.properties is not None \
+            else None
+        if not check_crtcs or crtc is None:
+            continue
+        supported = available.properties.crtcs \
+            if available.properties is not None else None
+        if supported is not None and not any(
+                o is available
+                for o in index.outputs_by_supported_crtc.get(crtc, ())):
+            violation(
+                XRandRViolation.Kind.UnsupportedCrtc,
+                name,
+                'CRTC {} is not one of {}'.format(
+                    crtc,
+                    ', '.join(str(c) for c in supported)
+                )
+            )
+        # Outputs can only share a CRTC when they show the same picture.
+        picture: Any = (
+            size,
+            None if geometry is None else (geometry.x, geometry.y)
+        )
+        other: Optional[Tuple[str, Any]] = used_crtcs.get(crtc)
+        if other is None:
+            used_crtcs[crtc] = (name, picture)
+        elif other[1] != picture:
+            violation(
+                XRandRViolation.Kind.CrtcConflict,
+                name,
+                'CRTC {} is already used by {}'.format(crtc, other[0])
+            )
+
+    if crtcs and len(active) > crtcs:
+        violation(
+            XRandRViolation.Kind.TooManyOutputs,
+            None,
+            '{} active outputs but only {} CRTCs'.format(
+                len(active),
+                crtcs
+            )
+        )
+    return violations
+
+
+def _selected_mode(
+        output: XRandROutput
+) -> Tuple[Optional[Tuple[Any, Any]], Optional[int], Optional[Any]]:
+    # Mirrors how configure_screens() selects the --mode and --rate
+    # arguments: the first current mode in output.modes, by size if known
+    # and by id otherwise, then output.mode, then the size of the geometry.
+    # Returns the size, the mode id and the rate.
+    if not output.modes:
+        return None, None, None
+    for mode in output.modes:
+        if mode.current:
+            if mode.width and mode.height:
+                return (mode.width, mode.height), None, mode.refresh
+            if mode.id:
+                return None, mode.id, None
+    if output.mode:
+        return None, output.mode, None
+    geometry = output.geometry
+    if (geometry is not None
+            and geometry.width is not None
+            and geometry.height is not None):
+        return (geometry.width, geometry.height), None, None
+    return None, None, None
+
+
+def _check_mode(
+        index: XRandRScreenIndex,
+        output: XRandROutput,
+        size: Optional[Tuple[Any, Any]],
+        mode_id: Optional[int],
+        rate: Optional[Any]
+) -> Optional[Tuple[XRandRViolation.Kind, str]]:
+    if size is not None:
+        sized: List[XRandROutput.Mode] = \
+            index.mode_lists_by_size.get((output.name, *size), [])
+        if not sized:
+            return (XRandRViolation.Kind.UnknownMode,
+                    'mode {}x{} is not supported'.format(*size))
+        # xrandr prints rates with two decimals.
+        if rate and not any(
+                mode.refresh is not None and abs(mode.refresh - rate) < 0.01
+                for mode in sized):
+            return (XRandRViolation.Kind.UnknownRate,
+                    'rate {} is not supported for mode {}x{}'.format(
+                        rate, *size
+                    ))
+        return None
+
+    if mode_id is None or any(
+            o is output for o in index.outputs_by_mode_id.get(mode_id, ())):
+        return None
+    return (XRandRViolation.Kind.UnknownMode,
+            'mode {:#x} is not supported'.format(mode_id))